@@ -7,20 +7,112 @@ from datetime import timedelta
 
 import homeassistant.helpers.config_validation as cv
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_CO2_SENSOR, CONF_UPDATE_INTERVAL_MINUTES, CONF_URL, DOMAIN, MIN_TIME_BETWEEN_UPDATES
-from .sensor_processor import SensorProcessor
+from .const import (
+    AGGREGATION_LAST,
+    CONF_AGGREGATION,
+    CONF_CO2_SENSOR,
+    CONF_DEADBAND_SCALE,
+    CONF_FORECAST,
+    CONF_SENSOR_1,
+    CONF_SENSOR_2,
+    CONF_SENSOR_3,
+    CONF_SENSOR_4,
+    CONF_SENSOR_5,
+    CONF_SENSOR_6,
+    CONF_TRANSPORT,
+    CONF_UPDATE_INTERVAL_MINUTES,
+    CONF_URL,
+    CONF_WEATHER_PROVIDER,
+    DEFAULT_AGGREGATION,
+    DEFAULT_DEADBAND_SCALE,
+    DEFAULT_FORECAST,
+    DOMAIN,
+    FORECAST_OFF,
+    MIN_TIME_BETWEEN_UPDATES,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 
+def get_sensor_entity_ids(config: dict) -> list[str]:
+    """Return the CO2 sensor and the additional sensors of a configuration."""
+    entity_ids = [config[CONF_CO2_SENSOR]]
+    for sensor_key in (
+        CONF_SENSOR_1,
+        CONF_SENSOR_2,
+        CONF_SENSOR_3,
+        CONF_SENSOR_4,
+        CONF_SENSOR_5,
+        CONF_SENSOR_6,
+    ):
+        sensor_id = config.get(sensor_key)
+        if sensor_id and isinstance(sensor_id, str) and sensor_id.strip():
+            entity_ids.append(sensor_id.strip())
+    return entity_ids
+
+
+def get_tracked_entity_ids(
+    config: dict, hass: HomeAssistant | None = None
+) -> list[str]:
+    """Return the entities whose changes affect the payload.
+
+    With hass given, group entities among the group sources are expanded to
+    their current members.
+    """
+    from .groups import expand_sources, get_groups
+
+    entity_ids = get_sensor_entity_ids(config)
+    if config.get(CONF_WEATHER_PROVIDER):
+        entity_ids.append(config[CONF_WEATHER_PROVIDER])
+    for sources, _, _, _ in get_groups(config):
+        entity_ids.extend(expand_sources(hass, sources) if hass else sources)
+    return list(dict.fromkeys(entity_ids))
+
+
+def requires_reload(old_config: dict, new_config: dict) -> bool:
+    """Return whether a configuration change cannot be applied in place.
+
+    Changes that add or remove an aggregator, significance filter or forecast
+    cache rebuild the entry. Everything else is read from the entry on each
+    push or applied to the running helpers.
+    """
+    if not new_config.get(CONF_URL) or not new_config.get(CONF_CO2_SENSOR):
+        return True
+    for key, default in (
+        (CONF_WEATHER_PROVIDER, None),
+        (CONF_FORECAST, DEFAULT_FORECAST),
+    ):
+        if old_config.get(key, default) != new_config.get(key, default):
+            return True
+    for key, default, disabled in (
+        (CONF_AGGREGATION, DEFAULT_AGGREGATION, AGGREGATION_LAST),
+        (CONF_DEADBAND_SCALE, DEFAULT_DEADBAND_SCALE, 0),
+    ):
+        if (old_config.get(key, default) == disabled) != (
+            new_config.get(key, default) == disabled
+        ):
+            return True
+    return False
+
+
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the TRMNL Weather component."""
+    # The runtime modules are imported on setup, so importing the package for
+    # the config flow stays cheap.
+    from .polling import ImageView, MergeVariablesView
+    from .services import async_setup_services
+
     _LOGGER.debug("Setting up TRMNL Weather Push component")
+    async_setup_services(hass)
+    if "http" in hass.config.components:
+        hass.http.register_view(MergeVariablesView)
+        hass.http.register_view(ImageView)
     return True
 
 
@@ -62,7 +154,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.exception("Error setting up integration: %s", ex)
         return False
 
-    processor = SensorProcessor(hass, entry)
+    from .aggregation import WindowAggregator
+    from .forecast import async_acquire_forecast_cache
+    from .polling import PollCache
+    from .push_state import PushState
+    from .render import ImageRenderer
+    from .sensor_processor import SensorProcessor
+    from .significance import SignificanceFilter
+
+    push_state = PushState(hass, entry.entry_id)
+    await push_state.async_load()
+
+    aggregator = None
+    if config.get(CONF_AGGREGATION, DEFAULT_AGGREGATION) != AGGREGATION_LAST:
+        aggregator = WindowAggregator(hass, get_sensor_entity_ids(config))
+        aggregator.async_start(dt_util.utcnow().timestamp())
+
+    tracked_entity_ids = get_tracked_entity_ids(config, hass)
+
+    significance = None
+    deadband_scale = config.get(CONF_DEADBAND_SCALE, DEFAULT_DEADBAND_SCALE)
+    if deadband_scale > 0:
+        significance = SignificanceFilter(hass, tracked_entity_ids, deadband_scale)
+        significance.async_start()
+
+    forecast = None
+    forecast_type = config.get(CONF_FORECAST, DEFAULT_FORECAST)
+    if config.get(CONF_WEATHER_PROVIDER) and forecast_type != FORECAST_OFF:
+        forecast = async_acquire_forecast_cache(
+            hass, config[CONF_WEATHER_PROVIDER], forecast_type
+        )
+
+    processor = SensorProcessor(
+        hass, entry, push_state, aggregator, significance, forecast
+    )
+
+    poll_cache = PollCache(hass, processor, tracked_entity_ids)
+    poll_cache.async_start()
 
     _LOGGER.debug(
         "Setting up periodic timer for %d seconds (%d minutes)",
@@ -70,26 +198,103 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         update_interval_minutes,
     )
     remove_timer = async_track_time_interval(
-        hass, processor.process_sensors, timedelta(seconds=update_interval_seconds)
+        hass, processor.async_push, timedelta(seconds=update_interval_seconds)
     )
 
+    hass.data[DOMAIN][entry.entry_id]["config"] = config
     hass.data[DOMAIN][entry.entry_id]["remove_timer"] = remove_timer
     hass.data[DOMAIN][entry.entry_id]["processor"] = processor
+    hass.data[DOMAIN][entry.entry_id]["push_state"] = push_state
+    hass.data[DOMAIN][entry.entry_id]["aggregator"] = aggregator
+    hass.data[DOMAIN][entry.entry_id]["significance"] = significance
+    hass.data[DOMAIN][entry.entry_id]["forecast"] = forecast
+    hass.data[DOMAIN][entry.entry_id]["poll_cache"] = poll_cache
+    hass.data[DOMAIN][entry.entry_id]["renderer"] = ImageRenderer(hass)
 
-    async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Update listener to handle option changes."""
-        _LOGGER.debug("Configuration updated, reloading integration")
-        await hass.config_entries.async_reload(entry.entry_id)
+    processor.async_resume_outbox()
 
-    entry.add_update_listener(async_update_entry)
+    entry.async_on_unload(entry.add_update_listener(async_update_entry))
 
-    _LOGGER.debug("Running initial sensor update")
-    await processor.process_sensors()
+    # The initial push waits on the network, run it in the background so the
+    # entry is set up without blocking Home Assistant startup. After a restart
+    # or reload the display may already show this data, so only push changes.
+    _LOGGER.debug("Scheduling initial sensor update")
+    entry.async_create_background_task(
+        hass,
+        processor.async_push(only_if_changed=True),
+        f"{DOMAIN}_initial_push",
+    )
 
     _LOGGER.info("TRMNL Weather integration setup completed")
     return True
 
 
+async def async_update_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Update listener to handle option changes."""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    config = {**entry.data, **entry.options}
+    if "config" not in data or requires_reload(data["config"], config):
+        _LOGGER.debug("Configuration updated, reloading integration")
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    _LOGGER.debug("Configuration updated, applying changes in place")
+    async_apply_config(hass, entry, config)
+
+
+@callback
+def async_apply_config(hass: HomeAssistant, entry: ConfigEntry, config: dict) -> None:
+    """Apply a compatible configuration change to a running entry.
+
+    The processor reads the configuration on each push, so names, decimals,
+    layout and the target take effect on the next one. The helpers keep their
+    state and only swap their tracked entities, and the timer is replaced only
+    if the interval changed.
+    """
+    data = hass.data[DOMAIN][entry.entry_id]
+    old_config, data["config"] = data["config"], config
+    processor = data["processor"]
+    tracked_entity_ids = get_tracked_entity_ids(config, hass)
+
+    if data.get("aggregator"):
+        data["aggregator"].async_set_entities(
+            get_sensor_entity_ids(config), dt_util.utcnow().timestamp()
+        )
+    if data.get("significance"):
+        data["significance"].async_reconfigure(
+            tracked_entity_ids,
+            config.get(CONF_DEADBAND_SCALE, DEFAULT_DEADBAND_SCALE),
+        )
+    data["poll_cache"].async_set_entities(tracked_entity_ids)
+
+    update_interval_minutes = config.get(
+        CONF_UPDATE_INTERVAL_MINUTES, MIN_TIME_BETWEEN_UPDATES
+    )
+    if update_interval_minutes != old_config.get(
+        CONF_UPDATE_INTERVAL_MINUTES, MIN_TIME_BETWEEN_UPDATES
+    ):
+        _LOGGER.debug(
+            "Rescheduling periodic timer for %d minutes", update_interval_minutes
+        )
+        data["remove_timer"]()
+        data["remove_timer"] = async_track_time_interval(
+            hass, processor.async_push, timedelta(minutes=update_interval_minutes)
+        )
+
+    if old_config.get(CONF_URL) != config.get(CONF_URL) or old_config.get(
+        CONF_TRANSPORT
+    ) != config.get(CONF_TRANSPORT):
+        # Timers scheduled for the previous target no longer apply.
+        processor.async_stop()
+        processor.async_resume_outbox()
+
+    entry.async_create_background_task(
+        hass,
+        processor.async_push(only_if_changed=True),
+        f"{DOMAIN}_reconfigured_push",
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     try:
@@ -99,9 +304,40 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             if "remove_timer" in hass.data[DOMAIN][entry.entry_id]:
                 hass.data[DOMAIN][entry.entry_id]["remove_timer"]()
 
+            for key in (
+                "processor",
+                "aggregator",
+                "significance",
+                "poll_cache",
+            ):
+                if hass.data[DOMAIN][entry.entry_id].get(key):
+                    hass.data[DOMAIN][entry.entry_id][key].async_stop()
+
+            if hass.data[DOMAIN][entry.entry_id].get("forecast"):
+                from .forecast import async_release_forecast_cache
+
+                async_release_forecast_cache(
+                    hass, hass.data[DOMAIN][entry.entry_id]["forecast"]
+                )
+
+            if "processor" in hass.data[DOMAIN][entry.entry_id]:
+                await hass.data[DOMAIN][entry.entry_id][
+                    "processor"
+                ].async_stop_recording()
+
+            if "push_state" in hass.data[DOMAIN][entry.entry_id]:
+                await hass.data[DOMAIN][entry.entry_id]["push_state"].async_save()
+
             hass.data[DOMAIN].pop(entry.entry_id)
             _LOGGER.info("Successfully unloaded integration")
     except Exception as err:
         _LOGGER.error("Error unloading integration: %s", err)
         return False
     return True
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted state when a config entry is deleted."""
+    from .push_state import PushState
+
+    await PushState(hass, entry.entry_id).async_remove()
@@ -0,0 +1,172 @@
+"""Windowed aggregation of sensor values between pushes."""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import (
+    AGGREGATION_AUTO,
+    AGGREGATION_BY_DEVICE_CLASS,
+    AGGREGATION_EMA,
+    AGGREGATION_LAST,
+    AGGREGATION_MAX,
+    AGGREGATION_MEAN,
+    EMA_TIME_CONSTANT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Slots of the per-entity accumulator array.
+_WINDOW_START = 0
+_LAST_TIME = 1
+_LAST_VALUE = 2
+_INTEGRAL = 3
+_MAX = 4
+_EMA = 5
+_SLOTS = 6
+
+_NAN = float("nan")
+
+
+def parse_numeric(value) -> float | None:
+    """Return a state value as a finite float, or None if it is not numeric."""
+    try:
+        number = float(value)
+    except (ValueError, TypeError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def resolve_mode(mode: str, device_class: str | None) -> str:
+    """Resolve the aggregation mode of an entity."""
+    if mode == AGGREGATION_AUTO:
+        return AGGREGATION_BY_DEVICE_CLASS.get(device_class, AGGREGATION_LAST)
+    return mode
+
+
+class WindowAggregator:
+    """Aggregate numeric state changes of a fixed set of entities.
+
+    Each entity uses a constant-size array, updated in O(1) per state change.
+    The mean is time-weighted over the window since the last reset, or since
+    the first known value, so sensors reporting only on change are not biased
+    by their report rate. The EMA carries across windows.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_ids: list[str],
+        ema_time_constant: float = EMA_TIME_CONSTANT,
+    ):
+        """Initialize the aggregator."""
+        self.hass = hass
+        self.entity_ids = list(dict.fromkeys(entity_ids))
+        self.ema_time_constant = ema_time_constant
+        self._accumulators = {
+            entity_id: array("d", [_NAN] * _SLOTS) for entity_id in self.entity_ids
+        }
+        self._unsub = None
+
+    @callback
+    def async_start(self, now: float) -> None:
+        """Seed the accumulators from current states and track changes."""
+        for entity_id in self.entity_ids:
+            state = self.hass.states.get(entity_id)
+            if state is not None:
+                self.add_sample(entity_id, parse_numeric(state.state), now)
+
+        self._unsub = async_track_state_change_event(
+            self.hass, self.entity_ids, self._async_state_changed
+        )
+        _LOGGER.debug("Aggregating %d entities", len(self.entity_ids))
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop tracking state changes."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_set_entities(self, entity_ids: list[str], now: float) -> None:
+        """Track another set of entities, keeping the windows of retained ones.
+
+        Reseeding a retained accumulator with its current state adds a sample
+        equal to its last value, which leaves all aggregates unchanged.
+        """
+        self.async_stop()
+        self.entity_ids = list(dict.fromkeys(entity_ids))
+        self._accumulators = {
+            entity_id: self._accumulators.get(entity_id) or array("d", [_NAN] * _SLOTS)
+            for entity_id in self.entity_ids
+        }
+        self.async_start(now)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Feed a state change into its accumulator."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        self.add_sample(
+            event.data["entity_id"],
+            parse_numeric(new_state.state),
+            new_state.last_updated.timestamp(),
+        )
+
+    def add_sample(self, entity_id: str, value: float | None, timestamp: float) -> None:
+        """Add a sample, closing the interval held by the previous value."""
+        acc = self._accumulators.get(entity_id)
+        if acc is None or value is None:
+            return
+
+        last_value = acc[_LAST_VALUE]
+        if math.isnan(last_value):
+            acc[_INTEGRAL] = 0.0
+            acc[_MAX] = value
+            acc[_EMA] = value
+            acc[_WINDOW_START] = timestamp
+        else:
+            elapsed = max(timestamp - acc[_LAST_TIME], 0.0)
+            acc[_INTEGRAL] += last_value * elapsed
+            acc[_MAX] = max(acc[_MAX], value)
+            alpha = 1.0 - math.exp(-elapsed / self.ema_time_constant)
+            acc[_EMA] += alpha * (value - acc[_EMA])
+
+        acc[_LAST_TIME] = timestamp
+        acc[_LAST_VALUE] = value
+
+    def value(self, entity_id: str, mode: str, now: float) -> float | None:
+        """Return the aggregate of an entity over the current window."""
+        acc = self._accumulators.get(entity_id)
+        if acc is None or math.isnan(acc[_LAST_VALUE]):
+            return None
+
+        if mode == AGGREGATION_MAX:
+            return acc[_MAX]
+        if mode == AGGREGATION_EMA:
+            return acc[_EMA]
+        if mode == AGGREGATION_MEAN:
+            duration = now - acc[_WINDOW_START]
+            if duration <= 0:
+                return acc[_LAST_VALUE]
+            tail = acc[_LAST_VALUE] * max(now - acc[_LAST_TIME], 0.0)
+            return (acc[_INTEGRAL] + tail) / duration
+        return acc[_LAST_VALUE]
+
+    def reset_window(self, now: float) -> None:
+        """Start a new window, keeping the last value and the EMA."""
+        for entity_id, acc in self._accumulators.items():
+            last_value = acc[_LAST_VALUE]
+            if not math.isnan(last_value):
+                # Carry the last value into the new window as a fresh sample.
+                self.add_sample(entity_id, last_value, now)
+                acc[_MAX] = last_value
+            acc[_INTEGRAL] = 0.0
+            acc[_WINDOW_START] = now
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import lru_cache
 
+import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
@@ -18,13 +21,24 @@ from homeassistant.helpers.selector import (
     NumberSelector,
     NumberSelectorConfig,
     NumberSelectorMode,
+    SelectSelector,
+    SelectSelectorConfig,
+    SelectSelectorMode,
 )
 
 from .const import (
+    AGGREGATION_MODES,
+    CONF_AGGREGATION,
     CONF_CO2_NAME,
     CONF_CO2_SENSOR,
+    CONF_DEADBAND_SCALE,
     CONF_DECIMAL_PLACES,
+    CONF_FORECAST,
+    CONF_HEARTBEAT_MINUTES,
+    CONF_IAQ,
     CONF_INCLUDE_IDS,
+    CONF_LAYOUT,
+    CONF_PAGING,
     CONF_SENSOR_1,
     CONF_SENSOR_1_NAME,
     CONF_SENSOR_2,
@@ -37,20 +51,41 @@ from .const import (
     CONF_SENSOR_5_NAME,
     CONF_SENSOR_6,
     CONF_SENSOR_6_NAME,
+    CONF_TRANSPORT,
     CONF_UPDATE_INTERVAL_MINUTES,
     CONF_URL,
     CONF_WEATHER_PROVIDER,
+    DEFAULT_AGGREGATION,
+    DEFAULT_DEADBAND_SCALE,
     DEFAULT_DECIMAL_PLACES,
+    DEFAULT_FORECAST,
+    DEFAULT_GROUP_FUNCTION,
+    DEFAULT_HEARTBEAT_MINUTES,
+    DEFAULT_LAYOUT,
+    DEFAULT_TRANSPORT,
     DEFAULT_UPDATE_INTERVAL,
     DEFAULT_URL,
     DOMAIN,
+    FORECAST_TYPES,
+    GROUP_FUNCTIONS,
+    GROUPS,
+    LAYOUT_ALL,
+    LAYOUT_CAPACITY,
+    MAX_DEADBAND_SCALE,
+    MAX_HEARTBEAT_MINUTES,
     MAX_UPDATE_INTERVAL,
+    MIN_HEARTBEAT_MINUTES,
     MIN_UPDATE_INTERVAL,
     SENSOR_DEVICE_CLASSES,
+    TRANSPORTS,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Schemas only depend on their defaults, so a handful of cached variants covers
+# the empty form, the re-shown form and the options form of a few entries.
+SCHEMA_CACHE_SIZE = 16
+
 
 def get_entity_selectors() -> tuple[dict, dict, dict]:
     """Create entity selectors for CO2, general sensors, and weather."""
@@ -72,6 +107,66 @@ def get_entity_selectors() -> tuple[dict, dict, dict]:
     return co2_filter, sensor_filter, weather_filter
 
 
+def get_layout_selector() -> SelectSelector:
+    """Create the selector for the TRMNL layout the payload is targeted at."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=[LAYOUT_ALL, *LAYOUT_CAPACITY],
+            mode=SelectSelectorMode.DROPDOWN,
+            translation_key=CONF_LAYOUT,
+        )
+    )
+
+
+def get_aggregation_selector() -> SelectSelector:
+    """Create the selector for how values are aggregated between pushes."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=AGGREGATION_MODES,
+            mode=SelectSelectorMode.DROPDOWN,
+            translation_key=CONF_AGGREGATION,
+        )
+    )
+
+
+def get_transport_selector() -> SelectSelector:
+    """Create the selector for how payloads are delivered to the display."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=TRANSPORTS,
+            mode=SelectSelectorMode.DROPDOWN,
+            translation_key=CONF_TRANSPORT,
+        )
+    )
+
+
+def get_group_selectors() -> tuple[EntitySelector, SelectSelector]:
+    """Create the selectors for the sources and the function of a group."""
+    return (
+        EntitySelector(
+            EntitySelectorConfig(filter={"domain": ["sensor", "group"]}, multiple=True)
+        ),
+        SelectSelector(
+            SelectSelectorConfig(
+                options=GROUP_FUNCTIONS,
+                mode=SelectSelectorMode.DROPDOWN,
+                translation_key="group_function",
+            )
+        ),
+    )
+
+
+def get_forecast_selector() -> SelectSelector:
+    """Create the selector for the forecast summary sent with the weather."""
+    return SelectSelector(
+        SelectSelectorConfig(
+            options=FORECAST_TYPES,
+            mode=SelectSelectorMode.DROPDOWN,
+            translation_key=CONF_FORECAST,
+        )
+    )
+
+
 def get_sensor_friendly_name(hass: HomeAssistant, entity_id: str) -> str:
     """Get a friendly name for a sensor entity."""
     entity_registry = er.async_get(hass)
@@ -111,15 +206,36 @@ def clean_sensor_data(data: dict) -> dict:
     return cleaned
 
 
+def _freeze_defaults(defaults: dict | None) -> tuple:
+    """Return a hashable snapshot of form defaults usable as a cache key."""
+    if not defaults:
+        return ()
+    # Group sources are lists, which are not hashable.
+    return tuple(
+        sorted(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in defaults.items()
+        )
+    )
+
+
 def create_basic_schema(defaults: dict = None) -> vol.Schema:
     """Create the basic configuration schema for step 1."""
-    if defaults is None:
-        defaults = {}
+    return _build_basic_schema(_freeze_defaults(defaults))
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_basic_schema(frozen_defaults: tuple) -> vol.Schema:
+    """Build and cache the basic configuration schema."""
+    defaults = dict(frozen_defaults)
 
     co2_filter, _, _ = get_entity_selectors()
 
     schema_dict = {
         vol.Required(CONF_URL, default=defaults.get(CONF_URL, DEFAULT_URL)): str,
+        vol.Optional(
+            CONF_TRANSPORT, default=defaults.get(CONF_TRANSPORT, DEFAULT_TRANSPORT)
+        ): get_transport_selector(),
     }
 
     # Handle CO2 sensor similar to additional sensors
@@ -160,8 +276,13 @@ def create_basic_schema(defaults: dict = None) -> vol.Schema:
 
 def create_sensors_schema(defaults: dict = None) -> vol.Schema:
     """Create the additional sensors schema for step 2."""
-    if defaults is None:
-        defaults = {}
+    return _build_sensors_schema(_freeze_defaults(defaults))
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_sensors_schema(frozen_defaults: tuple) -> vol.Schema:
+    """Build and cache the additional sensors schema."""
+    defaults = dict(frozen_defaults)
 
     _, sensor_filter, weather_filter = get_entity_selectors()
 
@@ -185,6 +306,12 @@ def create_sensors_schema(defaults: dict = None) -> vol.Schema:
             EntitySelectorConfig(filter=weather_filter)
         )
 
+    schema_dict[
+        vol.Optional(
+            CONF_FORECAST, default=defaults.get(CONF_FORECAST, DEFAULT_FORECAST)
+        )
+    ] = get_forecast_selector()
+
     sensor_configs = [
         (CONF_SENSOR_1, CONF_SENSOR_1_NAME),
         (CONF_SENSOR_2, CONF_SENSOR_2_NAME),
@@ -205,6 +332,25 @@ def create_sensors_schema(defaults: dict = None) -> vol.Schema:
 
         schema_dict[vol.Optional(name_key, default=defaults.get(name_key, ""))] = str
 
+    schema_dict[
+        vol.Optional(CONF_LAYOUT, default=defaults.get(CONF_LAYOUT, DEFAULT_LAYOUT))
+    ] = get_layout_selector()
+
+    schema_dict[
+        vol.Optional(CONF_PAGING, default=defaults.get(CONF_PAGING, False))
+    ] = BooleanSelector()
+
+    schema_dict[
+        vol.Optional(CONF_IAQ, default=defaults.get(CONF_IAQ, False))
+    ] = BooleanSelector()
+
+    schema_dict[
+        vol.Optional(
+            CONF_AGGREGATION,
+            default=defaults.get(CONF_AGGREGATION, DEFAULT_AGGREGATION),
+        )
+    ] = get_aggregation_selector()
+
     # Add decimal places at the end, before include IDs
     schema_dict[
         vol.Optional(
@@ -221,11 +367,238 @@ def create_sensors_schema(defaults: dict = None) -> vol.Schema:
     return vol.Schema(schema_dict)
 
 
-async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, str]:
-    """Validate the user input and create entry title."""
+def create_options_schema(defaults: dict = None) -> vol.Schema:
+    """Create the combined options schema with all fields."""
+    return _build_options_schema(_freeze_defaults(defaults))
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_options_schema(frozen_defaults: tuple) -> vol.Schema:
+    """Build and cache the combined options schema."""
+    defaults = dict(frozen_defaults)
+
+    co2_filter, sensor_filter, weather_filter = get_entity_selectors()
+
+    sensor_selector = EntitySelector(
+        EntitySelectorConfig(
+            filter=sensor_filter,
+            multiple=False,
+        )
+    )
+
+    # Basic configuration fields
+    schema_dict = {
+        vol.Required(CONF_URL, default=defaults.get(CONF_URL, DEFAULT_URL)): str,
+        vol.Optional(
+            CONF_TRANSPORT, default=defaults.get(CONF_TRANSPORT, DEFAULT_TRANSPORT)
+        ): get_transport_selector(),
+    }
+
+    # Handle CO2 sensor similar to other sensors in options
+    co2_default = defaults.get(CONF_CO2_SENSOR)
+    if co2_default and co2_default.strip() and co2_default != "None":
+        schema_dict[
+            vol.Optional(CONF_CO2_SENSOR, default=co2_default)
+        ] = EntitySelector(EntitySelectorConfig(filter=co2_filter))
+    else:
+        schema_dict[vol.Optional(CONF_CO2_SENSOR)] = EntitySelector(
+            EntitySelectorConfig(filter=co2_filter)
+        )
+
+    schema_dict[
+        vol.Optional(CONF_CO2_NAME, default=defaults.get(CONF_CO2_NAME, "CO2"))
+    ] = str
+
+    # Weather provider - handle similar to other sensors
+    weather_default = defaults.get(CONF_WEATHER_PROVIDER)
+    if weather_default and weather_default.strip() and weather_default != "None":
+        schema_dict[
+            vol.Optional(CONF_WEATHER_PROVIDER, default=weather_default)
+        ] = EntitySelector(EntitySelectorConfig(filter=weather_filter))
+    else:
+        schema_dict[vol.Optional(CONF_WEATHER_PROVIDER)] = EntitySelector(
+            EntitySelectorConfig(filter=weather_filter)
+        )
+
+    schema_dict[
+        vol.Optional(
+            CONF_FORECAST, default=defaults.get(CONF_FORECAST, DEFAULT_FORECAST)
+        )
+    ] = get_forecast_selector()
+
+    # Sensor configuration fields
+    sensor_configs = [
+        (CONF_SENSOR_1, CONF_SENSOR_1_NAME),
+        (CONF_SENSOR_2, CONF_SENSOR_2_NAME),
+        (CONF_SENSOR_3, CONF_SENSOR_3_NAME),
+        (CONF_SENSOR_4, CONF_SENSOR_4_NAME),
+        (CONF_SENSOR_5, CONF_SENSOR_5_NAME),
+        (CONF_SENSOR_6, CONF_SENSOR_6_NAME),
+    ]
+
+    for sensor_key, name_key in sensor_configs:
+        sensor_default = defaults.get(sensor_key)
+        if sensor_default and sensor_default.strip() and sensor_default != "None":
+            schema_dict[
+                vol.Optional(sensor_key, default=sensor_default)
+            ] = sensor_selector
+        else:
+            schema_dict[vol.Optional(sensor_key)] = sensor_selector
+
+        schema_dict[vol.Optional(name_key, default=defaults.get(name_key, ""))] = str
+
+    # Group configuration fields
+    sources_selector, function_selector = get_group_selectors()
+    for sources_key, function_key, name_key, _ in GROUPS:
+        schema_dict[
+            vol.Optional(sources_key, default=list(defaults.get(sources_key) or []))
+        ] = sources_selector
+        schema_dict[
+            vol.Optional(
+                function_key,
+                default=defaults.get(function_key) or DEFAULT_GROUP_FUNCTION,
+            )
+        ] = function_selector
+        schema_dict[vol.Optional(name_key, default=defaults.get(name_key) or "")] = str
+
+    # Misc configuration fields
+
+    schema_dict[
+        vol.Optional(
+            CONF_UPDATE_INTERVAL_MINUTES,
+            default=defaults.get(CONF_UPDATE_INTERVAL_MINUTES, DEFAULT_UPDATE_INTERVAL),
+        )
+    ] = NumberSelector(
+        NumberSelectorConfig(
+            min=MIN_UPDATE_INTERVAL,
+            max=MAX_UPDATE_INTERVAL,
+            step=5,
+            unit_of_measurement="minutes",
+            mode=NumberSelectorMode.SLIDER,
+        )
+    )
+
+    schema_dict[
+        vol.Optional(
+            CONF_DECIMAL_PLACES,
+            default=defaults.get(CONF_DECIMAL_PLACES, DEFAULT_DECIMAL_PLACES),
+        )
+    ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=4))
+
+    schema_dict[
+        vol.Optional(CONF_LAYOUT, default=defaults.get(CONF_LAYOUT, DEFAULT_LAYOUT))
+    ] = get_layout_selector()
+
+    schema_dict[
+        vol.Optional(CONF_PAGING, default=defaults.get(CONF_PAGING, False))
+    ] = BooleanSelector()
+
+    schema_dict[
+        vol.Optional(CONF_IAQ, default=defaults.get(CONF_IAQ, False))
+    ] = BooleanSelector()
+
+    schema_dict[
+        vol.Optional(
+            CONF_AGGREGATION,
+            default=defaults.get(CONF_AGGREGATION, DEFAULT_AGGREGATION),
+        )
+    ] = get_aggregation_selector()
+
+    schema_dict[
+        vol.Optional(
+            CONF_DEADBAND_SCALE,
+            default=defaults.get(CONF_DEADBAND_SCALE, DEFAULT_DEADBAND_SCALE),
+        )
+    ] = NumberSelector(
+        NumberSelectorConfig(
+            min=0,
+            max=MAX_DEADBAND_SCALE,
+            step=0.5,
+            mode=NumberSelectorMode.SLIDER,
+        )
+    )
+
+    schema_dict[
+        vol.Optional(
+            CONF_HEARTBEAT_MINUTES,
+            default=defaults.get(CONF_HEARTBEAT_MINUTES, DEFAULT_HEARTBEAT_MINUTES),
+        )
+    ] = NumberSelector(
+        NumberSelectorConfig(
+            min=MIN_HEARTBEAT_MINUTES,
+            max=MAX_HEARTBEAT_MINUTES,
+            step=10,
+            unit_of_measurement="minutes",
+            mode=NumberSelectorMode.BOX,
+        )
+    )
+
+    schema_dict[
+        vol.Optional(CONF_INCLUDE_IDS, default=defaults.get(CONF_INCLUDE_IDS, False))
+    ] = BooleanSelector()
+
+    return vol.Schema(schema_dict)
+
+
+def estimate_headroom(hass: HomeAssistant, data: dict) -> int | None:
+    """Return the bytes left below the transport payload limit for the chosen sensors."""
+    from .payload_utils import estimate_payload_size
+    from .sensor_processor import SensorProcessor
+    from .transport import create_transport
+
+    payload = SensorProcessor(hass, None).compose_payload(data, trim=False)[0]
+    if payload is None:
+        return None
+    return create_transport(hass, data).max_payload_size - estimate_payload_size(
+        payload
+    )
+
+
+async def validate_input(
+    hass: HomeAssistant, data: dict, probe_webhook: bool = True
+) -> dict:
+    """Validate the user input, probe the webhook and create entry title.
+
+    The webhook probe is started before the entities are validated, so its
+    request is in flight meanwhile, and is bounded by a short timeout, so a
+    slow endpoint does not stall the flow. Without probe_webhook only the
+    entities are validated.
+    """
+    from .transport import create_transport
+
     if not data[CONF_URL].startswith(("http://", "https://")):
         raise InvalidURL("URL must start with http:// or https://")
 
+    probe = None
+    if probe_webhook:
+        probe = hass.async_create_task(create_transport(hass, data).async_probe())
+        # Let the probe send its request before the validation below runs.
+        await asyncio.sleep(0)
+    try:
+        info = _validate_entities(hass, data)
+        info["headroom"] = estimate_headroom(hass, data)
+        if probe is None:
+            return info
+
+        try:
+            latency = await probe
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise CannotConnect(f"Webhook probe failed: {err}") from err
+    finally:
+        if probe is not None:
+            probe.cancel()
+
+    info["latency_ms"] = round(latency * 1000)
+    _LOGGER.info(
+        "Webhook responded in %d ms, payload headroom %s bytes",
+        info["latency_ms"],
+        info["headroom"],
+    )
+    return info
+
+
+def _validate_entities(hass: HomeAssistant, data: dict) -> dict:
+    """Validate the configured entities and create entry title."""
     if data.get(CONF_CO2_SENSOR):
         co2_state = hass.states.get(data[CONF_CO2_SENSOR])
         if not co2_state:
@@ -259,6 +632,11 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict[str, str]:
             if not sensor_state:
                 raise InvalidEntity(f"Sensor {sensor_id} not found")
 
+    for sources_key, _, _, _ in GROUPS:
+        for source_id in data.get(sources_key) or []:
+            if not hass.states.get(source_id):
+                raise InvalidEntity(f"Group source {source_id} not found")
+
     title_parts = ["TRMNL Weather"]
 
     if data.get(CONF_CO2_SENSOR):
@@ -323,18 +701,38 @@ class TrmnlWeatherConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_sensors(self, user_input: dict | None = None) -> FlowResult:
         """Handle the sensors configuration step."""
+        from .transport import create_transport
+
         if user_input is not None:
             cleaned_input = clean_sensor_data(user_input)
             final_data = {**self.data, **cleaned_input}
 
             try:
                 info = await validate_input(self.hass, final_data)
-                return self.async_create_entry(title=info["title"], data=final_data)
+                return self.async_create_entry(
+                    title=info["title"],
+                    data=final_data,
+                    description_placeholders={
+                        "latency_ms": str(info["latency_ms"]),
+                        "headroom": str(info["headroom"]),
+                        "max_size": str(
+                            create_transport(self.hass, final_data).max_payload_size
+                        ),
+                    },
+                )
 
             except InvalidURL:
                 _LOGGER.error("URL validation failed in sensors step")
                 return await self.async_step_user()
 
+            except CannotConnect as ex:
+                _LOGGER.warning("Webhook not reachable: %s", ex)
+                return self.async_show_form(
+                    step_id="user",
+                    data_schema=create_basic_schema(defaults=self.data),
+                    errors={"base": "cannot_connect"},
+                )
+
             except InvalidEntity as ex:
                 _LOGGER.warning("Invalid entity in sensors step: %s", ex)
                 return self.async_show_form(
@@ -391,7 +789,17 @@ class TrmnlWeatherOptionsFlowHandler(config_entries.OptionsFlow):
                     raise InvalidURL("URL must start with http:// or https://")
 
                 cleaned_input = clean_sensor_data(user_input)
-                await validate_input(self.hass, cleaned_input)
+                # Only a new webhook URL needs probing, other edits save
+                # even while the webhook is unreachable.
+                current_url = {
+                    **self.config_entry.data,
+                    **self.config_entry.options,
+                }.get(CONF_URL)
+                await validate_input(
+                    self.hass,
+                    cleaned_input,
+                    probe_webhook=cleaned_input[CONF_URL] != current_url,
+                )
 
                 return self.async_create_entry(title="", data=cleaned_input)
 
@@ -399,6 +807,10 @@ class TrmnlWeatherOptionsFlowHandler(config_entries.OptionsFlow):
                 errors["base"] = "invalid_url"
                 _LOGGER.warning("Invalid URL in options: %s", user_input.get(CONF_URL))
 
+            except CannotConnect as ex:
+                errors["base"] = "cannot_connect"
+                _LOGGER.warning("Webhook not reachable in options: %s", ex)
+
             except InvalidEntity as ex:
                 errors["base"] = "invalid_entity"
                 _LOGGER.warning("Invalid entity in options: %s", ex)
@@ -450,102 +862,7 @@ class TrmnlWeatherOptionsFlowHandler(config_entries.OptionsFlow):
 
     def _create_combined_options_schema(self, defaults: dict) -> vol.Schema:
         """Create the combined options schema with all fields."""
-        co2_filter, sensor_filter, weather_filter = get_entity_selectors()
-
-        sensor_selector = EntitySelector(
-            EntitySelectorConfig(
-                filter=sensor_filter,
-                multiple=False,
-            )
-        )
-
-        # Basic configuration fields
-        schema_dict = {
-            vol.Required(CONF_URL, default=defaults.get(CONF_URL, DEFAULT_URL)): str,
-        }
-
-        # Handle CO2 sensor similar to other sensors in options
-        co2_default = defaults.get(CONF_CO2_SENSOR)
-        if co2_default and co2_default.strip() and co2_default != "None":
-            schema_dict[
-                vol.Optional(CONF_CO2_SENSOR, default=co2_default)
-            ] = EntitySelector(EntitySelectorConfig(filter=co2_filter))
-        else:
-            schema_dict[vol.Optional(CONF_CO2_SENSOR)] = EntitySelector(
-                EntitySelectorConfig(filter=co2_filter)
-            )
-
-        schema_dict[
-            vol.Optional(CONF_CO2_NAME, default=defaults.get(CONF_CO2_NAME, "CO2"))
-        ] = str
-
-        # Weather provider - handle similar to other sensors
-        weather_default = defaults.get(CONF_WEATHER_PROVIDER)
-        if weather_default and weather_default.strip() and weather_default != "None":
-            schema_dict[
-                vol.Optional(CONF_WEATHER_PROVIDER, default=weather_default)
-            ] = EntitySelector(EntitySelectorConfig(filter=weather_filter))
-        else:
-            schema_dict[vol.Optional(CONF_WEATHER_PROVIDER)] = EntitySelector(
-                EntitySelectorConfig(filter=weather_filter)
-            )
-
-        # Sensor configuration fields
-        sensor_configs = [
-            (CONF_SENSOR_1, CONF_SENSOR_1_NAME),
-            (CONF_SENSOR_2, CONF_SENSOR_2_NAME),
-            (CONF_SENSOR_3, CONF_SENSOR_3_NAME),
-            (CONF_SENSOR_4, CONF_SENSOR_4_NAME),
-            (CONF_SENSOR_5, CONF_SENSOR_5_NAME),
-            (CONF_SENSOR_6, CONF_SENSOR_6_NAME),
-        ]
-
-        for sensor_key, name_key in sensor_configs:
-            sensor_default = defaults.get(sensor_key)
-            if sensor_default and sensor_default.strip() and sensor_default != "None":
-                schema_dict[
-                    vol.Optional(sensor_key, default=sensor_default)
-                ] = sensor_selector
-            else:
-                schema_dict[vol.Optional(sensor_key)] = sensor_selector
-
-            schema_dict[
-                vol.Optional(name_key, default=defaults.get(name_key, ""))
-            ] = str
-
-        # Misc configuration fields
-
-        schema_dict[
-            vol.Optional(
-                CONF_UPDATE_INTERVAL_MINUTES,
-                default=defaults.get(
-                    CONF_UPDATE_INTERVAL_MINUTES, DEFAULT_UPDATE_INTERVAL
-                ),
-            )
-        ] = NumberSelector(
-            NumberSelectorConfig(
-                min=MIN_UPDATE_INTERVAL,
-                max=MAX_UPDATE_INTERVAL,
-                step=5,
-                unit_of_measurement="minutes",
-                mode=NumberSelectorMode.SLIDER,
-            )
-        )
-
-        schema_dict[
-            vol.Optional(
-                CONF_DECIMAL_PLACES,
-                default=defaults.get(CONF_DECIMAL_PLACES, DEFAULT_DECIMAL_PLACES),
-            )
-        ] = vol.All(vol.Coerce(int), vol.Range(min=0, max=4))
-
-        schema_dict[
-            vol.Optional(
-                CONF_INCLUDE_IDS, default=defaults.get(CONF_INCLUDE_IDS, False)
-            )
-        ] = BooleanSelector()
-
-        return vol.Schema(schema_dict)
+        return create_options_schema(defaults)
 
 
 class CannotConnect(HomeAssistantError):
@@ -20,6 +20,20 @@ CONF_INCLUDE_IDS = "include_ids"
 CONF_DECIMAL_PLACES = "decimal_places"
 CONF_UPDATE_INTERVAL_MINUTES = "update_interval_minutes"
 CONF_WEATHER_PROVIDER = "weather_provider"
+CONF_LAYOUT = "layout"
+CONF_AGGREGATION = "aggregation"
+CONF_DEADBAND_SCALE = "deadband_scale"
+CONF_HEARTBEAT_MINUTES = "heartbeat_minutes"
+CONF_FORECAST = "forecast"
+CONF_PAGING = "paging"
+CONF_IAQ = "iaq"
+CONF_TRANSPORT = "transport"
+CONF_GROUP_1_SOURCES = "group_1_sources"
+CONF_GROUP_1_FUNCTION = "group_1_function"
+CONF_GROUP_1_NAME = "group_1_name"
+CONF_GROUP_2_SOURCES = "group_2_sources"
+CONF_GROUP_2_FUNCTION = "group_2_function"
+CONF_GROUP_2_NAME = "group_2_name"
 
 DEFAULT_URL = ""
 MIN_TIME_BETWEEN_UPDATES = 10
@@ -30,6 +44,130 @@ MAX_UPDATE_INTERVAL = 180  # 3 hours
 
 MAX_PAYLOAD_SIZE = 2048
 
+# Payload targeting: either one TRMNL layout or a union serving all of them.
+LAYOUT_ALL = "all"
+DEFAULT_LAYOUT = LAYOUT_ALL
+
+# Number of non-primary sensors each TRMNL layout has room for.
+LAYOUT_CAPACITY = {
+    "full": 6,
+    "half_horizontal": 4,
+    "half_vertical": 4,
+    "quadrant": 5,
+}
+
+# Aggregation of sensor values over the window between two pushes.
+AGGREGATION_LAST = "last"
+AGGREGATION_MEAN = "mean"
+AGGREGATION_EMA = "ema"
+AGGREGATION_MAX = "max"
+AGGREGATION_AUTO = "auto"
+AGGREGATION_MODES = [
+    AGGREGATION_LAST,
+    AGGREGATION_MEAN,
+    AGGREGATION_EMA,
+    AGGREGATION_MAX,
+    AGGREGATION_AUTO,
+]
+DEFAULT_AGGREGATION = AGGREGATION_LAST
+EMA_TIME_CONSTANT = 300  # seconds
+
+# Aggregation used per device class in auto mode, others show the last value.
+AGGREGATION_BY_DEVICE_CLASS = {
+    "carbon_dioxide": AGGREGATION_MEAN,
+    "carbon_monoxide": AGGREGATION_MAX,
+    "humidity": AGGREGATION_MEAN,
+    "illuminance": AGGREGATION_EMA,
+    "irradiance": AGGREGATION_EMA,
+    "pm1": AGGREGATION_MAX,
+    "pm25": AGGREGATION_MAX,
+    "pm10": AGGREGATION_MAX,
+    "precipitation_intensity": AGGREGATION_MAX,
+    "sound_pressure": AGGREGATION_EMA,
+    "speed": AGGREGATION_MAX,
+    "temperature": AGGREGATION_MEAN,
+    "volatile_organic_compounds": AGGREGATION_MAX,
+    "volatile_organic_compounds_parts": AGGREGATION_MAX,
+    "wind_speed": AGGREGATION_MAX,
+}
+
+# Unchanged or insignificant payloads are still re-sent this often.
+DEFAULT_HEARTBEAT_MINUTES = 60
+MIN_HEARTBEAT_MINUTES = 10
+MAX_HEARTBEAT_MINUTES = 1440  # 24 hours
+
+# Deadbands are multiplied by this scale, 0 disables significance filtering.
+DEFAULT_DEADBAND_SCALE = 0
+MAX_DEADBAND_SCALE = 5
+
+# Forecast summary of the weather provider, refreshed outside the push path.
+FORECAST_OFF = "off"
+FORECAST_DAILY = "daily"
+FORECAST_HOURLY = "hourly"
+FORECAST_TYPES = [FORECAST_OFF, FORECAST_DAILY, FORECAST_HOURLY]
+DEFAULT_FORECAST = FORECAST_DAILY
+FORECAST_ENTRIES = 4
+FORECAST_REFRESH_INTERVAL = 1800  # seconds
+FORECAST_CACHE_TTL = 7200  # seconds
+FORECAST_TIMEOUT = 30  # seconds
+
+# Group entities, one value aggregated over several source entities.
+GROUP_MIN = "min"
+GROUP_MAX = "max"
+GROUP_MEAN = "mean"
+GROUP_MEDIAN = "median"
+GROUP_FUNCTIONS = [GROUP_MEAN, GROUP_MEDIAN, GROUP_MIN, GROUP_MAX]
+DEFAULT_GROUP_FUNCTION = GROUP_MEAN
+# Sources, function and name of each group, and its payload entity type.
+GROUPS = [
+    (CONF_GROUP_1_SOURCES, CONF_GROUP_1_FUNCTION, CONF_GROUP_1_NAME, "group_1"),
+    (CONF_GROUP_2_SOURCES, CONF_GROUP_2_FUNCTION, CONF_GROUP_2_NAME, "group_2"),
+]
+
+REQUEST_TIMEOUT = 30  # seconds
+PROBE_TIMEOUT = 5  # seconds
+
+# Transports delivering payloads, each with its own size and rate limits.
+# Rate limits are (requests, period in seconds) over a rolling window.
+TRANSPORT_WEBHOOK = "webhook"
+TRANSPORT_LAN = "lan"
+TRANSPORTS = [TRANSPORT_WEBHOOK, TRANSPORT_LAN]
+DEFAULT_TRANSPORT = TRANSPORT_WEBHOOK
+WEBHOOK_RATE_LIMIT = (12, 3600)
+LAN_MAX_PAYLOAD_SIZE = 4096
+LAN_RATE_LIMIT = (60, 60)
+LAN_REQUEST_TIMEOUT = 5  # seconds
+
+STORAGE_VERSION = 1
+PUSH_STATE_SAVE_DELAY = 10  # seconds
+MIN_BACKOFF_SECONDS = 60
+MAX_BACKOFF_SECONDS = 1800  # 30 minutes
+
+# Payload budgets learned per target. They start at the size limit of the
+# transport, shrink when the server rejects a payload as too large and grow
+# by a step after sustained successful pushes of trimmed payloads.
+WEBHOOK_MAX_BUDGET = 5120
+LAN_MAX_BUDGET = 16384
+BUDGET_MIN_SIZE = 512
+BUDGET_SHRINK_FACTOR = 0.8
+BUDGET_PROBE_STEP = 256
+BUDGET_PROBE_SUCCESSES = 24
+BUDGET_MAX_PROBE_SUCCESSES = 384  # after repeatedly rejected probes
+BUDGET_RETRIES = 2  # trimmed resends after a size rejection
+
+# Merge variables served to devices polling Home Assistant.
+POLL_URL = "/api/trmnl_weather_station/{entry_id}/merge_variables"
+POLL_CACHE_MAX_AGE = 300  # seconds
+
+# Display images rendered by the integration, matching the Liquid gauge range.
+IMAGE_URL = "/api/trmnl_weather_station/{entry_id}/image.{image_format}"
+IMAGE_WIDTH = 800
+IMAGE_HEIGHT = 480
+IMAGE_FORMATS = ("png", "bmp")
+RENDER_CACHE_SIZE = 4
+CO2_GAUGE_MIN = 400
+CO2_GAUGE_MAX = 2000
+
 WEATHER_SENSOR_DEVICE_CLASSES = [
     "apparent_power",
     "aqi",
@@ -92,3 +230,187 @@ OTHER_SENSOR_DEVICE_CLASSES = [
 ]
 
 SENSOR_DEVICE_CLASSES = WEATHER_SENSOR_DEVICE_CLASSES + OTHER_SENSOR_DEVICE_CLASSES
+
+# Deadbands (absolute, percentage) a weather sensor has to move out of before
+# its change is significant. When both are set, both must be exceeded.
+SIGNIFICANCE_THRESHOLDS = {
+    "apparent_power": (10.0, 5.0),
+    "aqi": (1.0, 5.0),
+    "atmospheric_pressure": (1.0, None),
+    "carbon_dioxide": (20.0, 2.0),
+    "carbon_monoxide": (1.0, 5.0),
+    "conductivity": (None, 5.0),
+    "humidity": (2.0, None),
+    "illuminance": (10.0, 10.0),
+    "irradiance": (10.0, 10.0),
+    "nitrogen_dioxide": (1.0, 5.0),
+    "nitrogen_monoxide": (1.0, 5.0),
+    "nitrous_oxide": (1.0, 5.0),
+    "ozone": (1.0, 5.0),
+    "pm1": (1.0, 5.0),
+    "pm25": (1.0, 5.0),
+    "pm10": (1.0, 5.0),
+    "precipitation": (0.1, None),
+    "precipitation_intensity": (0.1, 10.0),
+    "sound_pressure": (3.0, None),
+    "speed": (1.0, 10.0),
+    "sulphur_dioxide": (1.0, 5.0),
+    "temperature": (0.5, None),
+    "volatile_organic_compounds": (5.0, 5.0),
+    "volatile_organic_compounds_parts": (5.0, 5.0),
+    "wind_direction": (15.0, None),
+    "wind_speed": (1.0, 10.0),
+}
+
+DEFAULT_ICON = "mdi-gauge"
+DEFAULT_WEATHER_ICON = "mdi-weather-cloudy"
+
+# Material Design icon classes rendered on the display per device class.
+DEVICE_CLASS_ICONS = {
+    "apparent_power": "mdi-flash",
+    "aqi": "mdi-air-filter",
+    "area": "mdi-vector-square",
+    "atmospheric_pressure": "mdi-gauge",
+    "battery": "mdi-battery",
+    "blood_glucose_concentration": "mdi-water-percent",
+    "carbon_dioxide": "mdi-molecule-co2",
+    "carbon_monoxide": "mdi-molecule",
+    "conductivity": "mdi-alpha-c-circle",
+    "current": "mdi-current-ac",
+    "data_rate": "mdi-server-network",
+    "data_size": "mdi-database",
+    "date": "mdi-calendar",
+    "distance": "mdi-ruler",
+    "duration": "mdi-timer",
+    "energy": "mdi-lightning-bolt",
+    "energy_distance": "mdi-factory",
+    "energy_storage": "mdi-battery-charging",
+    "enum": "mdi-format-list-bulleted",
+    "frequency": "mdi-sine-wave",
+    "gas": "mdi-gas-cylinder",
+    "humidity": "mdi-water-percent",
+    "illuminance": "mdi-brightness-6",
+    "irradiance": "mdi-weather-sunny",
+    "moisture": "mdi-water",
+    "monetary": "mdi-currency-usd",
+    "nitrogen_dioxide": "mdi-molecule",
+    "nitrogen_monoxide": "mdi-molecule",
+    "nitrous_oxide": "mdi-molecule",
+    "ozone": "mdi-shield-sun",
+    "pH": "mdi-water",
+    "pm1": "mdi-air-filter",
+    "pm25": "mdi-air-filter",
+    "pm10": "mdi-air-filter",
+    "power": "mdi-flash",
+    "power_factor": "mdi-percent",
+    "precipitation": "mdi-weather-pouring",
+    "precipitation_intensity": "mdi-weather-rainy",
+    "reactive_energy": "mdi-flash-triangle",
+    "reactive_power": "mdi-flash-outline",
+    "signal_strength": "mdi-signal",
+    "sound_pressure": "mdi-volume-high",
+    "speed": "mdi-speedometer",
+    "sulphur_dioxide": "mdi-molecule",
+    "temperature": "mdi-thermometer",
+    "timestamp": "mdi-clock-outline",
+    "volatile_organic_compounds": "mdi-chemical-weapon",
+    "volatile_organic_compounds_parts": "mdi-chemical-weapon",
+    "voltage": "mdi-flash-circle",
+    "volume": "mdi-cube",
+    "volume_flow_rate": "mdi-water-pump",
+    "volume_storage": "mdi-harddisk",
+    "water": "mdi-water",
+    "weight": "mdi-scale-bathroom",
+    "wind_direction": "mdi-compass",
+    "wind_speed": "mdi-weather-windy",
+}
+
+WEATHER_CONDITION_ICONS = {
+    "clear-night": "mdi-weather-night",
+    "cloudy": "mdi-weather-cloudy",
+    "fog": "mdi-weather-fog",
+    "hail": "mdi-weather-hail",
+    "lightning": "mdi-weather-lightning",
+    "lightning-rainy": "mdi-weather-lightning-rainy",
+    "partlycloudy": "mdi-weather-partly-cloudy",
+    "pouring": "mdi-weather-pouring",
+    "rainy": "mdi-weather-rainy",
+    "snowy": "mdi-weather-snowy",
+    "snowy-rainy": "mdi-weather-snowy-rainy",
+    "sunny": "mdi-weather-sunny",
+    "windy": "mdi-weather-windy",
+    "windy-variant": "mdi-weather-cloudy-arrow-right",
+    "exceptional": "mdi-alert-circle",
+}
+
+# Upper bounds (exclusive, ppm) of the CO2 rating bands, the last band is open.
+CO2_RATING_BANDS = [
+    (800, "Excellent"),
+    (1000, "Good"),
+    (1500, "Fair"),
+    (None, "Poor"),
+]
+
+# Breakpoints (value, score) of the indoor air quality sub-score per device
+# class, interpolated linearly and clamped beyond the first and last point.
+# Scores run from 100 for clean air down to 0.
+IAQ_BREAKPOINTS = {
+    "carbon_dioxide": ((600, 100), (1000, 75), (1500, 40), (2500, 0)),  # ppm
+    # µg/m³
+    "volatile_organic_compounds": ((300, 100), (1000, 60), (3000, 20), (10000, 0)),
+    # ppb
+    "volatile_organic_compounds_parts": ((65, 100), (220, 60), (660, 20), (2200, 0)),
+    "pm25": ((5, 100), (15, 75), (35, 40), (75, 0)),  # µg/m³
+    "humidity": ((20, 0), (30, 60), (40, 100), (60, 100), (70, 60), (80, 0)),  # %
+}
+IAQ_WEIGHTS = {
+    "carbon_dioxide": 0.35,
+    "volatile_organic_compounds": 0.25,
+    "volatile_organic_compounds_parts": 0.25,
+    "pm25": 0.3,
+    "humidity": 0.1,
+}
+# The score is at most this far above the worst sub-score, so a single bad
+# reading is not averaged away by good ones.
+IAQ_WORST_MARGIN = 20
+# Lower score bound and rating of each band, best first.
+IAQ_RATING_BANDS = [
+    (80, "Excellent"),
+    (60, "Good"),
+    (40, "Fair"),
+    (None, "Poor"),
+]
+
+# Number of recent push traces kept for the diagnostics download.
+TRACE_BUFFER_SIZE = 50
+
+SERVICE_PROFILE = "profile"
+SERVICE_PUSH_NOW = "push_now"
+SERVICE_RECORD = "record"
+ATTR_ENTRY_ID = "entry_id"
+ATTR_TICKS = "ticks"
+ATTR_SEND = "send"
+ATTR_CPROFILE = "cprofile"
+ATTR_ENABLED = "enabled"
+DEFAULT_PROFILE_TICKS = 10
+MAX_PROFILE_TICKS = 1000
+
+# State recordings for offline replay.
+RECORDING_VERSION = 1
+RECORDED_ATTRIBUTES = (
+    "friendly_name",
+    "unit_of_measurement",
+    "device_class",
+    "icon",
+    "battery_percent",
+)
+
+# Outcomes of a push attempt.
+PUSH_SENT = "sent"
+PUSH_FAILED = "failed"
+PUSH_BUILT = "built"
+PUSH_NO_DATA = "no_data"
+PUSH_SKIPPED_UNCHANGED = "skipped_unchanged"
+PUSH_SKIPPED_BACKOFF = "skipped_backoff"
+PUSH_SKIPPED_INSIGNIFICANT = "skipped_insignificant"
+PUSH_SKIPPED_RATE_LIMITED = "skipped_rate_limited"
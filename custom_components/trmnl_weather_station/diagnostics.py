@@ -0,0 +1,42 @@
+"""Diagnostics support for TRMNL Weather Station."""
+
+from __future__ import annotations
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_URL, DOMAIN
+
+# The webhook URL embeds the plugin UUID, which grants write access.
+TO_REDACT = {CONF_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict:
+    """Return diagnostics for a config entry with its recent push traces."""
+    diagnostics = {
+        "entry": async_redact_data(
+            {"data": dict(entry.data), "options": dict(entry.options)}, TO_REDACT
+        ),
+    }
+
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if not data or "processor" not in data:
+        return diagnostics
+
+    processor = data["processor"]
+    config = data["config"]
+    # Peek, so that looking at an unknown target does not create it.
+    target = data["push_state"].peek(config.get(CONF_URL)) or {}
+    diagnostics["target"] = {
+        "transport": processor.transport_for(config).name,
+        "payload_budget": processor.payload_budget(config),
+        "sent_at": target.get("sent_at"),
+        "failures": target.get("failures", 0),
+        "retry_after": target.get("retry_after"),
+        "pending": target.get("pending") is not None,
+    }
+    diagnostics["traces"] = processor.traces.as_list()
+    return diagnostics
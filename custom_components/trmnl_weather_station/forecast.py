@@ -0,0 +1,177 @@
+"""Background-refreshed forecast summaries of weather providers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DOMAIN,
+    FORECAST_CACHE_TTL,
+    FORECAST_DAILY,
+    FORECAST_ENTRIES,
+    FORECAST_REFRESH_INTERVAL,
+    FORECAST_TIMEOUT,
+)
+from .payload_utils import resolve_weather_icon, round_sensor_value
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_FORECAST_CACHES = "forecast_caches"
+
+
+def compact_forecast(
+    forecast: list[dict], forecast_type: str, limit: int = FORECAST_ENTRIES
+) -> list[dict]:
+    """Compact forecast entries into the short fields sent to the display."""
+    summary = []
+    for item in forecast[:limit]:
+        start = dt_util.parse_datetime(str(item.get("datetime", "")))
+        if start is None:
+            continue
+        start = dt_util.as_local(start)
+
+        entry = {
+            "t": start.strftime("%a" if forecast_type == FORECAST_DAILY else "%H:%M"),
+            "ic": resolve_weather_icon(item.get("condition")),
+        }
+        if item.get("temperature") is not None:
+            entry["hi"] = round_sensor_value(item["temperature"], 0)
+        if item.get("templow") is not None:
+            entry["lo"] = round_sensor_value(item["templow"], 0)
+        if item.get("precipitation_probability") is not None:
+            entry["p"] = round_sensor_value(item["precipitation_probability"], 0)
+        elif item.get("precipitation"):
+            entry["r"] = round_sensor_value(item["precipitation"], 1)
+        summary.append(entry)
+    return summary
+
+
+class ForecastCache:
+    """Cache the compact forecast of one weather provider with a TTL.
+
+    Forecasts are fetched through the weather.get_forecasts service on a
+    fixed cadence, independently of pushes. Pushes only read the cache, so a
+    slow or rate-limited forecast source never delays them. Entries showing
+    the same provider share one cache, see async_acquire_forecast_cache.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entity_id: str,
+        forecast_type: str,
+        ttl: float = FORECAST_CACHE_TTL,
+    ):
+        """Initialize the cache."""
+        self.hass = hass
+        self.entity_id = entity_id
+        self.forecast_type = forecast_type
+        self.ttl = ttl
+        self._fetched_at: float | None = None
+        self._summary: list[dict] = []
+        self.users = 0
+        self._unsub = None
+        self._refresh_task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Refresh now and on the refresh interval, in the background."""
+
+        @callback
+        def _async_schedule_refresh(*_) -> None:
+            if self._refresh_task is not None and not self._refresh_task.done():
+                _LOGGER.debug("Forecast refresh still running, skipping")
+                return
+            # The cache outlives the entry that started it, so the refresh
+            # is not tied to an entry.
+            self._refresh_task = self.hass.async_create_background_task(
+                self.async_refresh(), f"{DOMAIN}_forecast_refresh"
+            )
+
+        _async_schedule_refresh()
+        self._unsub = async_track_time_interval(
+            self.hass,
+            _async_schedule_refresh,
+            timedelta(seconds=FORECAST_REFRESH_INTERVAL),
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop refreshing."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    async def async_refresh(self) -> bool:
+        """Fetch the forecast and update the cache, return whether it succeeded."""
+        try:
+            async with asyncio.timeout(FORECAST_TIMEOUT):
+                response = await self.hass.services.async_call(
+                    "weather",
+                    "get_forecasts",
+                    {"entity_id": self.entity_id, "type": self.forecast_type},
+                    blocking=True,
+                    return_response=True,
+                )
+        except Exception as err:
+            _LOGGER.warning(
+                "Failed to fetch %s forecast of %s: %s",
+                self.forecast_type,
+                self.entity_id,
+                err,
+            )
+            return False
+
+        forecast = (response or {}).get(self.entity_id, {}).get("forecast") or []
+        self._summary = compact_forecast(forecast, self.forecast_type)
+        self._fetched_at = dt_util.utcnow().timestamp()
+        _LOGGER.debug("Cached %d forecast entries of %s", len(forecast), self.entity_id)
+        return True
+
+    def get(self, now: float) -> list[dict] | None:
+        """Return the cached forecast summary if it has not expired."""
+        if self._fetched_at is None or now - self._fetched_at >= self.ttl:
+            return None
+        return self._summary
+
+
+@callback
+def async_acquire_forecast_cache(
+    hass: HomeAssistant, entity_id: str, forecast_type: str
+) -> ForecastCache:
+    """Return the shared cache of a provider and forecast type.
+
+    The cache is created and started for its first entry, so the forecast is
+    fetched once per provider however many entries show it.
+    """
+    caches = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_FORECAST_CACHES, {})
+    key = (entity_id, forecast_type)
+    if key not in caches:
+        caches[key] = ForecastCache(hass, entity_id, forecast_type)
+        caches[key].async_start()
+    cache = caches[key]
+    cache.users += 1
+    return cache
+
+
+@callback
+def async_release_forecast_cache(hass: HomeAssistant, cache: ForecastCache) -> None:
+    """Release an entry's use of a shared cache, stopping it after the last."""
+    cache.users -= 1
+    if cache.users > 0:
+        return
+
+    cache.async_stop()
+    caches = hass.data[DOMAIN][DATA_FORECAST_CACHES]
+    caches.pop((cache.entity_id, cache.forecast_type), None)
+    if not caches:
+        hass.data[DOMAIN].pop(DATA_FORECAST_CACHES)
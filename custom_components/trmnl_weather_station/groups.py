@@ -0,0 +1,143 @@
+"""Group entities, one payload entity aggregated over several source entities.
+
+A group stands in for a template sensor per aggregate, such as the mean
+temperature of all rooms, without writing extra states to Home Assistant.
+Sources may include group entities, which stand for their members.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from array import array
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, State
+
+from .aggregation import parse_numeric
+from .const import DEFAULT_GROUP_FUNCTION, GROUP_MAX, GROUP_MEDIAN, GROUP_MIN, GROUPS
+from .payload_utils import resolve_icon_class, round_sensor_value
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def get_groups(config: dict) -> list[tuple[list[str], str, str | None, str]]:
+    """Return the sources, function, name and entity type of each configured group."""
+    groups = []
+    for sources_key, function_key, name_key, group_type in GROUPS:
+        sources = [
+            source.strip()
+            for source in config.get(sources_key) or []
+            if isinstance(source, str) and source.strip()
+        ]
+        if sources:
+            groups.append(
+                (
+                    sources,
+                    config.get(function_key) or DEFAULT_GROUP_FUNCTION,
+                    config.get(name_key),
+                    group_type,
+                )
+            )
+    return groups
+
+
+def expand_sources(hass: HomeAssistant, sources: list[str]) -> list[str]:
+    """Return the sources with group entities replaced by their members."""
+    entity_ids = []
+    for entity_id in sources:
+        state = hass.states.get(entity_id)
+        members = state.attributes.get(ATTR_ENTITY_ID) if state else None
+        if isinstance(members, (list, tuple)):
+            entity_ids.extend(members)
+        else:
+            entity_ids.append(entity_id)
+    return list(dict.fromkeys(entity_ids))
+
+
+def reduce_values(values: array, function: str) -> float | None:
+    """Return the aggregate of values, or None without values."""
+    if not values:
+        return None
+    if function == GROUP_MIN:
+        return min(values)
+    if function == GROUP_MAX:
+        return max(values)
+    if function == GROUP_MEDIAN:
+        ordered = sorted(values)
+        middle = len(ordered) // 2
+        if len(ordered) % 2:
+            return ordered[middle]
+        return (ordered[middle - 1] + ordered[middle]) / 2
+    return math.fsum(values) / len(values)
+
+
+def group_name(function: str, device_class: str | None) -> str:
+    """Return the default display name of a group."""
+    if device_class:
+        return f"{function.capitalize()} {device_class.replace('_', ' ')}"
+    return function.capitalize()
+
+
+def create_group_payloads(
+    groups: list[tuple[list[State], str, str | None, str]], decimal_places: int = 1
+) -> list[dict]:
+    """Create the payload entities of groups with looked up source states.
+
+    The numeric source values of all groups are collected in one pass into a
+    single array and each group is reduced over its slice. Sources in another
+    unit than the first numeric source of their group are left out.
+    """
+    values = array("d")
+    slices = []
+    for states, _, _, group_type in groups:
+        start = len(values)
+        unit = device_class = None
+        for state in states:
+            value = parse_numeric(state.state)
+            if value is None:
+                continue
+            source_unit = state.attributes.get("unit_of_measurement")
+            if start == len(values):
+                unit = source_unit
+                device_class = state.attributes.get("device_class")
+            elif source_unit != unit:
+                _LOGGER.debug(
+                    "Skipping %s in %s, unit %s differs from %s",
+                    state.entity_id,
+                    group_type,
+                    source_unit,
+                    unit,
+                )
+                continue
+            values.append(value)
+        if device_class is None and states:
+            device_class = states[0].attributes.get("device_class")
+        slices.append((start, len(values), unit, device_class))
+
+    payloads = []
+    for (_, function, name, group_type), (start, end, unit, device_class) in zip(
+        groups, slices
+    ):
+        value = reduce_values(values[start:end], function)
+        payload = {
+            "val": (
+                "unavailable"
+                if value is None
+                else round_sensor_value(value, decimal_places)
+            ),
+            "type": group_type,
+            "agg": function,
+        }
+        if unit:
+            payload["u"] = unit
+        if name and name.strip():
+            payload["n"] = name.strip()
+        else:
+            payload["n"] = group_name(function, device_class)
+        # Deprecated, see create_entity_payload.
+        if device_class:
+            payload["device_class"] = device_class
+        payload["ic"] = resolve_icon_class(None, device_class)
+        payloads.append(payload)
+    return payloads
@@ -0,0 +1,72 @@
+"""Composite indoor air quality score from CO2, VOC, PM2.5 and humidity."""
+
+from __future__ import annotations
+
+import math
+from array import array
+
+from homeassistant.core import State
+
+from .const import IAQ_BREAKPOINTS, IAQ_RATING_BANDS, IAQ_WEIGHTS, IAQ_WORST_MARGIN
+
+# VOC sensors report either a mass concentration or parts, only one is used.
+_VOC_CLASSES = ("volatile_organic_compounds", "volatile_organic_compounds_parts")
+
+
+def iaq_states(states: list[State]) -> list[State]:
+    """Return the first state of each device class that goes into the score."""
+    selected = {}
+    for state in states:
+        device_class = state.attributes.get("device_class")
+        if device_class not in IAQ_BREAKPOINTS or device_class in selected:
+            continue
+        if device_class in _VOC_CLASSES and any(
+            voc_class in selected for voc_class in _VOC_CLASSES
+        ):
+            continue
+        selected[device_class] = state
+    return list(selected.values())
+
+
+def sub_score(value: float, breakpoints: tuple) -> float:
+    """Interpolate the sub-score of a value between its breakpoints."""
+    lower_value, lower_score = breakpoints[0]
+    if value <= lower_value:
+        return float(lower_score)
+    for upper_value, upper_score in breakpoints[1:]:
+        if value <= upper_value:
+            fraction = (value - lower_value) / (upper_value - lower_value)
+            return lower_score + fraction * (upper_score - lower_score)
+        lower_value, lower_score = upper_value, upper_score
+    return float(lower_score)
+
+
+def iaq_score(values: dict[str, float]) -> float | None:
+    """Return the composite score of values keyed by device class.
+
+    The score is the weighted mean of the sub-scores, capped at the worst
+    sub-score plus IAQ_WORST_MARGIN. Returns None without any known input.
+    """
+    scores = array("d")
+    weights = array("d")
+    for device_class, value in values.items():
+        breakpoints = IAQ_BREAKPOINTS.get(device_class)
+        if breakpoints is None or value is None:
+            continue
+        scores.append(sub_score(value, breakpoints))
+        weights.append(IAQ_WEIGHTS[device_class])
+    if not scores:
+        return None
+
+    mean = math.fsum(map(float.__mul__, scores, weights)) / math.fsum(weights)
+    return min(mean, min(scores) + IAQ_WORST_MARGIN)
+
+
+def iaq_rating(score) -> tuple[int, str] | None:
+    """Return the band index and rating label of a score."""
+    if score is None:
+        return None
+    for band, (lower, rating) in enumerate(IAQ_RATING_BANDS):
+        if lower is None or score >= lower:
+            return band, rating
+    return None
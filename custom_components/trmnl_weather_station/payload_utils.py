@@ -5,6 +5,17 @@ from __future__ import annotations
 import json
 import logging
 
+from .const import (
+    CO2_RATING_BANDS,
+    DEFAULT_ICON,
+    DEFAULT_WEATHER_ICON,
+    DEVICE_CLASS_ICONS,
+    LAYOUT_ALL,
+    LAYOUT_CAPACITY,
+    MAX_PAYLOAD_SIZE,
+    WEATHER_CONDITION_ICONS,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -26,14 +37,45 @@ def round_sensor_value(value, decimal_places=1):
         return value
 
 
+def resolve_icon_class(icon=None, device_class=None) -> str:
+    """Resolve the icon CSS class shown on the display for an entity."""
+    if icon:
+        return icon.replace(":", "-")
+    return DEVICE_CLASS_ICONS.get(device_class, DEFAULT_ICON)
+
+
+def resolve_weather_icon(condition) -> str | None:
+    """Resolve the icon CSS class for a weather condition."""
+    if not condition:
+        return None
+    return WEATHER_CONDITION_ICONS.get(condition, DEFAULT_WEATHER_ICON)
+
+
+def co2_rating(value) -> tuple[int, str] | None:
+    """Return the band index and rating label for a CO2 level in ppm."""
+    try:
+        level = float(value)
+    except (ValueError, TypeError):
+        return None
+
+    for band, (upper, rating) in enumerate(CO2_RATING_BANDS):
+        if upper is None or level < upper:
+            return band, rating
+    return None
+
+
 def create_entity_payload(
     state,
     sensor_type="additional",
     custom_name=None,
     include_id=False,
     decimal_places=1,
+    value=None,
 ) -> dict:
-    """Create a payload for a single sensor entity."""
+    """Create a payload for a single sensor entity.
+
+    An aggregated value, if given, is shown instead of the current state.
+    """
     if not state:
         return None
 
@@ -44,7 +86,9 @@ def create_entity_payload(
     entity_name = entity_parts[1]
     friendly_name = state.attributes.get("friendly_name", "")
 
-    rounded_value = round_sensor_value(state.state, decimal_places)
+    rounded_value = round_sensor_value(
+        state.state if value is None else value, decimal_places
+    )
 
     payload = {
         "val": rounded_value,
@@ -67,26 +111,100 @@ def create_entity_payload(
     else:
         payload["n"] = entity_name.replace("_", " ").title()
 
-    if "icon" in state.attributes:
-        icon = state.attributes.get("icon")
-        if icon:
-            payload["i"] = icon
-            _LOGGER.debug("Added icon '%s' for entity %s", icon, state.entity_id)
-
     if "battery_percent" in state.attributes:
         battery = state.attributes.get("battery_percent")
         if battery is not None and float(battery) < 25:
             payload["bat"] = round_sensor_value(battery, decimal_places)
 
-    if "device_class" in state.attributes:
-        payload["device_class"] = state.attributes.get("device_class")
-
-    _LOGGER.debug(
-        "Created payload for %s (%s): %s", state.entity_id, sensor_type, payload
-    )
+    icon = state.attributes.get("icon")
+    device_class = state.attributes.get("device_class")
+    # Deprecated: forks of the published recipe resolve icons from i and
+    # device_class. Keep sending them until those forks read ic.
+    if icon:
+        payload["i"] = icon
+    if device_class:
+        payload["device_class"] = device_class
+    payload["ic"] = resolve_icon_class(icon, device_class)
     return payload
 
 
+def layout_capacity(layout: str = LAYOUT_ALL) -> int:
+    """Return the number of non-primary entities a layout can display.
+
+    For LAYOUT_ALL this is the capacity of the largest layout, so every layout
+    can be served from the same payload.
+    """
+    if layout == LAYOUT_ALL:
+        return max(LAYOUT_CAPACITY.values())
+    return LAYOUT_CAPACITY.get(layout, max(LAYOUT_CAPACITY.values()))
+
+
+def select_layout_entities(
+    entities: list[dict], layout: str = LAYOUT_ALL
+) -> list[dict]:
+    """Select the entities a layout can display, primary entities first."""
+    primary = [entity for entity in entities if entity.get("primary")]
+    others = [entity for entity in entities if not entity.get("primary")]
+    return primary + others[: layout_capacity(layout)]
+
+
+def paginate_entities(
+    merge_variables: dict, capacity: int, max_size: int = MAX_PAYLOAD_SIZE
+) -> list[list[dict]]:
+    """Split the non-primary entities into pages that fit size and capacity.
+
+    Every page starts with the primary entities and keeps the entity order.
+    An entity too large to fit on a page of its own is left out.
+    """
+    entities = merge_variables["entities"]
+    primary = [entity for entity in entities if entity.get("primary")]
+    others = [entity for entity in entities if not entity.get("primary")]
+
+    def fits(page: list[dict]) -> bool:
+        test_payload = {
+            "merge_variables": {
+                **merge_variables,
+                "entities": primary + page,
+                "count": len(primary) + len(page),
+                "page": len(others),
+                "pages": len(others),
+            }
+        }
+        return estimate_payload_size(test_payload) <= max_size
+
+    pages = []
+    page = []
+    for entity in others:
+        if len(page) < capacity and fits(page + [entity]):
+            page.append(entity)
+            continue
+        if page:
+            pages.append(page)
+        if fits([entity]):
+            page = [entity]
+        else:
+            _LOGGER.warning("Entity %s does not fit on a page", entity.get("n"))
+            page = []
+    if page or not pages:
+        pages.append(page)
+
+    return [primary + page for page in pages]
+
+
+def layout_limits(entities: list[dict]) -> dict[str, int]:
+    """Return per-layout entity counts for layouts showing fewer than all entities.
+
+    Selections are always a prefix of the entity list, so a count is enough
+    for a template to pick its entities with a Liquid for-loop limit.
+    """
+    primary_count = sum(1 for entity in entities if entity.get("primary"))
+    return {
+        layout: primary_count + capacity
+        for layout, capacity in LAYOUT_CAPACITY.items()
+        if primary_count + capacity < len(entities)
+    }
+
+
 def estimate_payload_size(payload):
     """Estimate the size of the payload in bytes."""
     return len(json.dumps(payload))
@@ -0,0 +1,178 @@
+"""Merge variables and images served to TRMNL devices using the polling strategy."""
+
+from __future__ import annotations
+
+import json
+import logging
+from http import HTTPStatus
+
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, IMAGE_FORMATS, IMAGE_URL, POLL_CACHE_MAX_AGE, POLL_URL
+from .push_state import payload_digest
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Return whether an If-None-Match header matches an entity tag."""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class PollCache:
+    """Keep the serialized merge variables of an entry for polling devices.
+
+    The body is rebuilt only after a tracked state changed, or once it is
+    older than the maximum age so aggregates and the forecast stay fresh.
+    The entity tag is the payload digest, so a rebuild with unchanged display
+    data keeps the previous body and tag.
+    """
+
+    def __init__(self, hass: HomeAssistant, processor, entity_ids: list[str]):
+        """Initialize the cache."""
+        self.hass = hass
+        self.processor = processor
+        self.entity_ids = entity_ids
+        self.builds = 0
+        self._payload: dict | None = None
+        self._body: bytes | None = None
+        self._etag: str | None = None
+        self._built_at = 0.0
+        self._dirty = True
+        self._unsub = None
+
+    @callback
+    def async_start(self) -> None:
+        """Invalidate the cache when a tracked state changes."""
+        self._unsub = async_track_state_change_event(
+            self.hass, self.entity_ids, self._async_invalidate
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop tracking states."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_set_entities(self, entity_ids: list[str]) -> None:
+        """Track another set of entities and rebuild on the next poll."""
+        self.async_stop()
+        self.entity_ids = entity_ids
+        self._dirty = True
+        self.async_start()
+
+    @callback
+    def _async_invalidate(self, _event) -> None:
+        """Mark the cached body as outdated."""
+        self._dirty = True
+
+    def get(self) -> tuple[bytes, str] | None:
+        """Return the serialized merge variables and their entity tag."""
+        now = dt_util.utcnow().timestamp()
+        if self._dirty or now - self._built_at >= POLL_CACHE_MAX_AGE:
+            self._rebuild(now)
+        if self._body is None:
+            return None
+        return self._body, self._etag
+
+    def get_payload(self) -> tuple[dict, str] | None:
+        """Return the payload the body was serialized from and its entity tag."""
+        if self.get() is None:
+            return None
+        return self._payload, self._etag
+
+    def _rebuild(self, now: float) -> None:
+        """Build the payload and serialize it if the display data changed."""
+        self._dirty = False
+        self._built_at = now
+        payload = self.processor.compose_payload()[0]
+        if payload is None:
+            self._payload = self._body = self._etag = None
+            return
+
+        self.builds += 1
+        etag = f'"{payload_digest(payload)[:32]}"'
+        if etag == self._etag:
+            return
+        self._etag = etag
+        self._payload = payload
+        self._body = json.dumps(
+            payload["merge_variables"], separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+        _LOGGER.debug("Rebuilt polling body of %d bytes", len(self._body))
+
+
+class MergeVariablesView(HomeAssistantView):
+    """Serve the latest merge variables of an entry to polling devices."""
+
+    url = POLL_URL
+    name = f"api:{DOMAIN}:merge_variables"
+
+    async def get(self, request: web.Request, entry_id: str) -> web.Response:
+        """Return the merge variables, or 304 if the device has them already."""
+        hass: HomeAssistant = request.app["hass"]
+        cache = hass.data.get(DOMAIN, {}).get(entry_id, {}).get("poll_cache")
+        if cache is None:
+            return self.json_message("Entry not found", HTTPStatus.NOT_FOUND)
+
+        cached = cache.get()
+        if cached is None:
+            return self.json_message(
+                "No sensor data available", HTTPStatus.SERVICE_UNAVAILABLE
+            )
+
+        body, etag = cached
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+        return web.Response(body=body, content_type="application/json", headers=headers)
+
+
+class ImageView(HomeAssistantView):
+    """Serve the rendered display image of an entry to polling devices."""
+
+    url = IMAGE_URL
+    name = f"api:{DOMAIN}:image"
+
+    async def get(
+        self, request: web.Request, entry_id: str, image_format: str
+    ) -> web.Response:
+        """Return the image, or 304 if the device has it already."""
+        hass: HomeAssistant = request.app["hass"]
+        data = hass.data.get(DOMAIN, {}).get(entry_id, {})
+        if "poll_cache" not in data or image_format not in IMAGE_FORMATS:
+            return self.json_message("Image not found", HTTPStatus.NOT_FOUND)
+
+        cached = data["poll_cache"].get_payload()
+        if cached is None:
+            return self.json_message(
+                "No sensor data available", HTTPStatus.SERVICE_UNAVAILABLE
+            )
+
+        payload, etag = cached
+        etag = f'{etag[:-1]}-{image_format}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("If-None-Match"), etag):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        try:
+            image = await data["renderer"].async_render(payload, image_format)
+        except ImportError:
+            return self.json_message(
+                "Image rendering requires Pillow", HTTPStatus.NOT_IMPLEMENTED
+            )
+        return web.Response(
+            body=image, content_type=f"image/{image_format}", headers=headers
+        )
@@ -0,0 +1,37 @@
+"""Reachability and latency probe of the TRMNL webhook."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+import aiohttp
+
+from .const import PROBE_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_probe_webhook(url: str, timeout: float = PROBE_TIMEOUT) -> float:
+    """Return the round-trip latency of the webhook in seconds.
+
+    The probe only reads the webhook, so the display is left untouched.
+    Raises aiohttp.ClientError or TimeoutError if the webhook is unreachable,
+    not found or failing.
+    """
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(timeout=client_timeout) as session:
+        async with session.get(url) as response:
+            await response.read()
+            latency = time.perf_counter() - start
+            if response.status == 404 or response.status >= 500:
+                raise aiohttp.ClientResponseError(
+                    response.request_info,
+                    response.history,
+                    status=response.status,
+                    message=response.reason or "",
+                )
+
+    _LOGGER.debug("Webhook responded in %.0f ms", latency * 1000)
+    return latency
@@ -0,0 +1,97 @@
+"""Per-stage timing of the push pipeline and on-demand profiling."""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import logging
+import time
+from contextlib import contextmanager
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Pipeline stages in execution order.
+STAGES = ("config", "states", "entities", "trim", "serialize", "send")
+
+
+class StageTimer:
+    """Accumulate wall-clock time spent in each pipeline stage."""
+
+    def __init__(self):
+        """Initialize the timer."""
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as the given stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (
+                self.timings.get(name, 0.0) + time.perf_counter() - start
+            )
+
+
+def summarize_timings(runs: list[dict[str, float]]) -> dict[str, dict[str, float]]:
+    """Summarize per-stage timings of several runs in milliseconds."""
+    summary = {}
+    for stage in STAGES:
+        samples = [run[stage] * 1000 for run in runs if stage in run]
+        if not samples:
+            continue
+        summary[stage] = {
+            "runs": len(samples),
+            "mean_ms": round(sum(samples) / len(samples), 3),
+            "max_ms": round(max(samples), 3),
+            "total_ms": round(sum(samples), 3),
+        }
+    return summary
+
+
+async def async_profile_processor(
+    hass: HomeAssistant,
+    processor,
+    ticks: int,
+    send: bool = False,
+    cprofile: bool = False,
+) -> dict:
+    """Run instrumented ticks of a processor and return per-stage timings.
+
+    Each tick holds the push lock of the processor and yields to the event
+    loop afterwards, so scheduled pushes interleave with a long run.
+    """
+    profiler = cProfile.Profile() if cprofile else None
+    runs = []
+
+    if profiler:
+        profiler.enable()
+    try:
+        for _ in range(ticks):
+            timer = StageTimer()
+            await processor.async_process(send=send, timer=timer)
+            runs.append(timer.timings)
+            await asyncio.sleep(0)
+    finally:
+        if profiler:
+            profiler.disable()
+
+    result = {
+        "ticks": ticks,
+        "send": send,
+        "stages": summarize_timings(runs),
+    }
+
+    if profiler:
+        timestamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+        path = hass.config.path(f"{DOMAIN}_{processor.entry.entry_id}_{timestamp}.prof")
+        await hass.async_add_executor_job(profiler.dump_stats, path)
+        _LOGGER.info("Wrote profile of %d ticks to %s", ticks, path)
+        result["profile_path"] = path
+
+    return result
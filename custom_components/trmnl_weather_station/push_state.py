@@ -0,0 +1,222 @@
+"""Persistent state of the last push, kept across restarts and reloads."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    BUDGET_MAX_PROBE_SUCCESSES,
+    BUDGET_MIN_SIZE,
+    BUDGET_PROBE_STEP,
+    BUDGET_PROBE_SUCCESSES,
+    BUDGET_SHRINK_FACTOR,
+    DOMAIN,
+    MAX_BACKOFF_SECONDS,
+    MIN_BACKOFF_SECONDS,
+    PUSH_STATE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .payload_utils import estimate_payload_size
+
+_LOGGER = logging.getLogger(__name__)
+
+# Merge variables which change on every push and carry no display information.
+VOLATILE_KEYS = ("timestamp",)
+
+
+def payload_digest(payload: dict) -> str:
+    """Return a stable digest of a payload, ignoring volatile fields."""
+    merge_variables = {
+        key: value
+        for key, value in payload.get("merge_variables", {}).items()
+        if key not in VOLATILE_KEYS
+    }
+    encoded = json.dumps(merge_variables, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def backoff_delay(failures: int) -> float:
+    """Return the backoff delay in seconds after a number of consecutive failures."""
+    if failures <= 0:
+        return 0
+    return min(MIN_BACKOFF_SECONDS * 2 ** (failures - 1), MAX_BACKOFF_SECONDS)
+
+
+def shrink_budget(budget: int, rejected_size: int) -> int:
+    """Return the budget after the server rejected a payload as too large."""
+    return max(int(min(budget, rejected_size) * BUDGET_SHRINK_FACTOR), BUDGET_MIN_SIZE)
+
+
+class PushState:
+    """Track the last sent payload, backoff state and outbox per target URL.
+
+    The outbox holds at most one undelivered payload per target, newer
+    payloads replace older ones, so an outage ends in a single catch-up push.
+
+    Each target also learns its payload budget. A rejection for size shrinks
+    it, and after a run of successful pushes of trimmed payloads it grows by
+    one step. If the server rejects the first push after such a step, the
+    previous budget is restored and growing waits twice as long next time.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        """Initialize the push state."""
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}")
+        self._targets: dict[str, dict] = {}
+
+    async def async_load(self) -> None:
+        """Load the persisted state."""
+        data = await self._store.async_load()
+        if data:
+            self._targets = data.get("targets", {})
+        _LOGGER.debug("Loaded push state for %d targets", len(self._targets))
+
+    async def async_save(self) -> None:
+        """Persist the state immediately, replacing any pending delayed save."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Remove the persisted state."""
+        await self._store.async_remove()
+
+    def target(self, url: str) -> dict:
+        """Return the state of a target, creating it if needed."""
+        return self._targets.setdefault(
+            url,
+            {
+                "digest": None,
+                "sent_at": None,
+                "failures": 0,
+                "retry_after": None,
+                "pending": None,
+            },
+        )
+
+    def peek(self, url: str) -> dict | None:
+        """Return a copy of the state of a target, or None if it is unknown."""
+        state = self._targets.get(url)
+        return dict(state) if state is not None else None
+
+    def in_backoff(self, url: str, now: float) -> bool:
+        """Return whether pushes to a target are currently backed off."""
+        retry_after = self.target(url)["retry_after"]
+        return retry_after is not None and now < retry_after
+
+    def sent_within(self, url: str, now: float, max_age: float) -> bool:
+        """Return whether the last push to a target succeeded within max_age."""
+        state = self.target(url)
+        return (
+            state["failures"] == 0
+            and state["sent_at"] is not None
+            and now - state["sent_at"] < max_age
+        )
+
+    def is_current(self, url: str, digest: str, now: float, max_age: float) -> bool:
+        """Return whether the target already shows this payload and is not stale."""
+        return self.target(url)["digest"] == digest and self.sent_within(
+            url, now, max_age
+        )
+
+    def record_success(self, url: str, digest: str, now: float) -> None:
+        """Record a successful push."""
+        state = self.target(url)
+        state["digest"] = digest
+        state["sent_at"] = now
+        state["failures"] = 0
+        state["retry_after"] = None
+        state["pending"] = None
+        self._schedule_save()
+
+    def record_failure(self, url: str, now: float) -> None:
+        """Record a failed push and extend the backoff window."""
+        state = self.target(url)
+        state["failures"] += 1
+        state["retry_after"] = now + backoff_delay(state["failures"])
+        self._schedule_save()
+
+    def budget(self, url: str, default: int) -> int:
+        """Return the learned payload budget of a target, or the default."""
+        return self._targets.get(url, {}).get("budget") or default
+
+    def record_rejection(self, url: str, size: int, default: int) -> int:
+        """Shrink the budget after a payload of a size was rejected and return it."""
+        state = self.target(url)
+        previous = state.get("budget_probe")
+        if previous is not None:
+            budget = previous
+            state["budget_probe_after"] = min(
+                state.get("budget_probe_after", BUDGET_PROBE_SUCCESSES) * 2,
+                BUDGET_MAX_PROBE_SUCCESSES,
+            )
+        else:
+            budget = shrink_budget(self.budget(url, default), size)
+        _LOGGER.info("Payload budget lowered to %d bytes", budget)
+        state["budget"] = budget
+        state["budget_probe"] = None
+        state["budget_successes"] = 0
+        self._schedule_save()
+        return budget
+
+    def record_budget_success(
+        self, url: str, default: int, ceiling: int, trimmed: bool
+    ) -> None:
+        """Count a successful push and step the budget up after enough of them."""
+        state = self.target(url)
+        state["budget_probe"] = None
+        successes = state.get("budget_successes", 0) + 1
+        budget = self.budget(url, default)
+        if (
+            trimmed
+            and budget < ceiling
+            and successes >= state.get("budget_probe_after", BUDGET_PROBE_SUCCESSES)
+        ):
+            state["budget_probe"] = budget
+            state["budget"] = min(budget + BUDGET_PROBE_STEP, ceiling)
+            successes = 0
+            _LOGGER.debug("Probing payload budget of %d bytes", state["budget"])
+        state["budget_successes"] = successes
+        self._schedule_save()
+
+    def retry_after(self, url: str) -> float | None:
+        """Return when pushes to a backed off target may be retried."""
+        return self.target(url)["retry_after"]
+
+    def queue(
+        self, url: str, payload: dict, max_size: int, trimmed: bool = False
+    ) -> bool:
+        """Keep a payload as the newest undelivered one of a target.
+
+        Payloads larger than max_size, the largest payload budget of the
+        target's transport, are not kept. Whether the payload was trimmed is
+        kept with it, for the budget once it is delivered.
+        """
+        size = estimate_payload_size(payload)
+        if size > max_size:
+            _LOGGER.warning("Payload of %d bytes is too large for the outbox", size)
+            return False
+        state = self.target(url)
+        state["pending"] = payload
+        state["pending_trimmed"] = trimmed
+        self._schedule_save()
+        return True
+
+    def pending(self, url: str) -> dict | None:
+        """Return the undelivered payload of a target, if any."""
+        return self.target(url).get("pending")
+
+    def pending_trimmed(self, url: str) -> bool:
+        """Return whether the undelivered payload of a target was trimmed."""
+        return self.target(url).get("pending_trimmed", False)
+
+    def _schedule_save(self) -> None:
+        """Persist the state after a short delay."""
+        self._store.async_delay_save(self._data_to_save, PUSH_STATE_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return the data to persist."""
+        return {"targets": self._targets}
@@ -0,0 +1,151 @@
+"""Recording of the states read by the push pipeline, for offline replay."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_URL, RECORDED_ATTRIBUTES, RECORDING_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class Recording:
+    """Configuration and state snapshots read back from a recording file."""
+
+    config: dict
+    snapshots: list[tuple[float, list[tuple[str, str, dict]]]] = field(
+        default_factory=list
+    )
+
+
+def _append_lines(path: Path, lines: list[str]) -> None:
+    """Append lines to a recording file."""
+    with path.open("a", encoding="utf-8") as recording_file:
+        recording_file.writelines(f"{line}\n" for line in lines)
+
+
+def _dumps(data) -> str:
+    """Encode one recording line compactly."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class SnapshotRecorder:
+    """Append the states read by each pipeline run to a JSON lines file.
+
+    The first line holds the entry configuration without the webhook URL,
+    every further line one snapshot as [entity_id, state, attributes] rows.
+    Attributes are limited to the ones the payload uses and are only written
+    when they changed since the previous snapshot, so a long recording stays
+    small. Lines are buffered and appended in the executor.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: Path | str):
+        """Initialize the recorder."""
+        self.hass = hass
+        self.path = Path(path)
+        self.snapshots = 0
+        self._buffer: list[str] = []
+        self._attributes: dict[str, dict] = {}
+        self._write_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self, config: dict) -> None:
+        """Start a new recording of an entry with the given configuration."""
+        header = {key: value for key, value in config.items() if key != CONF_URL}
+        self._buffer.append(_dumps({"v": RECORDING_VERSION, "config": header}))
+        self._schedule_flush()
+
+    @callback
+    def record(self, states: dict) -> None:
+        """Record the states looked up by one pipeline run."""
+        rows = []
+        for state in (
+            states["co2"],
+            states["weather"],
+            *(sensor_state for sensor_state, _, _ in states["sensors"]),
+            *(
+                source_state
+                for source_states, _, _, _ in states.get("groups", ())
+                for source_state in source_states
+            ),
+        ):
+            if state is None:
+                continue
+            row = [state.entity_id, state.state]
+            attributes = {
+                key: state.attributes[key]
+                for key in RECORDED_ATTRIBUTES
+                if key in state.attributes
+            }
+            if attributes != self._attributes.get(state.entity_id):
+                self._attributes[state.entity_id] = attributes
+                row.append(attributes)
+            rows.append(row)
+
+        self._buffer.append(
+            _dumps({"t": round(dt_util.utcnow().timestamp(), 3), "s": rows})
+        )
+        self.snapshots += 1
+        self._schedule_flush()
+
+    async def async_close(self) -> None:
+        """Write all buffered snapshots."""
+        if self._flush_task is not None:
+            await self._flush_task
+        await self._async_flush()
+
+    @callback
+    def _schedule_flush(self) -> None:
+        """Write the buffer in the background unless a write is pending."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = self.hass.async_create_task(self._async_flush())
+
+    async def _async_flush(self) -> None:
+        """Append the buffered lines to the recording file."""
+        async with self._write_lock:
+            lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            try:
+                await self.hass.async_add_executor_job(_append_lines, self.path, lines)
+            except OSError as err:
+                _LOGGER.error("Failed to write recording %s: %s", self.path, err)
+
+
+def read_recording(path: Path | str) -> Recording:
+    """Read a recording file, resolving attributes carried over between snapshots."""
+    recording = None
+    attributes: dict[str, dict] = {}
+    with Path(path).open(encoding="utf-8") as recording_file:
+        for line in recording_file:
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            if "config" in data:
+                if data.get("v") != RECORDING_VERSION:
+                    raise ValueError(f"Unsupported recording version {data.get('v')}")
+                recording = Recording(config=data["config"])
+                attributes = {}
+                continue
+            if recording is None:
+                raise ValueError(f"Recording {path} has no configuration header")
+
+            rows = []
+            for entity_id, state, *changed in data["s"]:
+                if changed:
+                    attributes[entity_id] = changed[0]
+                rows.append((entity_id, state, attributes.get(entity_id, {})))
+            recording.snapshots.append((data["t"], rows))
+
+    if recording is None:
+        raise ValueError(f"Recording {path} is empty")
+    return recording
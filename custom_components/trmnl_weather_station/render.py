@@ -0,0 +1,277 @@
+"""Server-side rendering of the display image for self-hosted TRMNL servers.
+
+Pillow is optional. It is imported on the first render, so the integration
+runs without it and only the image endpoint reports it as unavailable.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import math
+from collections import OrderedDict
+from functools import lru_cache
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CO2_GAUGE_MAX,
+    CO2_GAUGE_MIN,
+    IMAGE_FORMATS,
+    IMAGE_HEIGHT,
+    IMAGE_WIDTH,
+    RENDER_CACHE_SIZE,
+)
+from .push_state import payload_digest
+
+_LOGGER = logging.getLogger(__name__)
+
+BLACK = 0
+WHITE = 255
+# Gray levels become dot patterns when dithered to 1-bit.
+TRACK_GRAY = 200
+
+GAUGE_CENTER = (200, 250)
+GAUGE_RADIUS = 150
+GAUGE_WIDTH = 28
+ICON_CENTER = (200, 385)
+ICON_SIZE = 72
+IAQ_TOP = 450
+GRID_LEFT = 420
+GRID_TOP = 30
+GRID_COLUMNS = 2
+GRID_ROWS = 3
+CELL_WIDTH = 185
+CELL_HEIGHT = 140
+
+
+@lru_cache(maxsize=8)
+def _font(size: int):
+    """Return the default font at a size, or at its fixed size on old Pillow."""
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def _text(draw, center: tuple[float, float], text: str, size: int) -> None:
+    """Draw text centered on a point."""
+    font = _font(size)
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    draw.text(
+        (center[0] - (right - left) / 2 - left, center[1] - (bottom - top) / 2 - top),
+        text,
+        font=font,
+        fill=BLACK,
+    )
+
+
+def _cloud(draw, x: float, y: float, s: float) -> None:
+    """Draw a cloud centered on a point, scaled to the icon size."""
+    draw.ellipse((x - s * 0.45, y - s * 0.1, x - s * 0.05, y + s * 0.25), fill=BLACK)
+    draw.ellipse((x - s * 0.2, y - s * 0.3, x + s * 0.25, y + s * 0.15), fill=BLACK)
+    draw.ellipse((x + s * 0.05, y - s * 0.1, x + s * 0.45, y + s * 0.25), fill=BLACK)
+    draw.rectangle((x - s * 0.27, y + s * 0.05, x + s * 0.27, y + s * 0.25), fill=BLACK)
+
+
+def _sun(draw, x: float, y: float, s: float) -> None:
+    """Draw a sun with rays."""
+    draw.ellipse((x - s * 0.2, y - s * 0.2, x + s * 0.2, y + s * 0.2), fill=BLACK)
+    for step in range(8):
+        angle = step * math.pi / 4
+        draw.line(
+            (
+                x + math.cos(angle) * s * 0.3,
+                y + math.sin(angle) * s * 0.3,
+                x + math.cos(angle) * s * 0.45,
+                y + math.sin(angle) * s * 0.45,
+            ),
+            fill=BLACK,
+            width=max(int(s * 0.06), 1),
+        )
+
+
+def _moon(draw, x: float, y: float, s: float) -> None:
+    """Draw a crescent moon."""
+    draw.ellipse((x - s * 0.35, y - s * 0.35, x + s * 0.35, y + s * 0.35), fill=BLACK)
+    draw.ellipse((x - s * 0.15, y - s * 0.45, x + s * 0.45, y + s * 0.15), fill=WHITE)
+
+
+def _weather_icon(
+    draw, icon: str | None, center: tuple[float, float], s: float
+) -> None:
+    """Draw a pictogram for an MDI weather icon class."""
+    x, y = center
+    icon = icon or ""
+    width = max(int(s * 0.05), 1)
+
+    if "night" in icon and "partly" not in icon:
+        _moon(draw, x, y, s)
+    elif "sunny" in icon and "partly" not in icon:
+        _sun(draw, x, y, s)
+    elif "fog" in icon:
+        for offset in (-0.25, 0, 0.25):
+            draw.line(
+                (x - s * 0.4, y + s * offset, x + s * 0.4, y + s * offset),
+                fill=BLACK,
+                width=width * 2,
+            )
+    elif "windy" in icon:
+        for offset, length in ((-0.2, 0.4), (0, 0.3), (0.2, 0.35)):
+            draw.line(
+                (x - s * 0.4, y + s * offset, x + s * length, y + s * offset),
+                fill=BLACK,
+                width=width * 2,
+            )
+    elif icon.startswith("mdi-weather"):
+        if "partly" in icon:
+            _sun(draw, x + s * 0.25, y - s * 0.3, s * 0.8)
+        _cloud(draw, x, y - s * 0.1, s)
+        if "lightning" in icon:
+            draw.polygon(
+                [
+                    (x + s * 0.05, y + s * 0.15),
+                    (x - s * 0.1, y + s * 0.4),
+                    (x + s * 0.02, y + s * 0.4),
+                    (x - s * 0.08, y + s * 0.6),
+                    (x + s * 0.15, y + s * 0.32),
+                    (x + s * 0.03, y + s * 0.32),
+                ],
+                fill=BLACK,
+            )
+        elif "snow" in icon or "hail" in icon:
+            for dx in (-0.25, 0, 0.25):
+                draw.ellipse(
+                    (
+                        x + s * (dx - 0.04),
+                        y + s * 0.3,
+                        x + s * (dx + 0.04),
+                        y + s * 0.38,
+                    ),
+                    fill=BLACK,
+                )
+        elif "rain" in icon or "pouring" in icon:
+            for dx in (-0.25, 0, 0.25):
+                draw.line(
+                    (x + s * dx, y + s * 0.25, x + s * (dx - 0.08), y + s * 0.45),
+                    fill=BLACK,
+                    width=width,
+                )
+    else:
+        draw.ellipse(
+            (x - s * 0.3, y - s * 0.3, x + s * 0.3, y + s * 0.3),
+            outline=BLACK,
+            width=width,
+        )
+        _text(draw, (x, y), "!", int(s * 0.4))
+
+
+def _gauge(draw, merge_variables: dict) -> None:
+    """Draw the CO2 gauge with value, rating and weather icon."""
+    x, y = GAUGE_CENTER
+    box = (x - GAUGE_RADIUS, y - GAUGE_RADIUS, x + GAUGE_RADIUS, y + GAUGE_RADIUS)
+    draw.arc(box, 180, 360, fill=TRACK_GRAY, width=GAUGE_WIDTH)
+
+    value = merge_variables.get("co2_value")
+    if isinstance(value, (int, float)):
+        fraction = (value - CO2_GAUGE_MIN) / (CO2_GAUGE_MAX - CO2_GAUGE_MIN)
+        fraction = min(max(fraction, 0), 1)
+        if fraction:
+            draw.arc(box, 180, 180 + 180 * fraction, fill=BLACK, width=GAUGE_WIDTH)
+        _text(draw, (x, y - 45), f"{value:g}", 56)
+    else:
+        _text(draw, (x, y - 45), "-", 56)
+
+    _text(draw, (x, y + 5), merge_variables.get("co2_unit") or "ppm", 20)
+    if merge_variables.get("co2_rating"):
+        _text(draw, (x, y + 50), merge_variables["co2_rating"], 28)
+    if merge_variables.get("iaq_rating"):
+        iaq = f"Air quality {merge_variables['iaq_rating']} {merge_variables.get('iaq_score', '')}"
+        _text(draw, (x, IAQ_TOP), iaq.strip(), 20)
+    _weather_icon(draw, merge_variables.get("weather_icon"), ICON_CENTER, ICON_SIZE)
+
+
+def _grid(draw, merge_variables: dict) -> None:
+    """Draw the non-primary sensors in a grid."""
+    entities = [
+        entity
+        for entity in merge_variables.get("entities") or []
+        if not entity.get("primary")
+    ][: GRID_COLUMNS * GRID_ROWS]
+
+    for index, entity in enumerate(entities):
+        column, row = index % GRID_COLUMNS, index // GRID_COLUMNS
+        left = GRID_LEFT + column * CELL_WIDTH
+        top = GRID_TOP + row * CELL_HEIGHT
+        center = left + CELL_WIDTH / 2
+
+        _text(draw, (center, top + 30), str(entity.get("n", ""))[:18], 18)
+        value = entity.get("val")
+        text = (
+            "-" if value in (None, "unavailable") else f"{value}{entity.get('u') or ''}"
+        )
+        _text(draw, (center, top + 80), text, 40)
+
+    if merge_variables.get("pages"):
+        _text(
+            draw,
+            (GRID_LEFT + GRID_COLUMNS * CELL_WIDTH / 2, IMAGE_HEIGHT - 20),
+            f"{merge_variables['page']} / {merge_variables['pages']}",
+            16,
+        )
+
+
+def render_image(merge_variables: dict, image_format: str = "png") -> bytes:
+    """Render merge variables to a dithered 1-bit image and encode it.
+
+    This is CPU bound and blocking, run it in an executor.
+    """
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (IMAGE_WIDTH, IMAGE_HEIGHT), WHITE)
+    draw = ImageDraw.Draw(image)
+    _gauge(draw, merge_variables)
+    draw.line(
+        (GRID_LEFT - 20, 30, GRID_LEFT - 20, IMAGE_HEIGHT - 30), fill=BLACK, width=2
+    )
+    _grid(draw, merge_variables)
+
+    output = io.BytesIO()
+    options = {"optimize": True} if image_format == "png" else {}
+    image.convert("1", dither=Image.Dither.FLOYDSTEINBERG).save(
+        output, format=image_format.upper(), **options
+    )
+    return output.getvalue()
+
+
+class ImageRenderer:
+    """Render payloads off the event loop and cache images by payload digest."""
+
+    def __init__(self, hass: HomeAssistant, cache_size: int = RENDER_CACHE_SIZE):
+        """Initialize the renderer."""
+        self.hass = hass
+        self.cache_size = cache_size
+        self.renders = 0
+        self._cache: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+
+    async def async_render(self, payload: dict, image_format: str = "png") -> bytes:
+        """Return the image of a payload, rendering it unless cached."""
+        if image_format not in IMAGE_FORMATS:
+            raise ValueError(f"Unsupported image format {image_format}")
+
+        key = (payload_digest(payload), image_format)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        image = await self.hass.async_add_executor_job(
+            render_image, payload["merge_variables"], image_format
+        )
+        self.renders += 1
+        self._cache[key] = image
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        _LOGGER.debug("Rendered %s image of %d bytes", image_format, len(image))
+        return image
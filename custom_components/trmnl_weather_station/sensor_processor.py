@@ -8,13 +8,24 @@ from datetime import datetime
 
 import aiohttp
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
 
+from .aggregation import WindowAggregator, parse_numeric, resolve_mode
 from .const import (
+    AGGREGATION_LAST,
+    AGGREGATION_MEAN,
+    BUDGET_RETRIES,
+    CONF_AGGREGATION,
     CONF_CO2_NAME,
     CONF_CO2_SENSOR,
     CONF_DECIMAL_PLACES,
+    CONF_HEARTBEAT_MINUTES,
+    CONF_IAQ,
     CONF_INCLUDE_IDS,
+    CONF_LAYOUT,
+    CONF_PAGING,
     CONF_SENSOR_1,
     CONF_SENSOR_1_NAME,
     CONF_SENSOR_2,
@@ -30,10 +41,42 @@ from .const import (
     CONF_UPDATE_INTERVAL_MINUTES,
     CONF_URL,
     CONF_WEATHER_PROVIDER,
+    DEFAULT_AGGREGATION,
     DEFAULT_DECIMAL_PLACES,
-    MAX_PAYLOAD_SIZE,
+    DEFAULT_HEARTBEAT_MINUTES,
+    DEFAULT_LAYOUT,
+    DOMAIN,
+    LAYOUT_ALL,
+    MIN_TIME_BETWEEN_UPDATES,
+    PUSH_BUILT,
+    PUSH_FAILED,
+    PUSH_NO_DATA,
+    PUSH_SENT,
+    PUSH_SKIPPED_BACKOFF,
+    PUSH_SKIPPED_INSIGNIFICANT,
+    PUSH_SKIPPED_RATE_LIMITED,
+    PUSH_SKIPPED_UNCHANGED,
 )
-from .payload_utils import create_entity_payload, estimate_payload_size, round_sensor_value
+from .forecast import ForecastCache
+from .groups import create_group_payloads, expand_sources, get_groups
+from .iaq import iaq_rating, iaq_score, iaq_states
+from .payload_utils import (
+    co2_rating,
+    create_entity_payload,
+    estimate_payload_size,
+    layout_capacity,
+    layout_limits,
+    paginate_entities,
+    resolve_weather_icon,
+    round_sensor_value,
+    select_layout_entities,
+)
+from .profiling import StageTimer
+from .push_state import PushState, payload_digest
+from .recording import SnapshotRecorder
+from .significance import SignificanceFilter
+from .traces import TraceBuffer, create_trace
+from .transport import PayloadTooLargeError, Transport, get_transport_class
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -41,191 +84,806 @@ _LOGGER = logging.getLogger(__name__)
 class SensorProcessor:
     """Handle sensor data processing and webhook communication."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        push_state: PushState | None = None,
+        aggregator: WindowAggregator | None = None,
+        significance: SignificanceFilter | None = None,
+        forecast: ForecastCache | None = None,
+    ):
         """Initialize the sensor processor."""
         self.hass = hass
         self.entry = entry
+        self.push_state = push_state
+        self.aggregator = aggregator
+        self.significance = significance
+        self.forecast = forecast
+        self.recorder: SnapshotRecorder | None = None
+        self.last_timings: dict[str, float] = {}
+        self.last_trimmed = False
+        self.last_built: list[str] = []
+        self.traces = TraceBuffer()
+        self._push_lock = asyncio.Lock()
+        self._follow_up: asyncio.Task | None = None
+        self._follow_up_only_if_changed = True
+        self._follow_up_force = False
+        self._unsub_recovery = None
+        self._unsub_flush = None
+        self._page_index = 0
+        self._transport: Transport | None = None
+
+    async def async_push(
+        self, *_, only_if_changed: bool = False, force: bool = False
+    ) -> str:
+        """Push sensor data, coalescing concurrent requests.
+
+        Only one push per entry runs at a time. Requests arriving while a push
+        is in flight share a single queued follow-up push and its outcome.
+        The follow-up runs as a background task of the entry, so unloading
+        the entry cancels it.
+        """
+        if self._follow_up is not None and not self._follow_up.done():
+            _LOGGER.debug("Joining queued follow-up push")
+            self._follow_up_only_if_changed &= only_if_changed
+            self._follow_up_force |= force
+            return await asyncio.shield(self._follow_up)
+
+        if self._push_lock.locked():
+            _LOGGER.debug("Push in flight, queueing a follow-up push")
+            self._follow_up_only_if_changed = only_if_changed
+            self._follow_up_force = force
+            self._follow_up = self.entry.async_create_background_task(
+                self.hass, self._async_follow_up(), f"{DOMAIN}_follow_up_push"
+            )
+            return await asyncio.shield(self._follow_up)
+
+        async with self._push_lock:
+            return await self.process_sensors(
+                only_if_changed=only_if_changed, force=force
+            )
+
+    async def _async_follow_up(self) -> str:
+        """Run the queued follow-up push once the in-flight push finished."""
+        async with self._push_lock:
+            self._follow_up = None
+            return await self.process_sensors(
+                only_if_changed=self._follow_up_only_if_changed,
+                force=self._follow_up_force,
+            )
+
+    async def async_process(
+        self, *, send: bool = True, timer: StageTimer | None = None
+    ) -> str:
+        """Run one pipeline pass once no other push is in flight."""
+        async with self._push_lock:
+            return await self.process_sensors(send=send, timer=timer)
+
+    async def process_sensors(
+        self,
+        *_,
+        only_if_changed: bool = False,
+        force: bool = False,
+        send: bool = True,
+        timer: StageTimer | None = None,
+    ) -> str:
+        """Process and send sensor data to TRMNL and return the push outcome.
 
-    async def process_sensors(self, *_):
-        """Process and send sensor data to TRMNL."""
+        With only_if_changed, the push is skipped when the target already
+        received an identical payload within the current update interval.
+        With aggregation enabled, unchanged aggregates are skipped until the
+        heartbeat interval expires, and with significance filtering so are
+        changes within the deadbands. Forced pushes skip neither. With send
+        disabled, the payload is built but not sent. Pushes exceeding the
+        rate limit of the transport are queued and sent once it allows.
+        Pushes meant to be sent leave a trace in the trace buffer.
+        """
         _LOGGER.debug("Starting sensor data processing")
 
+        if timer is None:
+            timer = StageTimer()
+
+        trace = {"payload": None, "status": None, "latencies": []}
+        outcome = PUSH_FAILED
+        try:
+            outcome = await self._async_process_sensors(
+                only_if_changed, force, send, timer, trace
+            )
+            return outcome
+        finally:
+            self.last_timings = timer.timings
+            if send:
+                self.traces.add(
+                    create_trace(
+                        outcome,
+                        trace["payload"],
+                        self.last_built if trace["payload"] else [],
+                        timer.timings,
+                        trace["status"],
+                        trace["latencies"],
+                    )
+                )
+
+    async def _async_process_sensors(
+        self,
+        only_if_changed: bool,
+        force: bool,
+        send: bool,
+        timer: StageTimer,
+        trace: dict,
+    ) -> str:
+        """Run one pipeline pass, noting the payload and response in the trace."""
+        with timer.stage("config"):
+            current_config = {**self.entry.data, **self.entry.options}
+            current_url = current_config.get(CONF_URL)
+            transport = self.transport_for(current_config)
+            update_interval_minutes = current_config.get(
+                CONF_UPDATE_INTERVAL_MINUTES, MIN_TIME_BETWEEN_UPDATES
+            )
+            heartbeat = (
+                current_config.get(CONF_HEARTBEAT_MINUTES, DEFAULT_HEARTBEAT_MINUTES)
+                * 60
+            )
+            max_unchanged_age = 0
+            if only_if_changed:
+                max_unchanged_age = update_interval_minutes * 60
+            if self._aggregating(current_config):
+                max_unchanged_age = max(max_unchanged_age, heartbeat)
+            if force:
+                max_unchanged_age = 0
+            now = dt_util.utcnow().timestamp()
+
+        snapshot = None
+        if self.significance:
+            if (
+                not force
+                and not self.significance.significant
+                and self.push_state
+                and self.push_state.sent_within(current_url, now, heartbeat)
+            ):
+                _LOGGER.debug("No significant change since last push, skipping")
+                return PUSH_SKIPPED_INSIGNIFICANT
+            snapshot = self.significance.snapshot()
+
+        payload = self.build_payload(current_config, timer)
+        if payload is None:
+            return PUSH_NO_DATA
+        trimmed = self.last_trimmed
+        trace["payload"] = payload
+
+        with timer.stage("serialize"):
+            digest = payload_digest(payload)
+
+        if self.push_state:
+            if self.push_state.in_backoff(current_url, now):
+                _LOGGER.debug("Webhook is backed off after failures, queueing payload")
+                if send:
+                    self.push_state.queue(
+                        current_url, payload, transport.max_budget, trimmed
+                    )
+                    self._schedule_recovery(current_url)
+                return PUSH_SKIPPED_BACKOFF
+
+            if max_unchanged_age and self.push_state.is_current(
+                current_url, digest, now, max_unchanged_age
+            ):
+                _LOGGER.debug("Display already shows this payload, skipping push")
+                return PUSH_SKIPPED_UNCHANGED
+
+        if not send:
+            return PUSH_BUILT
+
+        delay = transport.send_delay(now)
+        if delay:
+            _LOGGER.debug(
+                "Rate limit of %s transport reached, deferring push by %.0f seconds",
+                transport.name,
+                delay,
+            )
+            if self.push_state:
+                self.push_state.queue(
+                    current_url, payload, transport.max_budget, trimmed
+                )
+                self._schedule_flush(delay)
+            return PUSH_SKIPPED_RATE_LIMITED
+
+        with timer.stage("send"):
+            sent, trimmed, success = await self._async_send_within_budget(
+                current_config, transport, payload, trimmed, now, trace["latencies"]
+            )
+        if sent is not payload:
+            payload, digest = sent, payload_digest(sent)
+        trace["payload"], trace["status"] = payload, transport.last_status
+
+        if success is None:
+            self.push_state.queue(current_url, payload, transport.max_budget, trimmed)
+            self._schedule_flush(transport.send_delay(dt_util.utcnow().timestamp()))
+            return PUSH_SKIPPED_RATE_LIMITED
+
+        if self.push_state:
+            if success:
+                self.push_state.record_success(current_url, digest, now)
+            else:
+                self.push_state.record_failure(current_url, now)
+                self.push_state.queue(
+                    current_url, payload, transport.max_budget, trimmed
+                )
+                self._schedule_recovery(current_url)
+
+        if success and "page" in payload["merge_variables"]:
+            self._page_index = payload["merge_variables"]["page"]
+        if success and self.aggregator:
+            self.aggregator.reset_window(now)
+        if success and snapshot is not None:
+            self.significance.commit(snapshot)
+
+        return PUSH_SENT if success else PUSH_FAILED
+
+    @callback
+    def async_resume_outbox(self) -> None:
+        """Schedule delivery of a payload left in the outbox before a restart."""
+        current_url = {**self.entry.data, **self.entry.options}.get(CONF_URL)
+        if self.push_state and self.push_state.pending(current_url):
+            self._schedule_recovery(current_url)
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel a scheduled recovery probe or deferred push."""
+        if self._unsub_recovery:
+            self._unsub_recovery()
+            self._unsub_recovery = None
+        if self._unsub_flush:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+    def transport_for(self, current_config: dict) -> Transport:
+        """Return the transport of a configuration, kept while it is unchanged."""
+        transport_class = get_transport_class(current_config)
+        url = current_config.get(CONF_URL)
+        if (
+            self._transport is None
+            or self._transport.name != transport_class.name
+            or self._transport.url != url
+        ):
+            self._transport = transport_class(self.hass, url)
+        return self._transport
+
+    async def async_stop_recording(self) -> SnapshotRecorder | None:
+        """Detach the recorder, write its buffered snapshots and return it."""
+        recorder, self.recorder = self.recorder, None
+        if recorder:
+            await recorder.async_close()
+        return recorder
+
+    @callback
+    def _schedule_recovery(self, url: str) -> None:
+        """Probe the webhook once its backoff expires."""
+        if self._unsub_recovery:
+            return
+        retry_after = self.push_state.retry_after(url) or 0
+        delay = max(retry_after - dt_util.utcnow().timestamp(), 0)
+        _LOGGER.debug("Probing webhook for recovery in %.0f seconds", delay)
+        self._unsub_recovery = async_call_later(
+            self.hass, delay, self._async_recovery_probe
+        )
+
+    @callback
+    def _schedule_flush(self, delay: float) -> None:
+        """Send the queued payload once the rate limit allows."""
+        if self._unsub_flush:
+            return
+        self._unsub_flush = async_call_later(
+            self.hass, delay, self._async_deferred_flush
+        )
+
+    async def _async_deferred_flush(self, *_) -> None:
+        """Send the payload deferred by the rate limit."""
+        self._unsub_flush = None
+        await self.async_flush_outbox()
+
+    async def _async_recovery_probe(self, *_) -> None:
+        """Flush the outbox if the webhook is reachable again."""
+        self._unsub_recovery = None
         current_config = {**self.entry.data, **self.entry.options}
         current_url = current_config.get(CONF_URL)
-        current_co2_sensor = current_config.get(CONF_CO2_SENSOR)
-        current_co2_name = current_config.get(CONF_CO2_NAME)
-        current_weather_provider = current_config.get(CONF_WEATHER_PROVIDER)
-        current_sensor_1 = current_config.get(CONF_SENSOR_1)
-        current_sensor_1_name = current_config.get(CONF_SENSOR_1_NAME)
-        current_sensor_2 = current_config.get(CONF_SENSOR_2)
-        current_sensor_2_name = current_config.get(CONF_SENSOR_2_NAME)
-        current_sensor_3 = current_config.get(CONF_SENSOR_3)
-        current_sensor_3_name = current_config.get(CONF_SENSOR_3_NAME)
-        current_sensor_4 = current_config.get(CONF_SENSOR_4)
-        current_sensor_4_name = current_config.get(CONF_SENSOR_4_NAME)
-        current_sensor_5 = current_config.get(CONF_SENSOR_5)
-        current_sensor_5_name = current_config.get(CONF_SENSOR_5_NAME)
-        current_sensor_6 = current_config.get(CONF_SENSOR_6)
-        current_sensor_6_name = current_config.get(CONF_SENSOR_6_NAME)
-        include_ids = current_config.get(CONF_INCLUDE_IDS, False)
-        decimal_places = current_config.get(CONF_DECIMAL_PLACES, DEFAULT_DECIMAL_PLACES)
+        if not self.push_state.pending(current_url):
+            return
+
+        try:
+            await self.transport_for(current_config).async_probe()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            _LOGGER.debug("Webhook still unreachable: %s", err)
+            self.push_state.record_failure(current_url, dt_util.utcnow().timestamp())
+            self._schedule_recovery(current_url)
+            return
 
-        _LOGGER.debug("Using %d decimal places for sensor values", decimal_places)
+        await self.async_flush_outbox()
 
-        entities_payload = []
+    async def async_flush_outbox(self) -> str:
+        """Send the newest undelivered payload as a single catch-up push."""
+        async with self._push_lock:
+            current_config = {**self.entry.data, **self.entry.options}
+            current_url = current_config.get(CONF_URL)
+            payload = self.push_state.pending(current_url) if self.push_state else None
+            if payload is None:
+                return PUSH_NO_DATA
+
+            transport = self.transport_for(current_config)
+            now = dt_util.utcnow().timestamp()
+            delay = transport.send_delay(now)
+            if delay:
+                self._schedule_flush(delay)
+                return PUSH_SKIPPED_RATE_LIMITED
+
+            _LOGGER.info("Sending queued payload")
+            payload, trimmed, success = await self._async_send_within_budget(
+                current_config,
+                transport,
+                payload,
+                self.push_state.pending_trimmed(current_url),
+                now,
+            )
+            if success is None:
+                self.push_state.queue(
+                    current_url, payload, transport.max_budget, trimmed
+                )
+                self._schedule_flush(transport.send_delay(dt_util.utcnow().timestamp()))
+                return PUSH_SKIPPED_RATE_LIMITED
+            if success:
+                self.push_state.record_success(
+                    current_url, payload_digest(payload), now
+                )
+                return PUSH_SENT
+
+            self.push_state.record_failure(current_url, now)
+            self._schedule_recovery(current_url)
+            return PUSH_FAILED
+
+    def build_payload(
+        self,
+        current_config: dict | None = None,
+        timer: StageTimer | None = None,
+        trim: bool = True,
+    ) -> dict | None:
+        """Build the payload to push, recording the states and what was dropped."""
+        payload, self.last_built, self.last_trimmed = self.compose_payload(
+            current_config, timer, trim, self.recorder
+        )
+        return payload
+
+    def compose_payload(
+        self,
+        current_config: dict | None = None,
+        timer: StageTimer | None = None,
+        trim: bool = True,
+        recorder: SnapshotRecorder | None = None,
+    ) -> tuple[dict | None, list[str], bool]:
+        """Build the webhook payload from the current sensor states.
+
+        Returns the payload, the types of all entities built for it, including
+        those the layout or trimming left out, and whether trimming or paging
+        dropped any for size. Nothing is stored on the processor, so the
+        payload can be built outside of a push.
+        """
+        if timer is None:
+            timer = StageTimer()
+
+        if current_config is None:
+            with timer.stage("config"):
+                current_config = {**self.entry.data, **self.entry.options}
+
+        with timer.stage("states"):
+            states = self._lookup_states(current_config)
+            if states is not None and recorder:
+                recorder.record(states)
+        if states is None:
+            return None, [], False
+
+        with timer.stage("entities"):
+            payload = self._create_payload(current_config, states)
+        if payload is None:
+            return None, [], False
+
+        entities = payload["merge_variables"]["entities"]
+        built = [entity.get("type") for entity in entities]
+        layout = current_config.get(CONF_LAYOUT, DEFAULT_LAYOUT)
+        # With paging, entities beyond the layout capacity go to later pages.
+        if not current_config.get(CONF_PAGING, False):
+            with timer.stage("entities"):
+                selected = select_layout_entities(entities, layout)
+                if len(selected) < len(entities):
+                    _LOGGER.debug(
+                        "Layout %s shows %d of %d entities",
+                        layout,
+                        len(selected),
+                        len(entities),
+                    )
+                    self._set_entities(payload, selected)
+
+        trimmed = False
+        if trim:
+            with timer.stage("trim"):
+                max_size = self.payload_budget(current_config)
+                if current_config.get(CONF_PAGING, False):
+                    trimmed = self._page_payload(
+                        payload, layout_capacity(layout), max_size
+                    )
+                else:
+                    trimmed = self._trim_payload(payload, max_size)
+
+        return payload, built, trimmed
+
+    def payload_budget(self, current_config: dict) -> int:
+        """Return the payload size budget learned for the configured target."""
+        transport = self.transport_for(current_config)
+        if self.push_state is None:
+            return transport.max_payload_size
+        return self.push_state.budget(
+            current_config.get(CONF_URL), transport.max_payload_size
+        )
+
+    def _aggregating(self, current_config: dict) -> bool:
+        """Return whether values are aggregated between pushes."""
+        return self.aggregator is not None and (
+            current_config.get(CONF_AGGREGATION, DEFAULT_AGGREGATION)
+            != AGGREGATION_LAST
+        )
+
+    def _aggregate(self, state, mode: str, now: float):
+        """Return the aggregated value of a state, or None to use the state."""
+        if mode == AGGREGATION_LAST or parse_numeric(state.state) is None:
+            return None
+        return self.aggregator.value(
+            state.entity_id,
+            resolve_mode(mode, state.attributes.get("device_class")),
+            now,
+        )
+
+    def _iaq_values(self, states: dict, mode: str, now: float) -> dict[str, float]:
+        """Return the air quality inputs by device class, as window means if aggregating."""
+        values = {}
+        for state in iaq_states(
+            [states["co2"], *(sensor_state for sensor_state, _, _ in states["sensors"])]
+        ):
+            value = None
+            if mode != AGGREGATION_LAST:
+                value = self._aggregate(state, AGGREGATION_MEAN, now)
+            values[state.attributes["device_class"]] = (
+                parse_numeric(state.state) if value is None else value
+            )
+        return values
+
+    def _lookup_states(self, current_config: dict) -> dict | None:
+        """Look up the states of all configured entities."""
+        current_co2_sensor = current_config.get(CONF_CO2_SENSOR)
+        current_weather_provider = current_config.get(CONF_WEATHER_PROVIDER)
 
         co2_state = (
             self.hass.states.get(current_co2_sensor) if current_co2_sensor else None
         )
-        if co2_state:
-            co2_payload = create_entity_payload(
-                co2_state,
-                sensor_type="co2_primary",
-                custom_name=current_co2_name,
-                include_id=include_ids,
-                decimal_places=decimal_places,
-            )
-            if co2_payload:
-                co2_payload["primary"] = True
-                entities_payload.append(co2_payload)
-                _LOGGER.debug(
-                    "Added CO2 sensor (primary): %s with name '%s' and value %s",
-                    current_co2_sensor,
-                    co2_payload.get("n"),
-                    co2_payload.get("val"),
-                )
-        else:
+        if not co2_state:
             _LOGGER.warning("CO2 sensor %s not found", current_co2_sensor)
-            return
+            return None
 
-        weather_code = None
+        weather_state = None
         if current_weather_provider:
             weather_state = self.hass.states.get(current_weather_provider)
-            if weather_state:
-                weather_code = weather_state.state
-                _LOGGER.debug(
-                    "Weather provider %s has condition: %s",
-                    current_weather_provider,
-                    weather_code,
-                )
-            else:
+            if not weather_state:
                 _LOGGER.warning(
                     "Weather provider %s not found", current_weather_provider
                 )
 
         additional_sensors = [
-            (current_sensor_1, current_sensor_1_name, "sensor_1"),
-            (current_sensor_2, current_sensor_2_name, "sensor_2"),
-            (current_sensor_3, current_sensor_3_name, "sensor_3"),
-            (current_sensor_4, current_sensor_4_name, "sensor_4"),
-            (current_sensor_5, current_sensor_5_name, "sensor_5"),
-            (current_sensor_6, current_sensor_6_name, "sensor_6"),
+            (CONF_SENSOR_1, CONF_SENSOR_1_NAME, "sensor_1"),
+            (CONF_SENSOR_2, CONF_SENSOR_2_NAME, "sensor_2"),
+            (CONF_SENSOR_3, CONF_SENSOR_3_NAME, "sensor_3"),
+            (CONF_SENSOR_4, CONF_SENSOR_4_NAME, "sensor_4"),
+            (CONF_SENSOR_5, CONF_SENSOR_5_NAME, "sensor_5"),
+            (CONF_SENSOR_6, CONF_SENSOR_6_NAME, "sensor_6"),
         ]
 
-        for sensor_id, custom_name, sensor_label in additional_sensors:
+        sensor_states = []
+        for sensor_key, name_key, sensor_label in additional_sensors:
+            sensor_id = current_config.get(sensor_key)
             if sensor_id and isinstance(sensor_id, str) and sensor_id.strip():
                 sensor_state = self.hass.states.get(sensor_id.strip())
                 if sensor_state:
-                    sensor_payload = create_entity_payload(
-                        sensor_state,
-                        sensor_type=sensor_label,
-                        custom_name=custom_name,
-                        include_id=include_ids,
-                        decimal_places=decimal_places,
+                    sensor_states.append(
+                        (sensor_state, current_config.get(name_key), sensor_label)
                     )
-                    if sensor_payload:
-                        entities_payload.append(sensor_payload)
-                        _LOGGER.debug(
-                            "Added %s: %s with name '%s' and value %s",
-                            sensor_label,
-                            sensor_id,
-                            sensor_payload.get("n"),
-                            sensor_payload.get("val"),
-                        )
                 else:
                     _LOGGER.warning("Sensor %s (%s) not found", sensor_label, sensor_id)
 
+        group_states = []
+        for sources, function, name, group_type in get_groups(current_config):
+            states = []
+            for entity_id in expand_sources(self.hass, sources):
+                state = self.hass.states.get(entity_id)
+                if state:
+                    states.append(state)
+                else:
+                    _LOGGER.warning("Source %s of %s not found", entity_id, group_type)
+            group_states.append((states, function, name, group_type))
+
+        return {
+            "co2": co2_state,
+            "weather": weather_state,
+            "sensors": sensor_states,
+            "groups": group_states,
+        }
+
+    def _create_payload(self, current_config: dict, states: dict) -> dict | None:
+        """Create the payload for the looked up states."""
+        include_ids = current_config.get(CONF_INCLUDE_IDS, False)
+        decimal_places = current_config.get(CONF_DECIMAL_PLACES, DEFAULT_DECIMAL_PLACES)
+        layout = current_config.get(CONF_LAYOUT, DEFAULT_LAYOUT)
+        aggregation = (
+            current_config.get(CONF_AGGREGATION, DEFAULT_AGGREGATION)
+            if self._aggregating(current_config)
+            else AGGREGATION_LAST
+        )
+        now = dt_util.utcnow().timestamp()
+
+        entities_payload = []
+
+        co2_state = states["co2"]
+        co2_value = self._aggregate(co2_state, aggregation, now)
+        co2_payload = create_entity_payload(
+            co2_state,
+            sensor_type="co2_primary",
+            custom_name=current_config.get(CONF_CO2_NAME),
+            include_id=include_ids,
+            decimal_places=decimal_places,
+            value=co2_value,
+        )
+        if co2_payload:
+            co2_payload["primary"] = True
+            entities_payload.append(co2_payload)
+
+        weather_code = states["weather"].state if states["weather"] else None
+
+        for sensor_state, custom_name, sensor_label in states["sensors"]:
+            sensor_payload = create_entity_payload(
+                sensor_state,
+                sensor_type=sensor_label,
+                custom_name=custom_name,
+                include_id=include_ids,
+                decimal_places=decimal_places,
+                value=self._aggregate(sensor_state, aggregation, now),
+            )
+            if sensor_payload:
+                entities_payload.append(sensor_payload)
+
+        if states["groups"]:
+            entities_payload.extend(
+                create_group_payloads(states["groups"], decimal_places)
+            )
+
         if not entities_payload:
             _LOGGER.error("No valid sensor data to send")
-            return
+            return None
 
         timestamp = datetime.now().isoformat()
 
-        rounded_co2_value = (
-            round_sensor_value(co2_state.state, decimal_places) if co2_state else None
+        rounded_co2_value = round_sensor_value(
+            co2_state.state if co2_value is None else co2_value, decimal_places
         )
 
+        rating = co2_rating(rounded_co2_value)
+
         payload = {
             "merge_variables": {
                 "entities": entities_payload,
                 "timestamp": timestamp,
                 "count": len(entities_payload),
                 "co2_value": rounded_co2_value,
-                "co2_unit": (
-                    co2_state.attributes.get("unit_of_measurement", "ppm")
-                    if co2_state
-                    else "ppm"
-                ),
+                "co2_unit": co2_state.attributes.get("unit_of_measurement", "ppm"),
+                "co2_rating": rating[1] if rating else None,
+                "co2_band": rating[0] if rating else None,
                 "weather_code": weather_code,
+                "weather_icon": resolve_weather_icon(weather_code),
             }
         }
 
+        if current_config.get(CONF_IAQ, False):
+            score = iaq_score(self._iaq_values(states, aggregation, now))
+            iaq = iaq_rating(score)
+            if iaq:
+                payload["merge_variables"]["iaq_score"] = round(score)
+                payload["merge_variables"]["iaq_rating"] = iaq[1]
+                payload["merge_variables"]["iaq_band"] = iaq[0]
+
+        if self.forecast:
+            forecast = self.forecast.get(now)
+            if forecast:
+                payload["merge_variables"]["forecast"] = forecast
+
+        if layout == LAYOUT_ALL:
+            limits = layout_limits(entities_payload)
+            if limits:
+                payload["merge_variables"]["layouts"] = limits
+
+        return payload
+
+    def _trim_payload(self, payload: dict, max_size: int) -> bool:
+        """Drop forecast entries, then trailing non-primary entities, until it fits.
+
+        Returns whether anything was dropped.
+        """
+        entities_payload = payload["merge_variables"]["entities"]
+
         final_size = estimate_payload_size(payload)
         _LOGGER.debug(
             "Payload size: %d bytes (%d entities)", final_size, len(entities_payload)
         )
 
-        if final_size > MAX_PAYLOAD_SIZE:
-            _LOGGER.warning(
-                "Payload exceeds 2KB limit (%d bytes). Trimming...", final_size
-            )
+        if final_size <= max_size:
+            return False
 
-            essential_payloads = [p for p in entities_payload if p.get("primary")]
-            other_payloads = [p for p in entities_payload if not p.get("primary")]
-
-            final_payloads = essential_payloads.copy()
-            for sensor_payload in other_payloads:
-                test_payload = {
-                    "merge_variables": {
-                        "entities": final_payloads + [sensor_payload],
-                        "timestamp": timestamp,
-                        "count": len(final_payloads) + 1,
-                        "co2_value": rounded_co2_value,
-                        "co2_unit": (
-                            co2_state.attributes.get("unit_of_measurement", "ppm")
-                            if co2_state
-                            else "ppm"
-                        ),
-                        "weather_code": weather_code,
-                    }
-                }
-                if estimate_payload_size(test_payload) <= MAX_PAYLOAD_SIZE:
-                    final_payloads.append(sensor_payload)
-                else:
-                    break
+        _LOGGER.warning(
+            "Payload exceeds %d byte limit (%d bytes). Trimming...",
+            max_size,
+            final_size,
+        )
 
-            payload["merge_variables"]["entities"] = final_payloads
-            payload["merge_variables"]["count"] = len(final_payloads)
+        forecast = payload["merge_variables"].get("forecast")
+        while forecast:
+            forecast = forecast[:-1]
+            if forecast:
+                payload["merge_variables"]["forecast"] = forecast
+            else:
+                del payload["merge_variables"]["forecast"]
             final_size = estimate_payload_size(payload)
-            _LOGGER.debug(
-                "Trimmed payload size: %d bytes (%d entities)",
-                final_size,
-                len(final_payloads),
-            )
+            if final_size <= max_size:
+                _LOGGER.debug(
+                    "Trimmed forecast to %d entries (%d bytes)",
+                    len(forecast),
+                    final_size,
+                )
+                return True
 
-        try:
-            async with aiohttp.ClientSession() as session:
-                _LOGGER.debug("Sending data to TRMNL webhook")
-                async with session.post(current_url, json=payload) as response:
-                    if response.status == 200:
-                        _LOGGER.info(
-                            "Successfully sent %d sensors to TRMNL (CO2: %s)",
-                            len(entities_payload),
-                            rounded_co2_value,
-                        )
-                        _LOGGER.debug("Response: %s", await response.text())
-                    else:
-                        _LOGGER.error("Webhook error: %s", response.status)
-                        _LOGGER.error("Response: %s", await response.text())
-        except Exception as err:
-            _LOGGER.error("Failed to send data to webhook: %s", err)
+        essential_payloads = [p for p in entities_payload if p.get("primary")]
+        other_payloads = [p for p in entities_payload if not p.get("primary")]
+
+        final_payloads = essential_payloads.copy()
+        for sensor_payload in other_payloads:
+            test_payload = {
+                "merge_variables": {
+                    **payload["merge_variables"],
+                    "entities": final_payloads + [sensor_payload],
+                    "count": len(final_payloads) + 1,
+                }
+            }
+            if estimate_payload_size(test_payload) <= max_size:
+                final_payloads.append(sensor_payload)
+            else:
+                break
+
+        self._set_entities(payload, final_payloads)
+        final_size = estimate_payload_size(payload)
+        _LOGGER.debug(
+            "Trimmed payload size: %d bytes (%d entities)",
+            final_size,
+            len(final_payloads),
+        )
+        return True
+
+    def _page_payload(self, payload: dict, capacity: int, max_size: int) -> bool:
+        """Replace the entities with the current page of a round-robin rotation.
+
+        The page advances after each successful push, so every entity is
+        shown over successive pushes while the primary entity stays on all
+        pages. Returns whether the size rather than the capacity limited a
+        page.
+        """
+        pages = paginate_entities(payload["merge_variables"], capacity, max_size)
+        if len(pages) == 1:
+            self._set_entities(payload, pages[0])
+            return False
+
+        primary = sum(1 for entity in pages[0] if entity.get("primary"))
+        size_limited = any(len(page) - primary < capacity for page in pages[:-1])
+
+        index = self._page_index % len(pages)
+        self._set_entities(payload, pages[index])
+        payload["merge_variables"]["page"] = index + 1
+        payload["merge_variables"]["pages"] = len(pages)
+        _LOGGER.debug(
+            "Sending page %d of %d (%d entities, %d bytes)",
+            index + 1,
+            len(pages),
+            len(pages[index]),
+            estimate_payload_size(payload),
+        )
+        return size_limited
+
+    @staticmethod
+    def _set_entities(payload: dict, entities: list[dict]) -> None:
+        """Replace the entities of a payload and update the derived fields."""
+        payload["merge_variables"]["entities"] = entities
+        payload["merge_variables"]["count"] = len(entities)
+        if "layouts" in payload["merge_variables"]:
+            limits = layout_limits(entities)
+            if limits:
+                payload["merge_variables"]["layouts"] = limits
+            else:
+                del payload["merge_variables"]["layouts"]
+
+    async def _async_send_within_budget(
+        self,
+        current_config: dict,
+        transport: Transport,
+        payload: dict,
+        trimmed: bool,
+        now: float,
+        latencies: list[float] | None = None,
+    ) -> tuple[dict, bool, bool | None]:
+        """Send a payload, shrinking the budget and resending on size rejections.
+
+        Trimmed tells whether the payload was trimmed to fit its budget.
+        Returns the payload last sent, rebuilt within the lowered budget after
+        a rejection, whether it was trimmed and whether the server accepted
+        it. Every resend counts against the rate limit of the transport, and
+        once the limit is reached the rebuilt payload is returned unsent with
+        None. The latency of each request is appended to latencies.
+        """
+        current_url = current_config.get(CONF_URL)
+        for attempt in range(BUDGET_RETRIES + 1):
+            if attempt:
+                now = dt_util.utcnow().timestamp()
+                if transport.send_delay(now):
+                    _LOGGER.debug(
+                        "Rate limit of %s transport reached, deferring resend",
+                        transport.name,
+                    )
+                    return payload, trimmed, None
+            try:
+                success = await self._send_payload(transport, payload, now)
+            except PayloadTooLargeError as err:
+                size = estimate_payload_size(payload)
+                _LOGGER.warning(
+                    "%s rejected a payload of %d bytes as too large: %s",
+                    transport.name,
+                    size,
+                    err,
+                )
+                if self.push_state is None:
+                    return payload, trimmed, False
+                self.push_state.record_rejection(
+                    current_url, size, transport.max_payload_size
+                )
+                if attempt == BUDGET_RETRIES:
+                    return payload, trimmed, False
+                rebuilt, built, rebuilt_trimmed = self.compose_payload(current_config)
+                if rebuilt is None:
+                    return payload, trimmed, False
+                payload, trimmed = rebuilt, rebuilt_trimmed
+                self.last_built, self.last_trimmed = built, trimmed
+                continue
+            finally:
+                if latencies is not None:
+                    latencies.append(transport.last_latency)
+
+            if success and self.push_state:
+                self.push_state.record_budget_success(
+                    current_url,
+                    transport.max_payload_size,
+                    transport.max_budget,
+                    trimmed,
+                )
+            return payload, trimmed, success
+        return payload, trimmed, False
+
+    async def _send_payload(
+        self, transport: Transport, payload: dict, now: float
+    ) -> bool:
+        """Send a payload over a transport and return whether it succeeded."""
+        success = await transport.async_send(payload, now)
+        if success:
+            _LOGGER.info(
+                "Successfully sent %d sensors to TRMNL (CO2: %s)",
+                payload["merge_variables"]["count"],
+                payload["merge_variables"]["co2_value"],
+            )
+        return success
@@ -0,0 +1,163 @@
+"""Services for the TRMNL Weather Station integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ATTR_CPROFILE,
+    ATTR_ENABLED,
+    ATTR_ENTRY_ID,
+    ATTR_SEND,
+    ATTR_TICKS,
+    DEFAULT_PROFILE_TICKS,
+    DOMAIN,
+    MAX_PROFILE_TICKS,
+    SERVICE_PROFILE,
+    SERVICE_PUSH_NOW,
+    SERVICE_RECORD,
+)
+from .profiling import async_profile_processor
+from .recording import SnapshotRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TICKS, default=DEFAULT_PROFILE_TICKS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_PROFILE_TICKS)
+        ),
+        vol.Optional(ATTR_SEND, default=False): cv.boolean,
+        vol.Optional(ATTR_CPROFILE, default=False): cv.boolean,
+    }
+)
+
+PUSH_NOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+    }
+)
+
+RECORD_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_ENABLED, default=True): cv.boolean,
+    }
+)
+
+
+def get_processors(hass: HomeAssistant, entry_id: str | None = None) -> dict:
+    """Return the processors of all loaded entries, or of a single entry."""
+    entries = hass.data.get(DOMAIN, {})
+    if entry_id is None:
+        return {
+            loaded_id: data["processor"]
+            for loaded_id, data in entries.items()
+            if "processor" in data
+        }
+
+    if entry_id not in entries or "processor" not in entries[entry_id]:
+        raise ServiceValidationError(f"No loaded TRMNL Weather entry {entry_id}")
+    return {entry_id: entries[entry_id]["processor"]}
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Run instrumented ticks and return per-stage timings."""
+        processors = get_processors(hass, call.data.get(ATTR_ENTRY_ID))
+        _LOGGER.debug("Profiling %d entries", len(processors))
+
+        return {
+            "entries": {
+                entry_id: await async_profile_processor(
+                    hass,
+                    processor,
+                    call.data[ATTR_TICKS],
+                    send=call.data[ATTR_SEND],
+                    cprofile=call.data[ATTR_CPROFILE],
+                )
+                for entry_id, processor in processors.items()
+            }
+        }
+
+    async def async_push_now(call: ServiceCall) -> ServiceResponse:
+        """Push immediately, joining any push already in flight."""
+        processors = get_processors(hass, call.data.get(ATTR_ENTRY_ID))
+        outcomes = await asyncio.gather(
+            *(processor.async_push(force=True) for processor in processors.values())
+        )
+
+        result = {}
+        for (entry_id, processor), outcome in zip(processors.items(), outcomes):
+            config = {**processor.entry.data, **processor.entry.options}
+            result[entry_id] = {
+                "outcome": outcome,
+                "payload_budget": processor.payload_budget(config),
+            }
+        return {"entries": result}
+
+    async def async_record(call: ServiceCall) -> ServiceResponse:
+        """Start or stop recording the states read by each push."""
+        processors = get_processors(hass, call.data.get(ATTR_ENTRY_ID))
+        result = {}
+        for entry_id, processor in processors.items():
+            if not call.data[ATTR_ENABLED]:
+                recorder = await processor.async_stop_recording()
+            elif processor.recorder is None:
+                timestamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+                recorder = SnapshotRecorder(
+                    hass, hass.config.path(f"{DOMAIN}_{entry_id}_{timestamp}.jsonl")
+                )
+                recorder.async_start(
+                    {**processor.entry.data, **processor.entry.options}
+                )
+                processor.recorder = recorder
+                _LOGGER.info("Recording pipeline states to %s", recorder.path)
+            else:
+                recorder = processor.recorder
+
+            result[entry_id] = {"recording": processor.recorder is not None}
+            if recorder:
+                result[entry_id]["path"] = str(recorder.path)
+                result[entry_id]["snapshots"] = recorder.snapshots
+
+        return {"entries": result}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PUSH_NOW,
+        async_push_now,
+        schema=PUSH_NOW_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD,
+        async_record,
+        schema=RECORD_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,145 @@
+"""Significance filtering of state changes between pushes."""
+
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.significant_change import (
+    check_absolute_change,
+    check_percentage_change,
+)
+
+from .aggregation import parse_numeric
+from .const import SIGNIFICANCE_THRESHOLDS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def thresholds_for(
+    device_class: str | None, scale: float
+) -> tuple[float | None, float | None]:
+    """Return the scaled absolute and percentage deadband of a device class."""
+    absolute, percentage = SIGNIFICANCE_THRESHOLDS.get(device_class, (None, None))
+    return (
+        absolute * scale if absolute is not None else None,
+        percentage * scale if percentage is not None else None,
+    )
+
+
+def is_significant(
+    reference: str | None,
+    value: str,
+    thresholds: tuple[float | None, float | None],
+) -> bool:
+    """Return whether a state moved out of the deadband around its reference.
+
+    Numeric states must exceed every configured deadband, like the sensor
+    significant change rules of Home Assistant. Other states are significant
+    whenever they differ.
+    """
+    if reference == value:
+        return False
+
+    old, new = parse_numeric(reference), parse_numeric(value)
+    if old is None or new is None:
+        return True
+
+    absolute, percentage = thresholds
+    if absolute is None and percentage is None:
+        return old != new
+    if absolute is not None and not check_absolute_change(old, new, absolute):
+        return False
+    if percentage is not None and not check_percentage_change(old, new, percentage):
+        return False
+    return True
+
+
+class SignificanceFilter:
+    """Latch whether any tracked entity moved out of its deadband.
+
+    The deadband is centred on the state sent with the last successful push,
+    so a value has to move a full deadband away from what the display shows
+    before it counts, and moving back does not re-trigger until it crosses
+    again. Once latched, later events are ignored until the next push.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_ids: list[str], scale: float):
+        """Initialize the filter."""
+        self.hass = hass
+        self.entity_ids = list(dict.fromkeys(entity_ids))
+        self.scale = scale
+        self.significant = True
+        self._references: dict[str, str] = {}
+        self._thresholds: dict[str | None, tuple[float | None, float | None]] = {}
+        self._unsub = None
+
+    @callback
+    def async_start(self) -> None:
+        """Track state changes of the configured entities."""
+        self._unsub = async_track_state_change_event(
+            self.hass, self.entity_ids, self._async_state_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop tracking state changes."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_reconfigure(self, entity_ids: list[str], scale: float) -> None:
+        """Track another set of entities with another deadband scale.
+
+        The references of the last push are kept. The filter is latched, as
+        the new configuration may change the payload without any state change.
+        """
+        self.async_stop()
+        self.entity_ids = list(dict.fromkeys(entity_ids))
+        if scale != self.scale:
+            self.scale = scale
+            self._thresholds.clear()
+        self.significant = True
+        self.async_start()
+
+    def _check(self, entity_id: str, state: State | None) -> bool:
+        """Return whether a state is significant against its reference."""
+        if state is None:
+            return False
+
+        device_class = state.attributes.get("device_class")
+        thresholds = self._thresholds.get(device_class)
+        if thresholds is None:
+            thresholds = self._thresholds[device_class] = thresholds_for(
+                device_class, self.scale
+            )
+        return is_significant(self._references.get(entity_id), state.state, thresholds)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Latch the filter if a state change crossed its deadband."""
+        if self.significant:
+            return
+        entity_id = event.data["entity_id"]
+        if self._check(entity_id, event.data.get("new_state")):
+            _LOGGER.debug("Significant change of %s", entity_id)
+            self.significant = True
+
+    def snapshot(self) -> dict[str, str]:
+        """Return the current states of the tracked entities."""
+        snapshot = {}
+        for entity_id in self.entity_ids:
+            state = self.hass.states.get(entity_id)
+            if state is not None:
+                snapshot[entity_id] = state.state
+        return snapshot
+
+    def commit(self, snapshot: dict[str, str]) -> None:
+        """Centre the deadbands on the states of a successful push."""
+        self._references = snapshot
+        self.significant = any(
+            self._check(entity_id, self.hass.states.get(entity_id))
+            for entity_id in self.entity_ids
+        )
@@ -0,0 +1,64 @@
+"""Bounded buffer of recent push traces, shown in the entry diagnostics."""
+
+from __future__ import annotations
+
+from collections import deque
+
+from homeassistant.util import dt as dt_util
+
+from .const import TRACE_BUFFER_SIZE
+from .payload_utils import estimate_payload_size
+
+
+def create_trace(
+    outcome: str,
+    payload: dict | None,
+    built: list[str],
+    timings: dict[str, float],
+    status: int | None,
+    latencies: list[float],
+) -> dict:
+    """Return the trace of one push.
+
+    Entities are listed by their payload type, such as co2_primary or
+    sensor_1, so a trace carries no names or values. Entities that were
+    built but are missing from the payload were left out by the layout,
+    trimmed or paged out. Latencies hold one entry per request sent, as a
+    size rejection is followed by a resend.
+    """
+    entities = [
+        entity.get("type")
+        for entity in (payload["merge_variables"]["entities"] if payload else [])
+    ]
+    return {
+        "time": dt_util.utcnow().isoformat(),
+        "outcome": outcome,
+        "size": estimate_payload_size(payload) if payload else None,
+        "entities": entities,
+        "trimmed": [entity for entity in built if entity not in entities],
+        "timings_ms": {
+            stage: round(seconds * 1000, 3) for stage, seconds in timings.items()
+        },
+        "status": status,
+        "latency_ms": [round(latency * 1000, 3) for latency in latencies],
+    }
+
+
+class TraceBuffer:
+    """Keep the traces of the last pushes, dropping the oldest when full."""
+
+    def __init__(self, size: int = TRACE_BUFFER_SIZE):
+        """Initialize the buffer."""
+        self._traces: deque[dict] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        """Return the number of buffered traces."""
+        return len(self._traces)
+
+    def add(self, trace: dict) -> None:
+        """Add a trace, evicting the oldest one if the buffer is full."""
+        self._traces.append(trace)
+
+    def as_list(self) -> list[dict]:
+        """Return the buffered traces, newest first."""
+        return list(reversed(self._traces))
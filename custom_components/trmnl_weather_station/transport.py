@@ -0,0 +1,186 @@
+"""Transports delivering payloads to TRMNL and TRMNL-compatible servers."""
+
+from __future__ import annotations
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import (
+    CONF_TRANSPORT,
+    CONF_URL,
+    DEFAULT_TRANSPORT,
+    LAN_MAX_BUDGET,
+    LAN_MAX_PAYLOAD_SIZE,
+    LAN_RATE_LIMIT,
+    LAN_REQUEST_TIMEOUT,
+    MAX_PAYLOAD_SIZE,
+    PROBE_TIMEOUT,
+    REQUEST_TIMEOUT,
+    TRANSPORT_LAN,
+    TRANSPORT_WEBHOOK,
+    WEBHOOK_MAX_BUDGET,
+    WEBHOOK_RATE_LIMIT,
+)
+from .probe import async_probe_webhook
+
+_LOGGER = logging.getLogger(__name__)
+
+# Words in error responses of servers rejecting a payload for its size.
+SIZE_ERROR_WORDS = ("too large", "too big", "size")
+
+
+class PayloadTooLargeError(Exception):
+    """The server rejected a payload as too large."""
+
+
+def is_size_rejection(status: int, body: str) -> bool:
+    """Return whether an error response rejected a payload for its size."""
+    if status == 413:
+        return True
+    body = body.lower()
+    return status in (400, 422) and any(word in body for word in SIZE_ERROR_WORDS)
+
+
+class Transport(ABC):
+    """Deliver payloads to one display server.
+
+    Each transport declares the largest payload its server accepts and how
+    many requests it accepts over a rolling period. The pipeline trims
+    payloads to the size limit and defers pushes while the rate limit is
+    exhausted. The size limit is where a learned budget starts, and the
+    budget may grow up to the maximum budget if the server accepts more.
+    """
+
+    name: str
+    max_payload_size: int = MAX_PAYLOAD_SIZE
+    max_budget: int = WEBHOOK_MAX_BUDGET
+    rate_limit: tuple[int, float] | None = None
+    probe_timeout: float = PROBE_TIMEOUT
+
+    def __init__(self, hass: HomeAssistant, url: str):
+        """Initialize the transport."""
+        self.hass = hass
+        self.url = url
+        self._sent_at: deque[float] = deque(
+            maxlen=self.rate_limit[0] if self.rate_limit else 0
+        )
+        self.last_status: int | None = None
+        self.last_latency: float | None = None
+
+    def send_delay(self, now: float) -> float:
+        """Return the seconds until the rate limit allows another request."""
+        if not self.rate_limit or len(self._sent_at) < self.rate_limit[0]:
+            return 0
+        return max(self._sent_at[0] + self.rate_limit[1] - now, 0)
+
+    async def async_send(self, payload: dict, now: float) -> bool:
+        """Send a payload and return whether the server accepted it.
+
+        The status and the latency in seconds of the request are kept in
+        last_status and last_latency.
+        """
+        if self.rate_limit:
+            self._sent_at.append(now)
+        self.last_status = None
+        start = time.perf_counter()
+        try:
+            return await self._async_post(payload)
+        except PayloadTooLargeError:
+            raise
+        except Exception as err:
+            _LOGGER.error("Failed to send data to %s: %s", self.name, err)
+        finally:
+            self.last_latency = time.perf_counter() - start
+        return False
+
+    async def async_probe(self) -> float:
+        """Return the round-trip latency of the server in seconds."""
+        return await async_probe_webhook(self.url, self.probe_timeout)
+
+    @abstractmethod
+    async def _async_post(self, payload: dict) -> bool:
+        """Post a payload and return whether the server accepted it."""
+
+    async def _async_check_response(self, response: aiohttp.ClientResponse) -> bool:
+        """Return whether a response accepted the payload, logging errors.
+
+        Raises PayloadTooLargeError if the payload was rejected for its size.
+        """
+        self.last_status = response.status
+        body = await response.text()
+        if response.status == 200:
+            _LOGGER.debug("Response: %s", body)
+            return True
+
+        if is_size_rejection(response.status, body):
+            raise PayloadTooLargeError(f"{response.status}: {body}")
+
+        _LOGGER.error("Webhook error: %s", response.status)
+        _LOGGER.error("Response: %s", body)
+        return False
+
+
+class WebhookTransport(Transport):
+    """Post payloads to the TRMNL cloud webhook of a private plugin."""
+
+    name = TRANSPORT_WEBHOOK
+    max_payload_size = MAX_PAYLOAD_SIZE
+    rate_limit = WEBHOOK_RATE_LIMIT
+
+    async def _async_post(self, payload: dict) -> bool:
+        """Post a payload over a new connection."""
+        timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            _LOGGER.debug("Sending data to TRMNL webhook")
+            async with session.post(self.url, json=payload) as response:
+                return await self._async_check_response(response)
+
+
+class LanTransport(Transport):
+    """Post payloads to a self-hosted TRMNL-compatible server on the LAN.
+
+    Local servers take larger payloads and more frequent pushes than the
+    cloud webhook. Requests reuse the shared Home Assistant session, so the
+    connection is kept alive between pushes, and time out quickly.
+    """
+
+    name = TRANSPORT_LAN
+    max_payload_size = LAN_MAX_PAYLOAD_SIZE
+    max_budget = LAN_MAX_BUDGET
+    rate_limit = LAN_RATE_LIMIT
+    probe_timeout = LAN_REQUEST_TIMEOUT
+
+    async def _async_post(self, payload: dict) -> bool:
+        """Post a payload over the shared session."""
+        session = async_get_clientsession(self.hass)
+        _LOGGER.debug("Sending data to local TRMNL server")
+        async with session.post(
+            self.url,
+            json=payload,
+            timeout=aiohttp.ClientTimeout(total=LAN_REQUEST_TIMEOUT),
+        ) as response:
+            return await self._async_check_response(response)
+
+
+TRANSPORT_CLASSES: dict[str, type[Transport]] = {
+    TRANSPORT_WEBHOOK: WebhookTransport,
+    TRANSPORT_LAN: LanTransport,
+}
+
+
+def get_transport_class(config: dict) -> type[Transport]:
+    """Return the transport class selected by an entry configuration."""
+    return TRANSPORT_CLASSES.get(
+        config.get(CONF_TRANSPORT, DEFAULT_TRANSPORT), WebhookTransport
+    )
+
+
+def create_transport(hass: HomeAssistant, config: dict) -> Transport:
+    """Return the transport selected by an entry configuration."""
+    return get_transport_class(config)(hass, config.get(CONF_URL))
@@ -3,13 +3,16 @@
 import logging
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.template import Template
 
 _LOGGER = logging.getLogger(__name__)
 
 
 def get_trmnl_entities(hass: HomeAssistant):
     """Retrieve all entities labeled with 'TRMNL'."""
+    # The template engine is only needed for label lookups, keep it off the
+    # integration import path.
+    from homeassistant.helpers.template import Template
+
     template_str = "{{ label_entities('TRMNL') }}"
     template = Template(template_str, hass)
     return template.async_render()
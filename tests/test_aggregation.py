@@ -0,0 +1,137 @@
+"""Test windowed aggregation of sensor values."""
+import pytest
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yarl import URL
+
+from custom_components.trmnl_weather_station.aggregation import (
+    WindowAggregator,
+    parse_numeric,
+    resolve_mode,
+)
+from custom_components.trmnl_weather_station.const import (
+    AGGREGATION_AUTO,
+    AGGREGATION_EMA,
+    AGGREGATION_LAST,
+    AGGREGATION_MAX,
+    AGGREGATION_MEAN,
+    CONF_AGGREGATION,
+    CONF_CO2_SENSOR,
+    CONF_URL,
+    DOMAIN,
+)
+from custom_components.trmnl_weather_station.push_state import PushState
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+
+WEBHOOK_URL = "https://example.com/webhook"
+CO2 = "sensor.test_co2"
+
+
+def test_parse_numeric():
+    """Test only finite numbers are aggregated."""
+    assert parse_numeric("412.5") == 412.5
+    assert parse_numeric("unavailable") is None
+    assert parse_numeric(None) is None
+    assert parse_numeric("nan") is None
+
+
+def test_resolve_mode():
+    """Test auto mode picks a mode per device class."""
+    assert resolve_mode(AGGREGATION_AUTO, "pm25") == AGGREGATION_MAX
+    assert resolve_mode(AGGREGATION_AUTO, "carbon_dioxide") == AGGREGATION_MEAN
+    assert resolve_mode(AGGREGATION_AUTO, "battery") == AGGREGATION_LAST
+    assert resolve_mode(AGGREGATION_EMA, "pm25") == AGGREGATION_EMA
+
+
+async def test_set_entities_keeps_windows(hass: HomeAssistant):
+    """Test swapping the tracked entities keeps retained windows."""
+    hass.states.async_set("sensor.temp", "21")
+    aggregator = WindowAggregator(hass, [CO2])
+    aggregator.add_sample(CO2, 400.0, 0.0)
+    aggregator.add_sample(CO2, 1000.0, 60.0)
+
+    aggregator.async_set_entities([CO2, "sensor.temp"], 90.0)
+    assert aggregator.value(CO2, AGGREGATION_MAX, 120.0) == 1000.0
+    assert aggregator.value(CO2, AGGREGATION_MEAN, 120.0) == pytest.approx(700.0)
+    assert aggregator.value("sensor.temp", AGGREGATION_LAST, 120.0) == 21.0
+
+    aggregator.async_set_entities(["sensor.temp"], 120.0)
+    assert aggregator.value(CO2, AGGREGATION_LAST, 120.0) is None
+    aggregator.async_stop()
+
+
+def test_window_aggregates(hass: HomeAssistant):
+    """Test the mean is time-weighted and the window resets."""
+    aggregator = WindowAggregator(hass, [CO2], ema_time_constant=60)
+    aggregator.add_sample(CO2, 400.0, 0.0)
+    aggregator.add_sample(CO2, 1000.0, 90.0)
+    aggregator.add_sample(CO2, 500.0, 100.0)
+    aggregator.add_sample(CO2, None, 110.0)
+
+    # 400 for 90 s, 1000 for 10 s, 500 for 20 s.
+    assert aggregator.value(CO2, AGGREGATION_MEAN, 120.0) == pytest.approx(
+        (400 * 90 + 1000 * 10 + 500 * 20) / 120
+    )
+    assert aggregator.value(CO2, AGGREGATION_MAX, 120.0) == 1000.0
+    assert aggregator.value(CO2, AGGREGATION_LAST, 120.0) == 500.0
+    assert 400.0 < aggregator.value(CO2, AGGREGATION_EMA, 120.0) < 1000.0
+    assert aggregator.value("sensor.unknown", AGGREGATION_MEAN, 120.0) is None
+
+    aggregator.reset_window(120.0)
+    assert aggregator.value(CO2, AGGREGATION_MEAN, 180.0) == pytest.approx(500.0)
+    assert aggregator.value(CO2, AGGREGATION_MAX, 180.0) == 500.0
+
+
+async def test_aggregator_tracks_state_changes(hass: HomeAssistant):
+    """Test state change events feed the accumulators."""
+    hass.states.async_set(CO2, "400")
+    aggregator = WindowAggregator(hass, [CO2])
+    aggregator.async_start(0.0)
+
+    hass.states.async_set(CO2, "900")
+    hass.states.async_set(CO2, "unavailable")
+    hass.states.async_set(CO2, "600")
+    await hass.async_block_till_done()
+    aggregator.async_stop()
+
+    hass.states.async_set(CO2, "2000")
+    await hass.async_block_till_done()
+
+    assert aggregator.value(CO2, AGGREGATION_MAX, 1.0) == 900.0
+    assert aggregator.value(CO2, AGGREGATION_LAST, 1.0) == 600.0
+
+
+async def test_processor_sends_aggregate(hass: HomeAssistant):
+    """Test the payload carries the aggregate and unchanged aggregates are skipped."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_URL: WEBHOOK_URL, CONF_CO2_SENSOR: CO2},
+        options={CONF_AGGREGATION: AGGREGATION_MAX},
+    )
+    hass.states.async_set(CO2, "400", {"unit_of_measurement": "ppm"})
+    aggregator = WindowAggregator(hass, [CO2])
+    aggregator.async_start(0.0)
+    hass.states.async_set(CO2, "1200", {"unit_of_measurement": "ppm"})
+    hass.states.async_set(CO2, "450", {"unit_of_measurement": "ppm"})
+    await hass.async_block_till_done()
+
+    push_state = PushState(hass, entry.entry_id)
+    processor = SensorProcessor(hass, entry, push_state, aggregator)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200, payload={"success": True}, repeat=True)
+
+        assert await processor.process_sensors() == "sent"
+        requests = mock_http.requests[("POST", URL(WEBHOOK_URL))]
+        merge_variables = requests[0].kwargs["json"]["merge_variables"]
+        assert merge_variables["co2_value"] == 1200
+        assert merge_variables["entities"][0]["val"] == 1200
+
+        # The window restarts at the last value after a push.
+        assert await processor.process_sensors() == "sent"
+        assert len(requests) == 2
+        assert await processor.process_sensors() == "skipped_unchanged"
+        assert len(requests) == 2
+
+    aggregator.async_stop()
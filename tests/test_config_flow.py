@@ -0,0 +1,127 @@
+"""Test config flow validation."""
+from unittest.mock import patch
+
+import pytest
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station import config_flow
+from custom_components.trmnl_weather_station.config_flow import (
+    CannotConnect,
+    InvalidEntity,
+    TrmnlWeatherOptionsFlowHandler,
+    validate_input,
+)
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_SENSOR_1,
+    CONF_URL,
+    DOMAIN,
+    MAX_PAYLOAD_SIZE,
+)
+
+WEBHOOK_URL = "https://example.com/webhook"
+
+
+@pytest.fixture
+def config_data() -> dict:
+    """Return config data of the entities set up by set_states."""
+    return {
+        CONF_URL: WEBHOOK_URL,
+        CONF_CO2_SENSOR: "sensor.test_co2",
+        CONF_SENSOR_1: "sensor.temperature",
+    }
+
+
+def set_states(hass: HomeAssistant) -> None:
+    """Set up the configured entities."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set("sensor.temperature", "21.5", {"unit_of_measurement": "°C"})
+
+
+async def test_validate_input_probes_webhook(hass: HomeAssistant, config_data):
+    """Test validation reports webhook latency and payload headroom."""
+    set_states(hass)
+    with aioresponses() as mock_http:
+        mock_http.get(WEBHOOK_URL, status=200, payload={"merge_variables": {}})
+        info = await validate_input(hass, config_data)
+
+    assert info["title"] == "TRMNL Weather (Test Co2)"
+    assert info["latency_ms"] >= 0
+    assert 0 < info["headroom"] < MAX_PAYLOAD_SIZE
+
+
+@pytest.mark.parametrize("status", [404, 503])
+async def test_validate_input_rejects_failing_webhook(
+    hass: HomeAssistant, config_data, status
+):
+    """Test a missing or failing webhook raises CannotConnect."""
+    set_states(hass)
+    with aioresponses() as mock_http:
+        mock_http.get(WEBHOOK_URL, status=status)
+        with pytest.raises(CannotConnect):
+            await validate_input(hass, config_data)
+
+
+async def test_validate_input_rejects_unreachable_webhook(
+    hass: HomeAssistant, config_data
+):
+    """Test a timed out probe raises CannotConnect."""
+    set_states(hass)
+    with aioresponses() as mock_http:
+        mock_http.get(WEBHOOK_URL, exception=TimeoutError())
+        with pytest.raises(CannotConnect):
+            await validate_input(hass, config_data)
+
+
+async def test_validate_input_checks_entities_first(hass: HomeAssistant, config_data):
+    """Test an invalid entity is reported without waiting for the probe."""
+    set_states(hass)
+    config_data[CONF_SENSOR_1] = "sensor.missing"
+    with aioresponses() as mock_http:
+        mock_http.get(WEBHOOK_URL, status=200)
+        with pytest.raises(InvalidEntity):
+            await validate_input(hass, config_data)
+
+
+async def test_validate_input_probes_during_validation(
+    hass: HomeAssistant, config_data
+):
+    """Test the probe request is sent before the entities are validated."""
+    set_states(hass)
+    validate_entities = config_flow._validate_entities
+    requests_at_validation = []
+
+    def record_requests(*args):
+        requests_at_validation.append(len(mock_http.requests))
+        return validate_entities(*args)
+
+    with aioresponses() as mock_http, patch.object(
+        config_flow, "_validate_entities", record_requests
+    ):
+        mock_http.get(WEBHOOK_URL, status=200)
+        await validate_input(hass, config_data)
+
+    assert requests_at_validation == [1]
+
+
+async def test_options_probe_only_new_url(hass: HomeAssistant, config_data):
+    """Test options without a new URL save while the webhook is unreachable."""
+    set_states(hass)
+    entry = MockConfigEntry(domain=DOMAIN, data=config_data)
+    entry.add_to_hass(hass)
+    flow = TrmnlWeatherOptionsFlowHandler(entry)
+    flow.hass = hass
+    flow.config_entry = entry
+
+    with aioresponses() as mock_http:
+        mock_http.get(WEBHOOK_URL, exception=TimeoutError(), repeat=True)
+        result = await flow.async_step_init(dict(config_data))
+        assert result["type"] == "create_entry"
+        assert not mock_http.requests
+
+        new_url = f"{WEBHOOK_URL}/new"
+        mock_http.get(new_url, exception=TimeoutError())
+        result = await flow.async_step_init({**config_data, CONF_URL: new_url})
+        assert result["errors"] == {"base": "cannot_connect"}
@@ -0,0 +1,131 @@
+"""Test the diagnostics and push traces of an entry."""
+from aioresponses import aioresponses
+from homeassistant.components.diagnostics import REDACTED
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station import (
+    async_setup_entry,
+    async_unload_entry,
+)
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_LAYOUT,
+    CONF_SENSOR_1,
+    CONF_SENSOR_2,
+    CONF_SENSOR_3,
+    CONF_SENSOR_4,
+    CONF_SENSOR_5,
+    CONF_URL,
+    DOMAIN,
+    PUSH_FAILED,
+    PUSH_SENT,
+    PUSH_SKIPPED_UNCHANGED,
+)
+from custom_components.trmnl_weather_station.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.trmnl_weather_station.push_state import PushState
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+from custom_components.trmnl_weather_station.traces import TraceBuffer
+
+WEBHOOK_URL = "https://example.com/webhook"
+
+
+def test_trace_buffer_is_bounded():
+    """Test the buffer keeps the newest traces, newest first."""
+    traces = TraceBuffer(3)
+    for number in range(5):
+        traces.add({"number": number})
+
+    assert len(traces) == 3
+    assert [trace["number"] for trace in traces.as_list()] == [4, 3, 2]
+
+
+async def test_diagnostics(hass: HomeAssistant):
+    """Test diagnostics carry redacted settings and traces of recent pushes."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set("sensor.temp", "21.5", {"unit_of_measurement": "°C"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: WEBHOOK_URL,
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_SENSOR_1: "sensor.temp",
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200)
+        mock_http.post(WEBHOOK_URL, status=500, body="Server error")
+        await async_setup_entry(hass, entry)
+        await hass.async_block_till_done()
+        processor = hass.data[DOMAIN][entry.entry_id]["processor"]
+        processor.transport_for(entry.data).rate_limit = None
+
+        # Setup pushed already, so the first push here is skipped as unchanged.
+        await processor.async_push(only_if_changed=True)
+        hass.states.async_set("sensor.temp", "22", {"unit_of_measurement": "°C"})
+        await processor.async_push(only_if_changed=True)
+        # A payload built but not sent leaves no trace.
+        await processor.process_sensors(send=False)
+
+        diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert diagnostics["entry"]["data"][CONF_URL] == REDACTED
+    assert diagnostics["entry"]["data"][CONF_CO2_SENSOR] == "sensor.test_co2"
+    assert diagnostics["target"]["failures"] == 1
+    assert diagnostics["target"]["pending"] is True
+
+    failed, unchanged, sent = diagnostics["traces"][:3]
+    assert sent["outcome"] == PUSH_SENT
+    assert sent["status"] == 200
+    assert sent["entities"] == ["co2_primary", "sensor_1"]
+    assert sent["trimmed"] == []
+    assert sent["size"] > 0
+    assert len(sent["latency_ms"]) == 1
+    assert sent["latency_ms"][0] <= sent["timings_ms"]["send"]
+    assert unchanged["outcome"] == PUSH_SKIPPED_UNCHANGED
+    assert unchanged["status"] is None
+    assert unchanged["latency_ms"] == []
+    assert failed["outcome"] == PUSH_FAILED
+    assert failed["status"] == 500
+    assert WEBHOOK_URL not in str(diagnostics)
+
+    processor.async_stop()
+    await async_unload_entry(hass, entry)
+
+
+async def test_trace_of_resized_push(hass: HomeAssistant):
+    """Test traces list entities the layout left out and each request sent."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    data = {CONF_URL: WEBHOOK_URL, CONF_CO2_SENSOR: "sensor.test_co2"}
+    sensors = [
+        CONF_SENSOR_1,
+        CONF_SENSOR_2,
+        CONF_SENSOR_3,
+        CONF_SENSOR_4,
+        CONF_SENSOR_5,
+    ]
+    for number, sensor_key in enumerate(sensors, start=1):
+        hass.states.async_set(
+            f"sensor.room_{number}", "20", {"friendly_name": f"Room {number}"}
+        )
+        data[sensor_key] = f"sensor.room_{number}"
+    entry = MockConfigEntry(
+        domain=DOMAIN, data=data, options={CONF_LAYOUT: "half_horizontal"}
+    )
+    push_state = PushState(hass, entry.entry_id)
+    processor = SensorProcessor(hass, entry, push_state)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=413, body="Payload Too Large")
+        mock_http.post(WEBHOOK_URL, status=200)
+        assert await processor.process_sensors() == PUSH_SENT
+
+    (trace,) = processor.traces.as_list()
+    assert "sensor_5" in trace["trimmed"]
+    assert "sensor_5" not in trace["entities"]
+    assert len(trace["latency_ms"]) == 2
+    processor.async_stop()
@@ -0,0 +1,146 @@
+"""Test the cached forecast summary."""
+from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_URL,
+    CONF_WEATHER_PROVIDER,
+    DOMAIN,
+    FORECAST_DAILY,
+    FORECAST_ENTRIES,
+    FORECAST_HOURLY,
+    MAX_PAYLOAD_SIZE,
+)
+from custom_components.trmnl_weather_station.forecast import (
+    DATA_FORECAST_CACHES,
+    ForecastCache,
+    async_acquire_forecast_cache,
+    async_release_forecast_cache,
+    compact_forecast,
+)
+from custom_components.trmnl_weather_station.payload_utils import estimate_payload_size
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+
+WEATHER = "weather.home"
+FORECAST = [
+    {
+        "datetime": f"2025-01-0{day}T12:00:00+00:00",
+        "condition": "rainy",
+        "temperature": 12.4,
+        "templow": 4.6,
+        "precipitation_probability": 80,
+    }
+    for day in range(1, 8)
+]
+
+
+def register_forecast_service(hass: HomeAssistant, fail: bool = False) -> list:
+    """Register a stand-in weather.get_forecasts service and return its calls."""
+    calls = []
+
+    async def get_forecasts(call: ServiceCall):
+        calls.append(call)
+        if fail:
+            raise HomeAssistantError("rate limited")
+        return {WEATHER: {"forecast": FORECAST}}
+
+    hass.services.async_register(
+        "weather",
+        "get_forecasts",
+        get_forecasts,
+        supports_response=SupportsResponse.ONLY,
+    )
+    return calls
+
+
+def test_compact_forecast():
+    """Test forecast entries are limited and reduced to short fields."""
+    summary = compact_forecast(FORECAST, FORECAST_DAILY)
+
+    assert len(summary) == FORECAST_ENTRIES
+    assert summary[0]["ic"] == "mdi-weather-rainy"
+    assert summary[0]["hi"] == 12
+    assert summary[0]["lo"] == 5
+    assert summary[0]["p"] == 80
+    assert compact_forecast([{"condition": "sunny"}], FORECAST_DAILY) == []
+
+
+async def test_forecast_cache_ttl(hass: HomeAssistant):
+    """Test the cache serves the last forecast until it expires."""
+    calls = register_forecast_service(hass)
+    cache = ForecastCache(hass, WEATHER, FORECAST_DAILY, ttl=600)
+    now = dt_util.utcnow().timestamp()
+
+    assert cache.get(now) is None
+    assert await cache.async_refresh()
+    assert calls[0].data == {"entity_id": WEATHER, "type": FORECAST_DAILY}
+    assert len(cache.get(now)) == FORECAST_ENTRIES
+    assert cache.get(now + 700) is None
+
+
+async def test_forecast_refresh_failure(hass: HomeAssistant):
+    """Test a failing forecast service keeps the cache empty."""
+    register_forecast_service(hass, fail=True)
+    cache = ForecastCache(hass, WEATHER, FORECAST_DAILY)
+
+    assert not await cache.async_refresh()
+    assert cache.get(dt_util.utcnow().timestamp()) is None
+
+
+async def test_forecast_cache_shared(hass: HomeAssistant):
+    """Test entries on one provider share a cache until the last releases it."""
+    calls = register_forecast_service(hass)
+
+    first = async_acquire_forecast_cache(hass, WEATHER, FORECAST_DAILY)
+    second = async_acquire_forecast_cache(hass, WEATHER, FORECAST_DAILY)
+    hourly = async_acquire_forecast_cache(hass, WEATHER, FORECAST_HOURLY)
+    await hass.async_block_till_done()
+
+    assert first is second
+    assert hourly is not first
+    assert [call.data["type"] for call in calls] == [FORECAST_DAILY, FORECAST_HOURLY]
+    assert len(first.get(dt_util.utcnow().timestamp())) == FORECAST_ENTRIES
+
+    async_release_forecast_cache(hass, first)
+    async_release_forecast_cache(hass, hourly)
+    assert list(hass.data[DOMAIN][DATA_FORECAST_CACHES]) == [(WEATHER, FORECAST_DAILY)]
+
+    async_release_forecast_cache(hass, second)
+    assert DATA_FORECAST_CACHES not in hass.data[DOMAIN]
+    assert second._unsub is None
+
+
+async def test_processor_adds_cached_forecast(hass: HomeAssistant):
+    """Test the payload carries the cached forecast and trims it first."""
+    register_forecast_service(hass)
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_WEATHER_PROVIDER: WEATHER,
+        },
+    )
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set(WEATHER, "rainy")
+
+    cache = ForecastCache(hass, WEATHER, FORECAST_DAILY)
+    processor = SensorProcessor(hass, entry, forecast=cache)
+    assert "forecast" not in processor.build_payload()["merge_variables"]
+
+    await cache.async_refresh()
+    payload = processor.build_payload()
+    assert len(payload["merge_variables"]["forecast"]) == FORECAST_ENTRIES
+
+    hass.states.async_set(
+        "sensor.test_co2",
+        "400",
+        {"unit_of_measurement": "ppm", "friendly_name": "CO2 " + "x" * 1700},
+    )
+    payload = processor.build_payload()
+    assert estimate_payload_size(payload) <= MAX_PAYLOAD_SIZE
+    assert len(payload["merge_variables"].get("forecast", [])) < FORECAST_ENTRIES
+    assert payload["merge_variables"]["count"] == 1
@@ -0,0 +1,140 @@
+"""Test group entities aggregated over several source entities."""
+from array import array
+
+from homeassistant.core import HomeAssistant, State
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station import get_tracked_entity_ids
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_GROUP_1_FUNCTION,
+    CONF_GROUP_1_NAME,
+    CONF_GROUP_1_SOURCES,
+    CONF_GROUP_2_SOURCES,
+    CONF_URL,
+    DOMAIN,
+    GROUP_MAX,
+    GROUP_MEAN,
+    GROUP_MEDIAN,
+    GROUP_MIN,
+)
+from custom_components.trmnl_weather_station.groups import (
+    create_group_payloads,
+    expand_sources,
+    get_groups,
+    reduce_values,
+)
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+
+TEMPERATURE = {"unit_of_measurement": "°C", "device_class": "temperature"}
+
+
+def test_reduce_values():
+    """Test each function over an array of values."""
+    values = array("d", [21.0, 19.0, 24.0, 20.0])
+    assert reduce_values(values, GROUP_MIN) == 19.0
+    assert reduce_values(values, GROUP_MAX) == 24.0
+    assert reduce_values(values, GROUP_MEAN) == 21.0
+    assert reduce_values(values, GROUP_MEDIAN) == 20.5
+    assert reduce_values(values[:3], GROUP_MEDIAN) == 21.0
+    assert reduce_values(array("d"), GROUP_MEAN) is None
+
+
+def test_get_groups():
+    """Test only groups with sources are returned, with the default function."""
+    config = {
+        CONF_GROUP_1_SOURCES: ["sensor.a", " ", "sensor.b "],
+        CONF_GROUP_2_SOURCES: [],
+    }
+    assert get_groups(config) == [
+        (["sensor.a", "sensor.b"], GROUP_MEAN, None, "group_1")
+    ]
+    assert get_groups({}) == []
+
+
+async def test_expand_sources(hass: HomeAssistant):
+    """Test group entities stand for their members."""
+    hass.states.async_set("group.rooms", "on", {"entity_id": ["sensor.a", "sensor.b"]})
+    assert expand_sources(hass, ["group.rooms", "sensor.b", "sensor.c"]) == [
+        "sensor.a",
+        "sensor.b",
+        "sensor.c",
+    ]
+
+    config = {CONF_CO2_SENSOR: "sensor.co2", CONF_GROUP_1_SOURCES: ["group.rooms"]}
+    assert get_tracked_entity_ids(config) == ["sensor.co2", "group.rooms"]
+    assert get_tracked_entity_ids(config, hass) == [
+        "sensor.co2",
+        "sensor.a",
+        "sensor.b",
+    ]
+
+
+def test_create_group_payloads():
+    """Test groups reduce their own sources and skip other units."""
+    groups = [
+        (
+            [
+                State("sensor.a", "21.04", TEMPERATURE),
+                State("sensor.b", "unavailable", TEMPERATURE),
+                State("sensor.c", "70", {"unit_of_measurement": "°F"}),
+                State("sensor.d", "23.0", TEMPERATURE),
+            ],
+            GROUP_MAX,
+            None,
+            "group_1",
+        ),
+        ([State("sensor.e", "unknown", {})], GROUP_MEAN, " Outside ", "group_2"),
+    ]
+
+    assert create_group_payloads(groups) == [
+        {
+            "val": 23.0,
+            "type": "group_1",
+            "agg": GROUP_MAX,
+            "u": "°C",
+            "n": "Max temperature",
+            "device_class": "temperature",
+            "ic": "mdi-thermometer",
+        },
+        {
+            "val": "unavailable",
+            "type": "group_2",
+            "agg": GROUP_MEAN,
+            "n": "Outside",
+            "ic": "mdi-gauge",
+        },
+    ]
+
+
+async def test_sensor_processor_group_payload(hass: HomeAssistant):
+    """Test a group is sent as one entity after the sensors."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set("sensor.kitchen", "20", TEMPERATURE)
+    hass.states.async_set("sensor.bedroom", "18", TEMPERATURE)
+    hass.states.async_set(
+        "group.rooms", "on", {"entity_id": ["sensor.kitchen", "sensor.bedroom"]}
+    )
+    hass.states.async_set("sensor.office", "22", TEMPERATURE)
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+        },
+        options={
+            CONF_GROUP_1_SOURCES: ["group.rooms", "sensor.office", "sensor.missing"],
+            CONF_GROUP_1_FUNCTION: GROUP_MEDIAN,
+            CONF_GROUP_1_NAME: "Rooms",
+        },
+    )
+
+    entities = SensorProcessor(hass, entry).build_payload()["merge_variables"][
+        "entities"
+    ]
+
+    assert len(entities) == 2
+    assert entities[1]["type"] == "group_1"
+    assert entities[1]["n"] == "Rooms"
+    assert entities[1]["val"] == 20.0
@@ -0,0 +1,122 @@
+"""Test the composite indoor air quality score."""
+import pytest
+from homeassistant.core import HomeAssistant, State
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station.aggregation import WindowAggregator
+from custom_components.trmnl_weather_station.const import (
+    AGGREGATION_MEAN,
+    CONF_AGGREGATION,
+    CONF_CO2_SENSOR,
+    CONF_IAQ,
+    CONF_SENSOR_1,
+    CONF_SENSOR_2,
+    CONF_URL,
+    DOMAIN,
+    IAQ_BREAKPOINTS,
+)
+from custom_components.trmnl_weather_station.iaq import (
+    iaq_rating,
+    iaq_score,
+    iaq_states,
+    sub_score,
+)
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+
+CO2 = "sensor.test_co2"
+
+
+def test_sub_score():
+    """Test sub-scores interpolate between breakpoints and clamp beyond them."""
+    co2 = IAQ_BREAKPOINTS["carbon_dioxide"]
+    assert sub_score(400, co2) == 100
+    assert sub_score(800, co2) == 87.5
+    assert sub_score(5000, co2) == 0
+
+    humidity = IAQ_BREAKPOINTS["humidity"]
+    assert sub_score(50, humidity) == 100
+    assert sub_score(25, humidity) == 30
+    assert sub_score(75, humidity) == 30
+    assert sub_score(95, humidity) == 0
+
+
+def test_iaq_states():
+    """Test the first state per device class is used, and one kind of VOC."""
+    co2 = State("sensor.co2", "600", {"device_class": "carbon_dioxide"})
+    voc = State(
+        "sensor.voc", "100", {"device_class": "volatile_organic_compounds_parts"}
+    )
+    assert iaq_states(
+        [
+            co2,
+            State("sensor.temperature", "21", {"device_class": "temperature"}),
+            voc,
+            State(
+                "sensor.voc_mass", "300", {"device_class": "volatile_organic_compounds"}
+            ),
+            State("sensor.co2_other", "900", {"device_class": "carbon_dioxide"}),
+        ]
+    ) == [co2, voc]
+
+
+def test_iaq_score():
+    """Test the score is a weighted mean that a single bad input caps."""
+    assert iaq_score({}) is None
+    assert iaq_score({"carbon_dioxide": None}) is None
+    assert iaq_score({"carbon_dioxide": 500, "humidity": 50}) == pytest.approx(100)
+    assert iaq_score({"carbon_dioxide": 1000, "humidity": 50}) == pytest.approx(
+        (0.35 * 75 + 0.1 * 100) / 0.45
+    )
+    assert iaq_score(
+        {"carbon_dioxide": 500, "pm25": 100, "humidity": 50}
+    ) == pytest.approx(20)
+
+
+def test_iaq_rating():
+    """Test scores map to bands, best first."""
+    assert iaq_rating(95) == (0, "Excellent")
+    assert iaq_rating(80) == (0, "Excellent")
+    assert iaq_rating(65) == (1, "Good")
+    assert iaq_rating(10) == (3, "Poor")
+    assert iaq_rating(None) is None
+
+
+async def test_processor_sends_iaq_over_window(hass: HomeAssistant):
+    """Test the score uses window means and is only sent when enabled."""
+    hass.states.async_set(
+        CO2, "400", {"unit_of_measurement": "ppm", "device_class": "carbon_dioxide"}
+    )
+    hass.states.async_set(
+        "sensor.pm25", "5", {"unit_of_measurement": "µg/m³", "device_class": "pm25"}
+    )
+    hass.states.async_set("sensor.temperature", "21", {"device_class": "temperature"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: CO2,
+            CONF_SENSOR_1: "sensor.temperature",
+            CONF_SENSOR_2: "sensor.pm25",
+        },
+        options={CONF_AGGREGATION: AGGREGATION_MEAN, CONF_IAQ: True},
+    )
+    entry.add_to_hass(hass)
+
+    aggregator = WindowAggregator(hass, [CO2, "sensor.pm25"])
+    aggregator.async_start(0.0)
+    aggregator.add_sample(CO2, 1400.0, 100.0)
+    processor = SensorProcessor(hass, entry, aggregator=aggregator)
+
+    merge_variables = processor.build_payload()["merge_variables"]
+    # The CO2 window mean is dominated by the 1400 ppm sample, not the 400 ppm state.
+    assert 60 <= merge_variables["iaq_score"] < 80
+    assert merge_variables["iaq_rating"] == "Good"
+    assert merge_variables["iaq_band"] == 1
+
+    processor.aggregator = None
+    merge_variables = processor.build_payload()["merge_variables"]
+    assert merge_variables["iaq_score"] == 100
+
+    hass.config_entries.async_update_entry(entry, options={CONF_IAQ: False})
+    assert "iaq_score" not in processor.build_payload()["merge_variables"]
+    aggregator.async_stop()
@@ -1,10 +1,31 @@
 """Test the TRMNL Weather Station integration setup."""
+from unittest.mock import patch
+
 import pytest
+from aioresponses import aioresponses
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-
-from custom_components.trmnl_weather_station import async_setup, async_setup_entry, async_unload_entry
-from custom_components.trmnl_weather_station.const import DOMAIN
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station import (
+    async_setup,
+    async_setup_entry,
+    async_unload_entry,
+    requires_reload,
+)
+from custom_components.trmnl_weather_station.const import (
+    AGGREGATION_LAST,
+    AGGREGATION_MAX,
+    AGGREGATION_MEAN,
+    CONF_AGGREGATION,
+    CONF_CO2_SENSOR,
+    CONF_DEADBAND_SCALE,
+    CONF_SENSOR_1,
+    CONF_UPDATE_INTERVAL_MINUTES,
+    CONF_URL,
+    CONF_WEATHER_PROVIDER,
+    DOMAIN,
+)
 
 
 async def test_async_setup(hass: HomeAssistant):
@@ -48,3 +69,74 @@ async def test_async_unload_entry(hass: HomeAssistant, mock_config_entry):
 
     assert result is True
     assert mock_config_entry.entry_id not in hass.data.get(DOMAIN, {})
+
+
+def test_requires_reload():
+    """Test only changes adding or removing helpers rebuild the entry."""
+    config = {CONF_URL: "https://example.com/webhook", CONF_CO2_SENSOR: "sensor.co2"}
+
+    assert not requires_reload(config, {**config, CONF_SENSOR_1: "sensor.temp"})
+    assert not requires_reload(config, {**config, CONF_UPDATE_INTERVAL_MINUTES: 30})
+    assert not requires_reload(
+        {**config, CONF_AGGREGATION: AGGREGATION_MEAN},
+        {**config, CONF_AGGREGATION: AGGREGATION_MAX},
+    )
+    assert not requires_reload(
+        {**config, CONF_DEADBAND_SCALE: 1}, {**config, CONF_DEADBAND_SCALE: 2}
+    )
+    assert requires_reload(config, {**config, CONF_AGGREGATION: AGGREGATION_MEAN})
+    assert requires_reload({**config, CONF_DEADBAND_SCALE: 1}, config)
+    assert requires_reload(config, {**config, CONF_WEATHER_PROVIDER: "weather.home"})
+    assert requires_reload(config, {CONF_CO2_SENSOR: "sensor.co2"})
+
+
+async def test_options_applied_in_place(hass: HomeAssistant):
+    """Test compatible option changes keep the running entry and its state."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set("sensor.temp", "21.5", {"unit_of_measurement": "°C"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_AGGREGATION: AGGREGATION_MEAN,
+        },
+    )
+    entry.add_to_hass(hass)
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+        await async_setup_entry(hass, entry)
+        await hass.async_block_till_done()
+        data = hass.data[DOMAIN][entry.entry_id]
+        processor, aggregator = data["processor"], data["aggregator"]
+        remove_timer = data["remove_timer"]
+
+        with patch.object(hass.config_entries, "async_reload") as mock_reload:
+            hass.config_entries.async_update_entry(
+                entry, options={CONF_SENSOR_1: "sensor.temp"}
+            )
+            await hass.async_block_till_done()
+            assert data["remove_timer"] is remove_timer
+            assert aggregator.entity_ids == ["sensor.test_co2", "sensor.temp"]
+            assert aggregator.value("sensor.temp", AGGREGATION_LAST, 0) == 21.5
+
+            hass.config_entries.async_update_entry(
+                entry,
+                options={
+                    CONF_SENSOR_1: "sensor.temp",
+                    CONF_UPDATE_INTERVAL_MINUTES: 30,
+                },
+            )
+            await hass.async_block_till_done()
+            assert data["remove_timer"] is not remove_timer
+            mock_reload.assert_not_called()
+
+            hass.config_entries.async_update_entry(
+                entry, options={CONF_AGGREGATION: AGGREGATION_LAST}
+            )
+            await hass.async_block_till_done()
+            mock_reload.assert_called_once_with(entry.entry_id)
+
+    assert hass.data[DOMAIN][entry.entry_id]["processor"] is processor
+    await async_unload_entry(hass, entry)
@@ -2,7 +2,18 @@
 import pytest
 from homeassistant.core import State
 
-from custom_components.trmnl_weather_station.payload_utils import create_entity_payload, estimate_payload_size, round_sensor_value
+from custom_components.trmnl_weather_station.const import MAX_PAYLOAD_SIZE
+from custom_components.trmnl_weather_station.payload_utils import (
+    co2_rating,
+    create_entity_payload,
+    estimate_payload_size,
+    layout_limits,
+    paginate_entities,
+    resolve_icon_class,
+    resolve_weather_icon,
+    round_sensor_value,
+    select_layout_entities,
+)
 
 
 def test_round_sensor_value():
@@ -56,6 +67,7 @@ def test_create_entity_payload_with_icon():
     payload = create_entity_payload(state)
 
     assert payload["i"] == "mdi:thermometer"
+    assert payload["ic"] == "mdi-thermometer"
 
 
 def test_create_entity_payload_with_low_battery():
@@ -80,6 +92,7 @@ def test_create_entity_payload_with_device_class():
     payload = create_entity_payload(state)
 
     assert payload["device_class"] == "temperature"
+    assert payload["ic"] == "mdi-thermometer"
 
 
 def test_create_entity_payload_with_include_id():
@@ -102,3 +115,84 @@ def test_estimate_payload_size():
     size = estimate_payload_size(payload)
     assert isinstance(size, int)
     assert size > 0
+
+
+def test_create_entity_payload_icon_class():
+    """Test the display icon class is resolved per entity."""
+    with_icon = State("sensor.a", "1", {"icon": "mdi:flower-pollen"})
+    with_class = State("sensor.b", "1", {"device_class": "humidity"})
+    plain = State("sensor.c", "1", {})
+
+    assert create_entity_payload(with_icon)["ic"] == "mdi-flower-pollen"
+    assert create_entity_payload(with_class)["ic"] == "mdi-water-percent"
+    assert create_entity_payload(plain)["ic"] == "mdi-gauge"
+
+
+def test_resolve_icon_class():
+    """Test icon class resolution prefers explicit icons."""
+    assert resolve_icon_class("mdi:thermometer", "humidity") == "mdi-thermometer"
+    assert resolve_icon_class("", "temperature") == "mdi-thermometer"
+    assert resolve_icon_class(None, "unknown_class") == "mdi-gauge"
+
+
+def test_resolve_weather_icon():
+    """Test weather condition icon resolution."""
+    assert resolve_weather_icon("partlycloudy") == "mdi-weather-partly-cloudy"
+    assert resolve_weather_icon("unknown") == "mdi-weather-cloudy"
+    assert resolve_weather_icon(None) is None
+
+
+def test_co2_rating():
+    """Test CO2 rating bands."""
+    assert co2_rating(400) == (0, "Excellent")
+    assert co2_rating(800) == (1, "Good")
+    assert co2_rating("1200") == (2, "Fair")
+    assert co2_rating(2500) == (3, "Poor")
+    assert co2_rating("unavailable") is None
+
+
+def test_select_layout_entities():
+    """Test layout selections keep the primary entity and respect capacity."""
+    entities = [{"n": "CO2", "primary": True}] + [{"n": f"S{i}"} for i in range(6)]
+
+    assert select_layout_entities(entities) == entities
+    assert select_layout_entities(entities, "full") == entities
+    assert select_layout_entities(entities, "half_horizontal") == entities[:5]
+    assert select_layout_entities(entities, "quadrant") == entities[:6]
+
+
+def test_layout_limits():
+    """Test per-layout limits are only emitted for layouts showing fewer entities."""
+    entities = [{"n": "CO2", "primary": True}] + [{"n": f"S{i}"} for i in range(6)]
+
+    assert layout_limits(entities) == {
+        "half_horizontal": 5,
+        "half_vertical": 5,
+        "quadrant": 6,
+    }
+    assert layout_limits(entities[:5]) == {}
+
+
+def test_paginate_entities():
+    """Test pages respect size and capacity and always carry the primary entity."""
+    primary = {"n": "CO2", "primary": True}
+    entities = [primary] + [{"n": f"S{i}", "pad": "x" * 400} for i in range(6)]
+
+    pages = paginate_entities({"entities": entities}, capacity=6)
+    assert len(pages) > 1
+    assert all(page[0] is primary for page in pages)
+    assert [entity for page in pages for entity in page[1:]] == entities[1:]
+    assert all(
+        estimate_payload_size({"merge_variables": {"entities": page}})
+        <= MAX_PAYLOAD_SIZE
+        for page in pages
+    )
+
+    small = [primary] + [{"n": f"S{i}"} for i in range(6)]
+    assert paginate_entities({"entities": small}, capacity=6) == [small]
+    assert [
+        len(page) for page in paginate_entities({"entities": small}, capacity=4)
+    ] == [5, 3]
+
+    oversized = [primary, {"n": "big", "pad": "x" * MAX_PAYLOAD_SIZE}]
+    assert paginate_entities({"entities": oversized}, capacity=6) == [[primary]]
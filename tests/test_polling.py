@@ -0,0 +1,112 @@
+"""Test the polling endpoint."""
+import json
+from http import HTTPStatus
+from unittest.mock import MagicMock
+
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+
+from custom_components.trmnl_weather_station import (
+    async_setup_entry,
+    async_unload_entry,
+)
+from custom_components.trmnl_weather_station.const import DOMAIN, POLL_URL
+from custom_components.trmnl_weather_station.polling import (
+    MergeVariablesView,
+    etag_matches,
+)
+
+
+async def poll(
+    hass: HomeAssistant, entry_id: str, etag: str | None = None
+) -> web.Response:
+    """Poll the merge variables view of an entry."""
+    app = web.Application()
+    app["hass"] = hass
+    request = make_mocked_request(
+        "GET",
+        POLL_URL.format(entry_id=entry_id),
+        headers={"If-None-Match": etag} if etag else {},
+        app=app,
+    )
+    return await MergeVariablesView().get(request, entry_id)
+
+
+def test_etag_matches():
+    """Test If-None-Match lists, weak tags and wildcards are matched."""
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"xyz", W/"abc"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"xyz"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+async def test_poll_view(hass: HomeAssistant, mock_config_entry):
+    """Test polls are answered from the cache with ETag and 304 support."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+        await async_setup_entry(hass, mock_config_entry)
+        await hass.async_block_till_done()
+
+    entry_id = mock_config_entry.entry_id
+    cache = hass.data[DOMAIN][entry_id]["poll_cache"]
+
+    response = await poll(hass, entry_id)
+    assert response.status == HTTPStatus.OK
+    assert response.content_type == "application/json"
+    etag = response.headers["ETag"]
+    assert json.loads(response.body)["co2_value"] == 400
+
+    response = await poll(hass, entry_id, etag)
+    assert response.status == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert cache.builds == 1
+
+    # A state change without visible effect keeps the body and tag.
+    hass.states.async_set(
+        "sensor.test_co2", "400", {"unit_of_measurement": "ppm", "other": 1}
+    )
+    await hass.async_block_till_done()
+    response = await poll(hass, entry_id, etag)
+    assert response.status == HTTPStatus.NOT_MODIFIED
+    assert cache.builds == 2
+
+    hass.states.async_set("sensor.test_co2", "450", {"unit_of_measurement": "ppm"})
+    await hass.async_block_till_done()
+    response = await poll(hass, entry_id, etag)
+    assert response.status == HTTPStatus.OK
+    assert response.headers["ETag"] != etag
+    assert json.loads(response.body)["co2_value"] == 450
+
+    response = await poll(hass, "missing")
+    assert response.status == HTTPStatus.NOT_FOUND
+
+    await async_unload_entry(hass, mock_config_entry)
+
+
+async def test_poll_leaves_push_state_alone(hass: HomeAssistant, mock_config_entry):
+    """Test building a polling body records nothing and keeps the push results."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+        await async_setup_entry(hass, mock_config_entry)
+        await hass.async_block_till_done()
+
+    processor = hass.data[DOMAIN][mock_config_entry.entry_id]["processor"]
+    processor.recorder = MagicMock()
+    processor.last_built = ["pushed"]
+    processor.last_trimmed = True
+
+    response = await poll(hass, mock_config_entry.entry_id)
+    assert response.status == HTTPStatus.OK
+    assert processor.last_built == ["pushed"]
+    assert processor.last_trimmed is True
+    processor.recorder.record.assert_not_called()
+
+    processor.recorder = None
+    await async_unload_entry(hass, mock_config_entry)
@@ -0,0 +1,243 @@
+"""Test persistent push state."""
+from datetime import timedelta
+
+import aiohttp
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+from yarl import URL
+
+from custom_components.trmnl_weather_station.const import (
+    BUDGET_MIN_SIZE,
+    BUDGET_PROBE_STEP,
+    BUDGET_PROBE_SUCCESSES,
+    MAX_BACKOFF_SECONDS,
+    MAX_PAYLOAD_SIZE,
+    MIN_BACKOFF_SECONDS,
+    WEBHOOK_MAX_BUDGET,
+)
+from custom_components.trmnl_weather_station.push_state import (
+    PushState,
+    backoff_delay,
+    payload_digest,
+    shrink_budget,
+)
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+
+WEBHOOK_URL = "https://example.com/webhook"
+
+
+def test_payload_digest_ignores_timestamp():
+    """Test the digest only changes with display data."""
+    first = {"merge_variables": {"co2_value": 400, "timestamp": "2025-01-01T10:00"}}
+    second = {"merge_variables": {"co2_value": 400, "timestamp": "2025-01-01T10:10"}}
+    changed = {"merge_variables": {"co2_value": 410, "timestamp": "2025-01-01T10:10"}}
+
+    assert payload_digest(first) == payload_digest(second)
+    assert payload_digest(first) != payload_digest(changed)
+
+
+def test_backoff_delay():
+    """Test the backoff grows exponentially and is capped."""
+    assert backoff_delay(0) == 0
+    assert backoff_delay(1) == MIN_BACKOFF_SECONDS
+    assert backoff_delay(2) == MIN_BACKOFF_SECONDS * 2
+    assert backoff_delay(100) == MAX_BACKOFF_SECONDS
+
+
+async def test_push_state_roundtrip(hass: HomeAssistant):
+    """Test the push state survives a reload of the store."""
+    state = PushState(hass, "test_entry_id")
+    await state.async_load()
+
+    state.record_success(WEBHOOK_URL, "abc", 1000.0)
+    assert state.is_current(WEBHOOK_URL, "abc", 1100.0, 600)
+    assert not state.is_current(WEBHOOK_URL, "abc", 1700.0, 600)
+    assert not state.is_current(WEBHOOK_URL, "def", 1100.0, 600)
+    await state.async_save()
+
+    reloaded = PushState(hass, "test_entry_id")
+    await reloaded.async_load()
+    assert reloaded.is_current(WEBHOOK_URL, "abc", 1100.0, 600)
+
+    reloaded.record_failure(WEBHOOK_URL, 2000.0)
+    assert reloaded.in_backoff(WEBHOOK_URL, 2000.0 + MIN_BACKOFF_SECONDS - 1)
+    assert not reloaded.in_backoff(WEBHOOK_URL, 2000.0 + MIN_BACKOFF_SECONDS)
+    assert not reloaded.is_current(WEBHOOK_URL, "abc", 2000.0, 600)
+
+
+def test_shrink_budget():
+    """Test the budget shrinks below the rejected size and has a floor."""
+    assert shrink_budget(2048, 4000) < 2048
+    assert shrink_budget(4096, 1500) < 1500
+    assert shrink_budget(600, 600) == BUDGET_MIN_SIZE
+
+
+async def test_budget_learning(hass: HomeAssistant):
+    """Test the budget shrinks on rejections, probes upward and persists."""
+    state = PushState(hass, "test_entry_id")
+    await state.async_load()
+    ceiling = MAX_PAYLOAD_SIZE * 2
+    assert state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == MAX_PAYLOAD_SIZE
+
+    lowered = state.record_rejection(WEBHOOK_URL, 1900, MAX_PAYLOAD_SIZE)
+    assert lowered < 1900
+    assert state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == lowered
+
+    # Untrimmed payloads give no reason to probe upward.
+    for _ in range(BUDGET_PROBE_SUCCESSES):
+        state.record_budget_success(WEBHOOK_URL, MAX_PAYLOAD_SIZE, ceiling, False)
+    assert state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == lowered
+
+    state.record_budget_success(WEBHOOK_URL, MAX_PAYLOAD_SIZE, ceiling, True)
+    assert state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == lowered + BUDGET_PROBE_STEP
+
+    # A rejected probe restores the previous budget and waits longer next time.
+    assert (
+        state.record_rejection(WEBHOOK_URL, lowered + 100, MAX_PAYLOAD_SIZE) == lowered
+    )
+    for _ in range(BUDGET_PROBE_SUCCESSES):
+        state.record_budget_success(WEBHOOK_URL, MAX_PAYLOAD_SIZE, ceiling, True)
+    assert state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == lowered
+
+    await state.async_save()
+    reloaded = PushState(hass, "test_entry_id")
+    await reloaded.async_load()
+    assert reloaded.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == lowered
+
+
+async def test_processor_skips_unchanged_push(hass: HomeAssistant, mock_config_entry):
+    """Test an unchanged payload is not pushed again after a restart."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    state = PushState(hass, mock_config_entry.entry_id)
+    await state.async_load()
+    processor = SensorProcessor(hass, mock_config_entry, state)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200, payload={"success": True}, repeat=True)
+
+        await processor.process_sensors(only_if_changed=True)
+        await processor.process_sensors(only_if_changed=True)
+        assert len(mock_http.requests[("POST", URL(WEBHOOK_URL))]) == 1
+
+        hass.states.async_set("sensor.test_co2", "410", {"unit_of_measurement": "ppm"})
+        await processor.process_sensors(only_if_changed=True)
+        assert len(mock_http.requests[("POST", URL(WEBHOOK_URL))]) == 2
+
+    await state.async_save()
+
+
+async def test_peek_does_not_create_target(hass: HomeAssistant):
+    """Test reading an unknown target leaves the state untouched."""
+    state = PushState(hass, "test_entry_id")
+
+    assert state.peek(WEBHOOK_URL) is None
+    assert state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE) == MAX_PAYLOAD_SIZE
+    assert state.peek(WEBHOOK_URL) is None
+
+    state.record_failure(WEBHOOK_URL, 1000.0)
+    peeked = state.peek(WEBHOOK_URL)
+    peeked["failures"] = 0
+    assert state.peek(WEBHOOK_URL)["failures"] == 1
+    await state.async_save()
+
+
+async def test_outbox_keeps_newest_payload(hass: HomeAssistant):
+    """Test the outbox keeps one bounded payload and clears it on success."""
+    state = PushState(hass, "test_entry_id")
+    await state.async_load()
+
+    assert state.queue(
+        WEBHOOK_URL, {"merge_variables": {"co2_value": 400}}, WEBHOOK_MAX_BUDGET
+    )
+    assert state.queue(
+        WEBHOOK_URL, {"merge_variables": {"co2_value": 410}}, WEBHOOK_MAX_BUDGET
+    )
+    assert not state.queue(
+        WEBHOOK_URL,
+        {"merge_variables": {"n": "x" * (WEBHOOK_MAX_BUDGET + 1)}},
+        WEBHOOK_MAX_BUDGET,
+    )
+    assert state.pending(WEBHOOK_URL) == {"merge_variables": {"co2_value": 410}}
+    await state.async_save()
+
+    reloaded = PushState(hass, "test_entry_id")
+    await reloaded.async_load()
+    assert reloaded.pending(WEBHOOK_URL) == {"merge_variables": {"co2_value": 410}}
+
+    reloaded.record_success(WEBHOOK_URL, "abc", 1000.0)
+    assert reloaded.pending(WEBHOOK_URL) is None
+    await reloaded.async_save()
+
+
+async def test_flush_counts_queued_payload_trimmed(
+    hass: HomeAssistant, mock_config_entry
+):
+    """Test a flushed payload steps the budget by its own trimmed flag."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    state = PushState(hass, mock_config_entry.entry_id)
+    await state.async_load()
+    processor = SensorProcessor(hass, mock_config_entry, state)
+    payload = processor.build_payload()
+    assert not processor.last_trimmed
+
+    state.target(WEBHOOK_URL)["budget_successes"] = BUDGET_PROBE_SUCCESSES - 1
+    assert state.queue(WEBHOOK_URL, payload, WEBHOOK_MAX_BUDGET, trimmed=True)
+    assert state.pending_trimmed(WEBHOOK_URL)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200, payload={"success": True})
+        assert await processor.async_flush_outbox() == "sent"
+
+    assert (
+        state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE)
+        == MAX_PAYLOAD_SIZE + BUDGET_PROBE_STEP
+    )
+    await state.async_save()
+
+
+async def test_outage_ends_in_one_catch_up_push(hass: HomeAssistant, mock_config_entry):
+    """Test pushes during an outage coalesce into one push after recovery."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    state = PushState(hass, mock_config_entry.entry_id)
+    await state.async_load()
+    processor = SensorProcessor(hass, mock_config_entry, state)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, exception=aiohttp.ClientConnectionError())
+        assert await processor.async_push() == "failed"
+
+        for value in ("410", "420", "430"):
+            hass.states.async_set(
+                "sensor.test_co2", value, {"unit_of_measurement": "ppm"}
+            )
+            assert await processor.async_push() == "skipped_backoff"
+        assert state.pending(WEBHOOK_URL)["merge_variables"]["co2_value"] == 430
+
+        # The webhook is still down when the backoff expires.
+        mock_http.get(WEBHOOK_URL, exception=aiohttp.ClientConnectionError())
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=MIN_BACKOFF_SECONDS + 1)
+        )
+        await hass.async_block_till_done()
+        assert state.target(WEBHOOK_URL)["failures"] == 2
+
+        mock_http.get(WEBHOOK_URL, status=200)
+        mock_http.post(WEBHOOK_URL, status=200, payload={"success": True})
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=MIN_BACKOFF_SECONDS * 2 + 1)
+        )
+        await hass.async_block_till_done()
+
+        requests = mock_http.requests[("POST", URL(WEBHOOK_URL))]
+        assert len(requests) == 2
+        assert requests[1].kwargs["json"]["merge_variables"]["co2_value"] == 430
+        assert state.pending(WEBHOOK_URL) is None
+        assert not state.in_backoff(WEBHOOK_URL, dt_util.utcnow().timestamp())
+
+    processor.async_stop()
+    await state.async_save()
@@ -0,0 +1,102 @@
+"""Test recording and replay of pipeline states."""
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_SENSOR_1,
+    CONF_URL,
+    DOMAIN,
+    MAX_PAYLOAD_SIZE,
+    PUSH_SENT,
+    PUSH_SKIPPED_UNCHANGED,
+)
+from custom_components.trmnl_weather_station.recording import (
+    SnapshotRecorder,
+    read_recording,
+)
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+from tools.replay import async_replay
+
+FIXTURE = Path(__file__).parent / "fixtures" / "recording.jsonl"
+
+
+async def test_recorder_round_trip(hass: HomeAssistant, tmp_path):
+    """Test recorded states read back with attributes carried over."""
+    config = {
+        CONF_URL: "https://example.com/webhook",
+        CONF_CO2_SENSOR: "sensor.test_co2",
+        CONF_SENSOR_1: "sensor.temperature",
+    }
+    processor = SensorProcessor(hass, MockConfigEntry(domain=DOMAIN, data=config))
+    recorder = SnapshotRecorder(hass, tmp_path / "recording.jsonl")
+    recorder.async_start(config)
+    processor.recorder = recorder
+
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set(
+        "sensor.temperature", "21.5", {"unit_of_measurement": "°C", "internal": "x"}
+    )
+    processor.build_payload()
+    hass.states.async_set("sensor.test_co2", "420", {"unit_of_measurement": "ppm"})
+    processor.build_payload()
+
+    assert await processor.async_stop_recording() is recorder
+    assert processor.recorder is None
+
+    lines = recorder.path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert "example.com" not in lines[0]
+    assert "internal" not in lines[1]
+    assert "ppm" not in lines[2]
+
+    recording = read_recording(recorder.path)
+    assert recording.config == {
+        CONF_CO2_SENSOR: "sensor.test_co2",
+        CONF_SENSOR_1: "sensor.temperature",
+    }
+    assert [rows for _, rows in recording.snapshots] == [
+        [
+            ("sensor.test_co2", "400", {"unit_of_measurement": "ppm"}),
+            ("sensor.temperature", "21.5", {"unit_of_measurement": "°C"}),
+        ],
+        [
+            ("sensor.test_co2", "420", {"unit_of_measurement": "ppm"}),
+            ("sensor.temperature", "21.5", {"unit_of_measurement": "°C"}),
+        ],
+    ]
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_replay_fixture(hass: HomeAssistant):
+    """Test the recorded fixture replays through the pipeline to the stand-in."""
+    recording = read_recording(FIXTURE)
+    result = await async_replay(hass, recording, repeat=2)
+
+    assert result.ticks == 2 * len(recording.snapshots)
+    assert result.outcomes == {PUSH_SENT: result.ticks}
+    assert len(result.payloads) == result.ticks
+    assert max(result.payload_sizes) <= MAX_PAYLOAD_SIZE
+
+    first = result.payloads[0]["merge_variables"]
+    assert first["co2_value"] == 650
+    assert first["count"] == 5
+    assert first["weather_icon"] == "mdi-weather-cloudy"
+    assert result.payloads[7]["merge_variables"]["entities"][4]["val"] == "unavailable"
+    assert result.payloads[11]["merge_variables"]["co2_rating"] == "Fair"
+    assert set(result.stages) >= {"states", "entities", "trim", "serialize", "send"}
+
+
+@pytest.mark.usefixtures("socket_enabled")
+async def test_replay_skips_repeated_snapshots(hass: HomeAssistant):
+    """Test identical consecutive snapshots are not pushed again."""
+    recording = read_recording(FIXTURE)
+    recording.snapshots = recording.snapshots[:1] * 3
+
+    result = await async_replay(hass, recording)
+
+    assert result.outcomes == {PUSH_SENT: 1, PUSH_SKIPPED_UNCHANGED: 2}
+    assert len(result.payloads) == 1
@@ -0,0 +1,107 @@
+"""Test server-side image rendering."""
+import io
+import time
+from http import HTTPStatus
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from homeassistant.core import HomeAssistant
+
+from custom_components.trmnl_weather_station.const import (
+    DOMAIN,
+    IMAGE_HEIGHT,
+    IMAGE_URL,
+    IMAGE_WIDTH,
+)
+from custom_components.trmnl_weather_station.polling import ImageView
+from custom_components.trmnl_weather_station.render import ImageRenderer, render_image
+from tools.trmnl_render import dev_variables
+
+# Generous per-render budget for drawing, dithering and encoding one image.
+RENDER_BUDGET_SECONDS = 0.5
+
+
+class StaticPollCache:
+    """Poll cache stand-in serving a fixed payload."""
+
+    def __init__(self, payload: dict):
+        """Initialize the cache."""
+        self.payload = payload
+
+    def get_payload(self):
+        """Return the payload and its entity tag."""
+        return self.payload, '"abc"'
+
+
+async def get_image(hass: HomeAssistant, image_format: str, etag: str | None = None):
+    """Request the image of a test entry."""
+    app = web.Application()
+    app["hass"] = hass
+    request = make_mocked_request(
+        "GET",
+        IMAGE_URL.format(entry_id="test_entry_id", image_format=image_format),
+        headers={"If-None-Match": etag} if etag else {},
+        app=app,
+    )
+    return await ImageView().get(request, "test_entry_id", image_format)
+
+
+@pytest.mark.parametrize("image_format", ["png", "bmp"])
+def test_render_image(image_format):
+    """Test the image is a 1-bit display sized image and renders within budget."""
+    image_module = pytest.importorskip("PIL.Image")
+    variables = dev_variables()
+
+    start = time.perf_counter()
+    data = render_image(variables, image_format)
+    elapsed = time.perf_counter() - start
+
+    image = image_module.open(io.BytesIO(data))
+    assert image.format == image_format.upper()
+    assert image.size == (IMAGE_WIDTH, IMAGE_HEIGHT)
+    assert image.mode == "1"
+    assert elapsed < RENDER_BUDGET_SECONDS
+
+
+async def test_renderer_caches_by_digest(hass: HomeAssistant):
+    """Test payloads differing only in volatile fields reuse the cached image."""
+    pytest.importorskip("PIL")
+    renderer = ImageRenderer(hass, cache_size=1)
+    payload = {"merge_variables": {**dev_variables(), "timestamp": "10:00"}}
+
+    first = await renderer.async_render(payload)
+    payload["merge_variables"]["timestamp"] = "10:05"
+    assert await renderer.async_render(payload) is first
+    assert renderer.renders == 1
+
+    payload["merge_variables"]["co2_value"] = 1500
+    assert await renderer.async_render(payload) != first
+    assert renderer.renders == 2
+
+
+async def test_image_view(hass: HomeAssistant):
+    """Test the image view answers with an image tag and 304 support."""
+    payload = {"merge_variables": dev_variables()}
+    hass.data[DOMAIN] = {
+        "test_entry_id": {
+            "poll_cache": StaticPollCache(payload),
+            "renderer": ImageRenderer(hass),
+        }
+    }
+
+    response = await get_image(hass, "gif")
+    assert response.status == HTTPStatus.NOT_FOUND
+
+    response = await get_image(hass, "png", '"abc-png"')
+    assert response.status == HTTPStatus.NOT_MODIFIED
+
+    response = await get_image(hass, "png")
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        assert response.status == HTTPStatus.NOT_IMPLEMENTED
+    else:
+        assert response.status == HTTPStatus.OK
+        assert response.content_type == "image/png"
+        assert response.headers["ETag"] == '"abc-png"'
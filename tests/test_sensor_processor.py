@@ -1,8 +1,26 @@
 """Test sensor processor."""
+import asyncio
+
 import pytest
 from aioresponses import aioresponses
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yarl import URL
 
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_LAYOUT,
+    CONF_PAGING,
+    CONF_SENSOR_1,
+    CONF_SENSOR_2,
+    CONF_URL,
+    CONF_WEATHER_PROVIDER,
+    DOMAIN,
+    MAX_PAYLOAD_SIZE,
+    PUSH_NO_DATA,
+    PUSH_SENT,
+)
+from custom_components.trmnl_weather_station.payload_utils import estimate_payload_size
 from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
 
 
@@ -89,3 +107,159 @@ async def test_sensor_processor_http_error(hass: HomeAssistant, mock_config_entr
         await processor.process_sensors()
 
         assert len(mock_http.requests) == 1
+
+
+async def test_sensor_processor_precomputed_display_fields(hass: HomeAssistant):
+    """Test display fields are precomputed and the payload stays in budget."""
+    hass.states.async_set("sensor.test_co2", "1200", {"unit_of_measurement": "ppm"})
+    hass.states.async_set("weather.home", "partlycloudy", {})
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_WEATHER_PROVIDER: "weather.home",
+        },
+    )
+
+    processor = SensorProcessor(hass, entry)
+
+    with aioresponses() as mock_http:
+        mock_http.post(
+            "https://example.com/webhook", status=200, payload={"success": True}
+        )
+
+        await processor.process_sensors()
+
+        request = mock_http.requests[("POST", URL("https://example.com/webhook"))][0]
+        merge_variables = request.kwargs["json"]["merge_variables"]
+
+        assert merge_variables["co2_rating"] == "Fair"
+        assert merge_variables["co2_band"] == 2
+        assert merge_variables["weather_icon"] == "mdi-weather-partly-cloudy"
+        assert merge_variables["entities"][0]["ic"] == "mdi-gauge"
+        assert estimate_payload_size(request.kwargs["json"]) <= MAX_PAYLOAD_SIZE
+
+
+async def test_sensor_processor_layout_targeted_payload(hass: HomeAssistant):
+    """Test a layout-targeted payload only carries what the layout shows."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    hass.states.async_set("sensor.one", "1", {})
+    hass.states.async_set("sensor.two", "2", {})
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_SENSOR_1: "sensor.one",
+            CONF_SENSOR_2: "sensor.two",
+        },
+        options={CONF_LAYOUT: "quadrant"},
+    )
+
+    merge_variables = SensorProcessor(hass, entry).build_payload()["merge_variables"]
+
+    assert merge_variables["count"] == 3
+    assert "layouts" not in merge_variables
+
+
+async def test_sensor_processor_single_flight(hass: HomeAssistant, mock_config_entry):
+    """Test concurrent push requests coalesce into one follow-up push."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    processor = SensorProcessor(hass, mock_config_entry)
+    release = asyncio.Event()
+
+    async def slow_webhook(url, **kwargs):
+        await release.wait()
+
+    with aioresponses() as mock_http:
+        mock_http.post(
+            "https://example.com/webhook",
+            status=200,
+            callback=slow_webhook,
+            repeat=True,
+        )
+
+        pushes = [hass.async_create_task(processor.async_push()) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        outcomes = await asyncio.gather(*pushes)
+
+        assert outcomes == [PUSH_SENT] * 5
+        assert (
+            len(mock_http.requests[("POST", URL("https://example.com/webhook"))]) == 2
+        )
+
+
+async def test_follow_up_cancelled_on_unload(hass: HomeAssistant, mock_config_entry):
+    """Test a queued follow-up push is cancelled when the entry unloads."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    processor = SensorProcessor(hass, mock_config_entry)
+
+    async with processor._push_lock:
+        follow_up = hass.async_create_task(processor.async_push())
+        await asyncio.sleep(0)
+        await mock_config_entry._async_process_on_unload(hass)
+
+    with pytest.raises(asyncio.CancelledError):
+        await follow_up
+
+
+async def test_sensor_processor_push_outcome_no_data(
+    hass: HomeAssistant, mock_config_entry
+):
+    """Test the push outcome when the CO2 sensor is missing."""
+    processor = SensorProcessor(hass, mock_config_entry)
+
+    assert await processor.async_push() == PUSH_NO_DATA
+
+
+async def test_sensor_processor_rotates_pages(hass: HomeAssistant):
+    """Test paging rotates all sensors through successive pushes."""
+    sensor_keys = [f"sensor_{index}" for index in range(1, 7)]
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_PAGING: True,
+            **{key: f"sensor.{key}" for key in sensor_keys},
+        },
+    )
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    for key in sensor_keys:
+        hass.states.async_set(
+            f"sensor.{key}", "21", {"friendly_name": f"{key} " + "x" * 300}
+        )
+
+    processor = SensorProcessor(hass, entry)
+    with aioresponses() as mock_http:
+        mock_http.post(
+            "https://example.com/webhook",
+            status=200,
+            payload={"success": True},
+            repeat=True,
+        )
+        for _ in range(4):
+            assert await processor.process_sensors() == PUSH_SENT
+        requests = mock_http.requests[("POST", URL("https://example.com/webhook"))]
+
+    pages = [request.kwargs["json"]["merge_variables"] for request in requests]
+    page_count = pages[0]["pages"]
+    assert page_count > 1
+    assert [page["page"] for page in pages] == [
+        index % page_count + 1 for index in range(4)
+    ]
+    assert all(page["entities"][0]["type"] == "co2_primary" for page in pages)
+    assert all(
+        estimate_payload_size({"merge_variables": page}) <= MAX_PAYLOAD_SIZE
+        for page in pages
+    )
+
+    shown = {
+        entity["type"] for page in pages[:page_count] for entity in page["entities"]
+    }
+    assert shown == {"co2_primary", *sensor_keys}
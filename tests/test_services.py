@@ -0,0 +1,206 @@
+"""Test integration services."""
+import asyncio
+
+import pytest
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from yarl import URL
+
+from custom_components.trmnl_weather_station import (
+    async_setup,
+    async_setup_entry,
+    async_unload_entry,
+)
+from custom_components.trmnl_weather_station.const import (
+    DOMAIN,
+    MAX_PAYLOAD_SIZE,
+    PUSH_SENT,
+    SERVICE_PROFILE,
+    SERVICE_PUSH_NOW,
+    SERVICE_RECORD,
+)
+from custom_components.trmnl_weather_station.profiling import (
+    StageTimer,
+    async_profile_processor,
+    summarize_timings,
+)
+from custom_components.trmnl_weather_station.recording import read_recording
+
+
+def test_stage_timer_accumulates():
+    """Test repeated stages accumulate their time."""
+    timer = StageTimer()
+    with timer.stage("states"):
+        pass
+    first = timer.timings["states"]
+    with timer.stage("states"):
+        pass
+
+    assert timer.timings["states"] >= first
+
+
+def test_summarize_timings():
+    """Test stage summaries are in milliseconds and in pipeline order."""
+    summary = summarize_timings([{"send": 0.2, "config": 0.001}, {"config": 0.003}])
+
+    assert list(summary) == ["config", "send"]
+    assert summary["config"]["runs"] == 2
+    assert summary["config"]["mean_ms"] == 2.0
+    assert summary["send"]["max_ms"] == 200.0
+
+
+async def test_profile_service(hass: HomeAssistant, mock_config_entry):
+    """Test the profile service times every stage without sending."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+
+        await async_setup(hass, {})
+        await async_setup_entry(hass, mock_config_entry)
+        await hass.async_block_till_done()
+        requests_after_setup = len(mock_http.requests)
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE,
+            {"ticks": 3},
+            blocking=True,
+            return_response=True,
+        )
+
+        assert len(mock_http.requests) == requests_after_setup
+
+    result = response["entries"][mock_config_entry.entry_id]
+    assert result["ticks"] == 3
+    assert set(result["stages"]) == {
+        "config",
+        "states",
+        "entities",
+        "trim",
+        "serialize",
+    }
+    assert result["stages"]["states"]["runs"] == 3
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE,
+            {"entry_id": "missing"},
+            blocking=True,
+            return_response=True,
+        )
+
+    await async_unload_entry(hass, mock_config_entry)
+
+
+async def test_profile_waits_for_push(hass: HomeAssistant, mock_config_entry):
+    """Test profiled ticks that send wait for a push in flight."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+        await async_setup_entry(hass, mock_config_entry)
+        await hass.async_block_till_done()
+        processor = hass.data[DOMAIN][mock_config_entry.entry_id]["processor"]
+        processor.transport_for(mock_config_entry.data).rate_limit = None
+        requests_after_setup = len(
+            mock_http.requests[("POST", URL("https://example.com/webhook"))]
+        )
+
+        async with processor._push_lock:
+            task = hass.async_create_task(
+                async_profile_processor(hass, processor, 2, send=True)
+            )
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            assert not task.done()
+            assert (
+                len(mock_http.requests[("POST", URL("https://example.com/webhook"))])
+                == requests_after_setup
+            )
+
+        result = await task
+        assert result["stages"]["send"]["runs"] == 2
+
+    processor.async_stop()
+    await async_unload_entry(hass, mock_config_entry)
+
+
+async def test_push_now_service(hass: HomeAssistant, mock_config_entry):
+    """Test push_now pushes immediately and returns the outcome."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+
+        await async_setup(hass, {})
+        await async_setup_entry(hass, mock_config_entry)
+        await hass.async_block_till_done()
+        requests_after_setup = len(
+            mock_http.requests[("POST", URL("https://example.com/webhook"))]
+        )
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PUSH_NOW,
+            {},
+            blocking=True,
+            return_response=True,
+        )
+
+        assert (
+            len(mock_http.requests[("POST", URL("https://example.com/webhook"))])
+            == requests_after_setup + 1
+        )
+
+    assert response == {
+        "entries": {
+            mock_config_entry.entry_id: {
+                "outcome": PUSH_SENT,
+                "payload_budget": MAX_PAYLOAD_SIZE,
+            }
+        }
+    }
+
+    await async_unload_entry(hass, mock_config_entry)
+
+
+async def test_record_service(hass: HomeAssistant, mock_config_entry):
+    """Test record captures the states of each push until it is stopped."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post("https://example.com/webhook", status=200, repeat=True)
+
+        await async_setup(hass, {})
+        await async_setup_entry(hass, mock_config_entry)
+        await hass.async_block_till_done()
+
+        response = await hass.services.async_call(
+            DOMAIN, SERVICE_RECORD, {}, blocking=True, return_response=True
+        )
+        assert response["entries"][mock_config_entry.entry_id]["recording"]
+
+        hass.states.async_set("sensor.test_co2", "500", {"unit_of_measurement": "ppm"})
+        await hass.services.async_call(DOMAIN, SERVICE_PUSH_NOW, {}, blocking=True)
+
+        response = await hass.services.async_call(
+            DOMAIN,
+            SERVICE_RECORD,
+            {"enabled": False},
+            blocking=True,
+            return_response=True,
+        )
+
+    result = response["entries"][mock_config_entry.entry_id]
+    assert not result["recording"]
+    assert result["snapshots"] == 1
+
+    recording = await hass.async_add_executor_job(read_recording, result["path"])
+    assert recording.snapshots[0][1] == [
+        ("sensor.test_co2", "500", {"unit_of_measurement": "ppm"})
+    ]
+
+    await async_unload_entry(hass, mock_config_entry)
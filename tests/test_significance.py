@@ -0,0 +1,111 @@
+"""Test significance filtering of state changes."""
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from yarl import URL
+
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_HEARTBEAT_MINUTES,
+    CONF_URL,
+    DOMAIN,
+    SIGNIFICANCE_THRESHOLDS,
+    WEATHER_SENSOR_DEVICE_CLASSES,
+)
+from custom_components.trmnl_weather_station.push_state import PushState
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+from custom_components.trmnl_weather_station.significance import (
+    SignificanceFilter,
+    is_significant,
+    thresholds_for,
+)
+
+WEBHOOK_URL = "https://example.com/webhook"
+CO2 = "sensor.test_co2"
+CO2_ATTRIBUTES = {"unit_of_measurement": "ppm", "device_class": "carbon_dioxide"}
+
+
+def test_thresholds_cover_weather_classes():
+    """Test deadbands are only defined for weather sensor device classes."""
+    assert set(SIGNIFICANCE_THRESHOLDS) <= set(WEATHER_SENSOR_DEVICE_CLASSES)
+    assert thresholds_for("temperature", 2) == (1.0, None)
+    assert thresholds_for("battery", 1) == (None, None)
+
+
+def test_is_significant():
+    """Test numeric deadbands and non-numeric changes."""
+    temperature = thresholds_for("temperature", 1)
+    assert not is_significant("21.0", "21.4", temperature)
+    assert is_significant("21.0", "21.5", temperature)
+
+    co2 = thresholds_for("carbon_dioxide", 1)
+    assert not is_significant("600", "602", co2)
+    # 25 ppm exceeds the absolute but not the relative deadband at 2000 ppm.
+    assert not is_significant("2000", "2025", co2)
+    assert is_significant("600", "625", co2)
+
+    assert is_significant(None, "600", co2)
+    assert is_significant("600", "unavailable", co2)
+    assert not is_significant("sunny", "sunny", (None, None))
+    assert is_significant("sunny", "rainy", (None, None))
+    assert is_significant("10", "11", (None, None))
+
+
+async def test_filter_latches_until_commit(hass: HomeAssistant):
+    """Test the filter latches on a crossing and re-centres on commit."""
+    hass.states.async_set(CO2, "600", CO2_ATTRIBUTES)
+    significance = SignificanceFilter(hass, [CO2], 1)
+    significance.async_start()
+    assert significance.significant
+
+    significance.commit(significance.snapshot())
+    assert not significance.significant
+
+    hass.states.async_set(CO2, "610", CO2_ATTRIBUTES)
+    await hass.async_block_till_done()
+    assert not significance.significant
+
+    hass.states.async_set(CO2, "650", CO2_ATTRIBUTES)
+    await hass.async_block_till_done()
+    assert significance.significant
+
+    # Moving back into the deadband keeps the filter latched.
+    hass.states.async_set(CO2, "605", CO2_ATTRIBUTES)
+    await hass.async_block_till_done()
+    assert significance.significant
+
+    significance.commit({CO2: "650"})
+    assert significance.significant
+    significance.async_stop()
+
+
+async def test_processor_skips_insignificant_push(hass: HomeAssistant):
+    """Test insignificant changes are held back unless forced."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_URL: WEBHOOK_URL, CONF_CO2_SENSOR: CO2},
+        options={CONF_HEARTBEAT_MINUTES: 60},
+    )
+    hass.states.async_set(CO2, "600", CO2_ATTRIBUTES)
+    significance = SignificanceFilter(hass, [CO2], 1)
+    significance.async_start()
+    processor = SensorProcessor(
+        hass, entry, PushState(hass, entry.entry_id), significance=significance
+    )
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200, payload={"success": True}, repeat=True)
+
+        assert await processor.async_push() == "sent"
+        hass.states.async_set(CO2, "605", CO2_ATTRIBUTES)
+        await hass.async_block_till_done()
+        assert await processor.async_push() == "skipped_insignificant"
+        assert await processor.async_push(force=True) == "sent"
+
+        hass.states.async_set(CO2, "700", CO2_ATTRIBUTES)
+        await hass.async_block_till_done()
+        assert await processor.async_push() == "sent"
+
+        assert len(mock_http.requests[("POST", URL(WEBHOOK_URL))]) == 3
+
+    significance.async_stop()
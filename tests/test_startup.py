@@ -0,0 +1,117 @@
+"""Test import and setup time budgets."""
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+
+from custom_components.trmnl_weather_station import (
+    async_setup_entry,
+    async_unload_entry,
+)
+from custom_components.trmnl_weather_station.config_flow import (
+    create_basic_schema,
+    create_options_schema,
+    create_sensors_schema,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets are generous on purpose, they exist to catch regressions such as
+# pulling the config flow or the template engine onto the runtime import path.
+IMPORT_BUDGET_SECONDS = 0.5
+SETUP_BUDGET_SECONDS = 1.0
+
+# Runtime modules only imported once an entry or the integration is set up.
+RUNTIME_MODULES = (
+    "aggregation",
+    "forecast",
+    "groups",
+    "polling",
+    "profiling",
+    "render",
+    "sensor_processor",
+    "services",
+    "significance",
+    "transport",
+)
+
+IMPORT_PROBE = """
+import json, sys, time
+import aiohttp
+import homeassistant.config_entries
+import homeassistant.helpers.config_validation
+import homeassistant.helpers.event
+start = time.perf_counter()
+import MODULE
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "elapsed": elapsed,
+    "modules": [m for m in sys.modules if m.startswith("custom_components.trmnl_weather_station")],
+}))
+"""
+
+
+def _probe_import(module: str) -> dict:
+    """Import a module in a fresh interpreter and return the time and loaded modules."""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE.replace("MODULE", module)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_package_import_time():
+    """Test the runtime import path stays small and within budget."""
+    probe = _probe_import("custom_components.trmnl_weather_station")
+
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+    assert "custom_components.trmnl_weather_station.config_flow" not in probe["modules"]
+    for name in RUNTIME_MODULES:
+        assert f"custom_components.trmnl_weather_station.{name}" not in probe["modules"]
+
+
+def test_config_flow_import():
+    """Test opening the config flow does not load the push runtime."""
+    probe = _probe_import("custom_components.trmnl_weather_station.config_flow")
+
+    for name in RUNTIME_MODULES:
+        assert f"custom_components.trmnl_weather_station.{name}" not in probe["modules"]
+
+
+def test_schemas_are_cached():
+    """Test schema construction is cached per set of defaults."""
+    defaults = {"url": "https://example.com/webhook", "co2_sensor": "sensor.test_co2"}
+
+    assert create_basic_schema() is create_basic_schema()
+    assert create_sensors_schema() is create_sensors_schema({})
+    assert create_options_schema(defaults) is create_options_schema(dict(defaults))
+    assert create_options_schema(defaults) is not create_options_schema()
+
+
+async def test_setup_entry_time(hass: HomeAssistant, mock_config_entry):
+    """Test entry setup does not wait for the initial push."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+
+    with aioresponses() as mock_http:
+        mock_http.post(
+            "https://example.com/webhook", status=200, payload={"success": True}
+        )
+
+        start = time.perf_counter()
+        result = await async_setup_entry(hass, mock_config_entry)
+        elapsed = time.perf_counter() - start
+
+        await hass.async_block_till_done()
+
+        assert result is True
+        assert elapsed < SETUP_BUDGET_SECONDS
+        assert len(mock_http.requests) == 1
+
+    await async_unload_entry(hass, mock_config_entry)
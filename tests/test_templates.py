@@ -0,0 +1,141 @@
+"""Test the TRMNL templates against payloads built by the processor."""
+import zipfile
+
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_SENSOR_1,
+    CONF_SENSOR_1_NAME,
+    CONF_SENSOR_2,
+    CONF_SENSOR_3,
+    CONF_SENSOR_4,
+    CONF_SENSOR_5,
+    CONF_SENSOR_6,
+    CONF_URL,
+    CONF_WEATHER_PROVIDER,
+    DOMAIN,
+)
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+from tools.trmnl_render import LAYOUTS, TRMNL_DIR, dev_variables, render_all
+
+# Generous per-render budget, meant to catch accidental loops over large maps.
+RENDER_BUDGET_SECONDS = 0.05
+
+# The published recipe users fork, which existing forks keep using.
+RECIPE_ZIP = TRMNL_DIR / "dist" / "private_plugin_46862.zip"
+
+
+def _processor(hass: HomeAssistant) -> SensorProcessor:
+    """Return a processor with a CO2 sensor, two sensors and a weather provider."""
+    hass.states.async_set("sensor.test_co2", "1210", {"unit_of_measurement": "ppm"})
+    hass.states.async_set(
+        "sensor.temperature",
+        "21.46",
+        {"unit_of_measurement": "°C", "device_class": "temperature"},
+    )
+    hass.states.async_set("sensor.pollen", "2", {"icon": "mdi:flower-pollen"})
+    hass.states.async_set("weather.home", "rainy", {})
+
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: "https://example.com/webhook",
+            CONF_CO2_SENSOR: "sensor.test_co2",
+            CONF_WEATHER_PROVIDER: "weather.home",
+            CONF_SENSOR_1: "sensor.temperature",
+            CONF_SENSOR_1_NAME: "Office",
+            CONF_SENSOR_2: "sensor.pollen",
+        },
+    )
+    return SensorProcessor(hass, entry)
+
+
+async def test_templates_render_processor_payload(hass: HomeAssistant):
+    """Test every layout renders the processor payload without contract breaks."""
+    variables = _processor(hass).build_payload()["merge_variables"]
+
+    results = render_all(variables, repeat=5)
+
+    assert set(results) == set(LAYOUTS)
+    for result in results.values():
+        assert not result.missing_variables, result.layout
+        assert not result.missing_entity_fields, result.layout
+        assert result.render_time < RENDER_BUDGET_SECONDS
+        assert "mdi-thermometer" in result.html
+        assert "mdi-flower-pollen" in result.html
+        assert "21.5°C" in result.html
+
+    for layout in ("full", "half_horizontal", "half_vertical"):
+        assert "mdi-weather-rainy" in results[layout].html
+        assert "Fair" in results[layout].html
+
+
+async def test_recipe_templates_render_processor_payload(hass: HomeAssistant, tmp_path):
+    """Test forks of the published recipe still render the processor payload."""
+    variables = _processor(hass).build_payload()["merge_variables"]
+    with zipfile.ZipFile(RECIPE_ZIP) as recipe:
+        recipe.extractall(tmp_path)
+
+    results = render_all(variables, template_dir=tmp_path)
+
+    for result in results.values():
+        assert not result.missing_variables, result.layout
+        assert not result.missing_entity_fields, result.layout
+        assert "mdi-thermometer" in result.html
+        assert "mdi-flower-pollen" in result.html
+
+
+def test_templates_render_dev_variables():
+    """Test the trmnlp development variables still satisfy the templates."""
+    for result in render_all(dev_variables()).values():
+        assert not result.missing_variables, result.layout
+        assert not result.missing_entity_fields, result.layout
+
+
+def test_templates_skip_missing_forecast_high():
+    """Test a forecast day without a high shows no stray degree sign."""
+    variables = dev_variables()
+    variables["forecast"] = [{"t": "Mon", "lo": 12}]
+
+    html = render_all(variables)["full"].html
+
+    assert ">/12°<" in html.replace(" ", "").replace("\n", "")
+
+
+def test_templates_report_missing_variables():
+    """Test contract breaks are reported."""
+    results = render_all({"entities": [{"n": "CO2", "val": 400}]})
+
+    assert "co2_rating" in results["full"].missing_variables
+    assert "ic" in results["quadrant"].missing_entity_fields
+
+
+async def test_templates_respect_layout_limits(hass: HomeAssistant):
+    """Test smaller layouts only render the entities selected for them."""
+    hass.states.async_set("sensor.test_co2", "600", {"unit_of_measurement": "ppm"})
+    sensors = [
+        CONF_SENSOR_1,
+        CONF_SENSOR_2,
+        CONF_SENSOR_3,
+        CONF_SENSOR_4,
+        CONF_SENSOR_5,
+        CONF_SENSOR_6,
+    ]
+    data = {CONF_URL: "https://example.com/webhook", CONF_CO2_SENSOR: "sensor.test_co2"}
+    for number, sensor_key in enumerate(sensors, start=1):
+        hass.states.async_set(
+            f"sensor.room_{number}", "20", {"friendly_name": f"Room {number}"}
+        )
+        data[sensor_key] = f"sensor.room_{number}"
+
+    processor = SensorProcessor(hass, MockConfigEntry(domain=DOMAIN, data=data))
+    results = render_all(processor.build_payload()["merge_variables"])
+
+    assert "Room 6" in results["full"].html
+    assert "Room 5" in results["quadrant"].html
+    assert "Room 6" not in results["quadrant"].html
+    for layout in ("half_horizontal", "half_vertical"):
+        assert "Room 4" in results[layout].html
+        assert "Room 5" not in results[layout].html
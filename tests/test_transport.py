@@ -0,0 +1,263 @@
+"""Test the payload transports."""
+from datetime import timedelta
+
+import pytest
+from aioresponses import aioresponses
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from yarl import URL
+
+from custom_components.trmnl_weather_station.const import (
+    CONF_CO2_SENSOR,
+    CONF_TRANSPORT,
+    CONF_URL,
+    DOMAIN,
+    LAN_MAX_BUDGET,
+    LAN_MAX_PAYLOAD_SIZE,
+    MAX_PAYLOAD_SIZE,
+    PUSH_FAILED,
+    PUSH_SENT,
+    PUSH_SKIPPED_RATE_LIMITED,
+    TRANSPORT_LAN,
+    WEBHOOK_RATE_LIMIT,
+)
+from custom_components.trmnl_weather_station.payload_utils import estimate_payload_size
+from custom_components.trmnl_weather_station.push_state import PushState
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+from custom_components.trmnl_weather_station.transport import (
+    LanTransport,
+    Transport,
+    WebhookTransport,
+    create_transport,
+    is_size_rejection,
+)
+
+WEBHOOK_URL = "https://example.com/webhook"
+LAN_URL = "http://192.168.1.20:2300/api/custom_plugins/weather"
+
+
+def set_long_names(hass: HomeAssistant, count: int) -> dict:
+    """Set up sensors with long names and return their configuration."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    config = {CONF_CO2_SENSOR: "sensor.test_co2"}
+    for index in range(1, count + 1):
+        entity_id = f"sensor.room_{index}"
+        hass.states.async_set(
+            entity_id,
+            "21.5",
+            {
+                "unit_of_measurement": "°C",
+                "friendly_name": f"Room {index} " + "x" * 500,
+            },
+        )
+        config[f"sensor_{index}"] = entity_id
+    return config
+
+
+def test_create_transport():
+    """Test the configured transport is created with its limits."""
+    webhook = create_transport(None, {CONF_URL: WEBHOOK_URL})
+    lan = create_transport(None, {CONF_URL: LAN_URL, CONF_TRANSPORT: TRANSPORT_LAN})
+
+    assert isinstance(webhook, WebhookTransport)
+    assert isinstance(lan, LanTransport)
+    assert webhook.max_payload_size == MAX_PAYLOAD_SIZE
+    assert lan.max_payload_size == LAN_MAX_PAYLOAD_SIZE
+    assert lan.url == LAN_URL
+
+    with pytest.raises(TypeError):
+        Transport(None, WEBHOOK_URL)
+
+
+async def test_transport_kept_while_unchanged(hass: HomeAssistant):
+    """Test the processor keeps its transport until its type or URL changes."""
+    processor = SensorProcessor(hass, None)
+    webhook = processor.transport_for({CONF_URL: WEBHOOK_URL})
+
+    assert processor.transport_for({CONF_URL: WEBHOOK_URL}) is webhook
+    lan = processor.transport_for({CONF_URL: LAN_URL, CONF_TRANSPORT: TRANSPORT_LAN})
+    assert isinstance(lan, LanTransport)
+    moved = processor.transport_for({CONF_URL: WEBHOOK_URL + "/other"})
+    assert isinstance(moved, WebhookTransport)
+    assert moved is not webhook
+
+
+def test_is_size_rejection():
+    """Test size rejections are told apart from other errors."""
+    assert is_size_rejection(413, "")
+    assert is_size_rejection(422, '{"error": "Payload too large"}')
+    assert is_size_rejection(400, "merge_variables exceed the size limit")
+    assert not is_size_rejection(400, "invalid json")
+    assert not is_size_rejection(500, "payload too large")
+
+
+async def test_size_rejection_resends_trimmed(hass: HomeAssistant):
+    """Test a size rejection lowers the budget and resends a trimmed payload."""
+    config = set_long_names(hass, 3)
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_URL: WEBHOOK_URL, **config})
+    push_state = PushState(hass, entry.entry_id)
+    processor = SensorProcessor(hass, entry, push_state)
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=413, body="Payload Too Large")
+        mock_http.post(WEBHOOK_URL, status=200)
+        assert await processor.process_sensors() == PUSH_SENT
+
+    rejected, accepted = (
+        estimate_payload_size(request.kwargs["json"])
+        for request in mock_http.requests[("POST", URL(WEBHOOK_URL))]
+    )
+    budget = push_state.budget(WEBHOOK_URL, MAX_PAYLOAD_SIZE)
+    assert budget < rejected
+    assert accepted <= budget < MAX_PAYLOAD_SIZE
+    assert processor.payload_budget(entry.data) == budget
+    processor.async_stop()
+
+
+async def test_size_rejection_respects_rate_limit(hass: HomeAssistant):
+    """Test no resend goes out once a size rejection used the last request."""
+    config = set_long_names(hass, 3)
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_URL: WEBHOOK_URL, **config})
+    push_state = PushState(hass, entry.entry_id)
+    processor = SensorProcessor(hass, entry, push_state)
+    transport = processor.transport_for(entry.data)
+    requests, _ = WEBHOOK_RATE_LIMIT
+    transport._sent_at.extend([dt_util.utcnow().timestamp()] * (requests - 1))
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=413, body="Payload Too Large")
+        assert await processor.process_sensors() == PUSH_SKIPPED_RATE_LIMITED
+
+    (rejected,) = mock_http.requests[("POST", URL(WEBHOOK_URL))]
+    pending = push_state.pending(WEBHOOK_URL)
+    assert estimate_payload_size(pending) < estimate_payload_size(
+        rejected.kwargs["json"]
+    )
+    assert push_state.retry_after(WEBHOOK_URL) is None
+    processor.async_stop()
+
+
+async def test_rate_limit_window():
+    """Test the rolling window allows the declared number of requests."""
+    transport = WebhookTransport(None, WEBHOOK_URL)
+    requests, period = WEBHOOK_RATE_LIMIT
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200, repeat=True)
+        for second in range(requests):
+            assert transport.send_delay(1000.0 + second) == 0
+            assert await transport.async_send({"merge_variables": {}}, 1000.0 + second)
+
+    assert transport.send_delay(1000.0 + requests) == period - requests
+    assert transport.send_delay(1000.0 + period) == 0
+
+
+async def test_lan_transport_allows_larger_payloads(hass: HomeAssistant):
+    """Test the payload is trimmed to the size limit of the transport."""
+    config = set_long_names(hass, 4)
+
+    webhook = SensorProcessor(
+        hass, MockConfigEntry(domain=DOMAIN, data={CONF_URL: WEBHOOK_URL, **config})
+    ).build_payload()
+    lan = SensorProcessor(
+        hass,
+        MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_URL: LAN_URL, CONF_TRANSPORT: TRANSPORT_LAN, **config},
+        ),
+    ).build_payload()
+
+    assert webhook["merge_variables"]["count"] < lan["merge_variables"]["count"] == 5
+    assert estimate_payload_size(webhook) <= MAX_PAYLOAD_SIZE
+    assert MAX_PAYLOAD_SIZE < estimate_payload_size(lan) <= LAN_MAX_PAYLOAD_SIZE
+
+
+async def test_lan_transport_sends_to_local_server(hass: HomeAssistant):
+    """Test pushes go to the local server over the LAN transport."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_URL: LAN_URL,
+            CONF_TRANSPORT: TRANSPORT_LAN,
+            CONF_CO2_SENSOR: "sensor.test_co2",
+        },
+    )
+
+    with aioresponses() as mock_http:
+        mock_http.post(LAN_URL, status=200)
+        assert await SensorProcessor(hass, entry).async_push() == PUSH_SENT
+
+        requests = mock_http.requests[("POST", URL(LAN_URL))]
+        assert requests[0].kwargs["json"]["merge_variables"]["co2_value"] == 400
+
+
+async def test_outbox_keeps_large_lan_payload(hass: HomeAssistant):
+    """Test a failed LAN push beyond the webhook limits is kept for catch-up."""
+    config = set_long_names(hass, 4)
+    for index in range(1, 5):
+        hass.states.async_set(
+            f"sensor.room_{index}",
+            "21.5",
+            {"unit_of_measurement": "°C", "friendly_name": "x" * 1500},
+        )
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_URL: LAN_URL, CONF_TRANSPORT: TRANSPORT_LAN, **config},
+    )
+    state = PushState(hass, entry.entry_id)
+    await state.async_load()
+    state.target(LAN_URL)["budget"] = LAN_MAX_BUDGET
+    processor = SensorProcessor(hass, entry, state)
+
+    with aioresponses() as mock_http:
+        mock_http.post(LAN_URL, status=500, body="Server error")
+        assert await processor.async_push() == PUSH_FAILED
+
+    pending = state.pending(LAN_URL)
+    assert pending is not None
+    assert LAN_MAX_PAYLOAD_SIZE < estimate_payload_size(pending) <= LAN_MAX_BUDGET
+
+    processor.async_stop()
+    await state.async_save()
+
+
+async def test_rate_limited_push_is_deferred(hass: HomeAssistant, freezer):
+    """Test a push beyond the rate limit is queued and sent once allowed."""
+    hass.states.async_set("sensor.test_co2", "400", {"unit_of_measurement": "ppm"})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_URL: WEBHOOK_URL, CONF_CO2_SENSOR: "sensor.test_co2"},
+    )
+    state = PushState(hass, entry.entry_id)
+    await state.async_load()
+    processor = SensorProcessor(hass, entry, state)
+    requests, period = WEBHOOK_RATE_LIMIT
+
+    with aioresponses() as mock_http:
+        mock_http.post(WEBHOOK_URL, status=200, repeat=True)
+        for value in range(requests):
+            hass.states.async_set(
+                "sensor.test_co2", str(400 + value), {"unit_of_measurement": "ppm"}
+            )
+            assert await processor.async_push() == PUSH_SENT
+
+        hass.states.async_set("sensor.test_co2", "999", {"unit_of_measurement": "ppm"})
+        assert await processor.async_push() == PUSH_SKIPPED_RATE_LIMITED
+        assert state.pending(WEBHOOK_URL)["merge_variables"]["co2_value"] == 999
+
+        freezer.tick(timedelta(seconds=period))
+        async_fire_time_changed(hass)
+        await hass.async_block_till_done()
+
+        posted = mock_http.requests[("POST", URL(WEBHOOK_URL))]
+        assert len(posted) == requests + 1
+        assert posted[-1].kwargs["json"]["merge_variables"]["co2_value"] == 999
+        assert state.pending(WEBHOOK_URL) is None
+
+    processor.async_stop()
+    await state.async_save()
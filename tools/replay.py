@@ -0,0 +1,221 @@
+"""Replay recorded sensor states through the push pipeline.
+
+Feeds the snapshots of a recording made with the record service through the
+full payload pipeline, against a local webhook stand-in, and reports
+throughput, per-stage timings and the sizes of the payloads received.
+
+Usage:
+    python -m tools.replay recording.jsonl [--speed N] [--repeat N] [--rate-limit]
+
+Without --speed the snapshots are replayed back to back. With --speed the
+recorded gaps between snapshots are kept, divided by the speed factor. The
+rate limit of the transport is ignored unless --rate-limit is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aiohttp import web
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.trmnl_weather_station.const import CONF_URL, DOMAIN
+from custom_components.trmnl_weather_station.profiling import (
+    StageTimer,
+    summarize_timings,
+)
+from custom_components.trmnl_weather_station.push_state import PushState
+from custom_components.trmnl_weather_station.recording import Recording, read_recording
+from custom_components.trmnl_weather_station.sensor_processor import SensorProcessor
+
+
+@dataclass
+class ReplayResult:
+    """Outcome of replaying a recording."""
+
+    ticks: int = 0
+    duration: float = 0.0
+    outcomes: dict[str, int] = field(default_factory=dict)
+    payloads: list[dict] = field(default_factory=list)
+    payload_sizes: list[int] = field(default_factory=list)
+    tick_times: list[float] = field(default_factory=list)
+    stages: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Return the replayed ticks per second."""
+        return self.ticks / self.duration if self.duration else 0.0
+
+
+class WebhookStandIn:
+    """Local HTTP server accepting webhook posts and keeping their bodies.
+
+    Long runs can count the posts only, so the stand-in does not grow.
+    """
+
+    def __init__(self, status: int = 200, keep_payloads: bool = True):
+        """Initialize the stand-in."""
+        self.status = status
+        self.keep_payloads = keep_payloads
+        self.received = 0
+        self.payloads: list[dict] = []
+        self.sizes: list[int] = []
+        self.url = ""
+        self._runner: web.AppRunner | None = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Accept one webhook post."""
+        body = await request.read()
+        self.received += 1
+        if self.keep_payloads:
+            self.sizes.append(len(body))
+            self.payloads.append(await request.json())
+        return web.json_response({"message": "ok"}, status=self.status)
+
+    async def _handle_probe(self, request: web.Request) -> web.Response:
+        """Answer reachability probes."""
+        return web.json_response({"merge_variables": {}})
+
+    async def __aenter__(self) -> WebhookStandIn:
+        """Start serving on a free local port."""
+        app = web.Application()
+        app.router.add_post("/webhook", self._handle)
+        app.router.add_get("/webhook", self._handle_probe)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/webhook"
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        """Stop serving."""
+        await self._runner.cleanup()
+
+
+def replay_entry(recording: Recording, url: str) -> ConfigEntry:
+    """Return a config entry with the recorded configuration and the given URL."""
+    return ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Replay",
+        data={**recording.config, CONF_URL: url},
+        options={},
+        source="user",
+        entry_id="replay",
+    )
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    recording: Recording,
+    speed: float = 0.0,
+    repeat: int = 1,
+    rate_limit: bool = False,
+) -> ReplayResult:
+    """Replay a recording through a processor pushing to a webhook stand-in."""
+    result = ReplayResult()
+    runs = []
+
+    async with WebhookStandIn() as webhook:
+        entry = replay_entry(recording, webhook.url)
+        processor = SensorProcessor(hass, entry, PushState(hass, entry.entry_id))
+        if not rate_limit:
+            processor.transport_for(entry.data).rate_limit = None
+
+        start = time.perf_counter()
+        for _ in range(max(repeat, 1)):
+            previous = None
+            for recorded_at, rows in recording.snapshots:
+                if speed and previous is not None:
+                    await asyncio.sleep(max(recorded_at - previous, 0) / speed)
+                previous = recorded_at
+
+                tick_start = time.perf_counter()
+                for entity_id, state, attributes in rows:
+                    hass.states.async_set(entity_id, state, attributes)
+                timer = StageTimer()
+                outcome = await processor.process_sensors(
+                    only_if_changed=True, timer=timer
+                )
+                result.tick_times.append(time.perf_counter() - tick_start)
+                result.outcomes[outcome] = result.outcomes.get(outcome, 0) + 1
+                runs.append(timer.timings)
+        result.duration = time.perf_counter() - start
+
+        processor.async_stop()
+        result.ticks = len(result.tick_times)
+        result.payloads = webhook.payloads
+        result.payload_sizes = webhook.sizes
+        result.stages = summarize_timings(runs)
+
+    return result
+
+
+async def _async_main(args) -> ReplayResult:
+    """Replay in a standalone Home Assistant instance."""
+    recording = read_recording(args.recording)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            return await async_replay(
+                hass, recording, args.speed, args.repeat, args.rate_limit
+            )
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Replay a recording and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", type=Path, help="recording JSON lines file")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay speed factor")
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="replays of the recording"
+    )
+    parser.add_argument(
+        "--rate-limit",
+        action="store_true",
+        help="defer pushes beyond the transport rate limit",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)
+    result = asyncio.run(_async_main(args))
+
+    print(f"ticks:       {result.ticks} in {result.duration:.3f} s")
+    print(f"throughput:  {result.throughput:.1f} ticks/s")
+    if result.tick_times:
+        print(
+            f"tick ms:     median {statistics.median(result.tick_times) * 1000:.3f}, "
+            f"max {max(result.tick_times) * 1000:.3f}"
+        )
+    print(
+        "outcomes:    "
+        + ", ".join(f"{k} {v}" for k, v in sorted(result.outcomes.items()))
+    )
+    if result.payload_sizes:
+        print(
+            f"payload:     {len(result.payload_sizes)} sent, bytes min "
+            f"{min(result.payload_sizes)}, median "
+            f"{statistics.median(result.payload_sizes):.0f}, max {max(result.payload_sizes)}"
+        )
+
+    print(f"{'stage':<12} {'mean ms':>10} {'max ms':>10}")
+    for stage, summary in result.stages.items():
+        print(f"{stage:<12} {summary['mean_ms']:>10.3f} {summary['max_ms']:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,333 @@
+"""Soak the push pipeline with a synthetic sensor stream.
+
+Sets up a full entry with aggregation and significance filtering, pushing
+to a local webhook stand-in, and drives it through many ticks of a random
+walk sensor stream. Every tick the polling cache is read, and periodically
+the display image is rendered and the tracked entities are swapped, so the
+caches and buffers of all helpers take part. After a warm-up the run tracks
+traced memory growth, growth of live objects and the event loop lag.
+
+Usage:
+    python -m tools.soak [--ticks N] [--max-memory-growth KIB] [--max-object-growth N]
+
+The exit status is 1 if a growth threshold was exceeded.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import random
+import tempfile
+import time
+import tracemalloc
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.trmnl_weather_station import (
+    async_setup_entry,
+    async_unload_entry,
+    get_sensor_entity_ids,
+    get_tracked_entity_ids,
+)
+from custom_components.trmnl_weather_station.const import (
+    AGGREGATION_AUTO,
+    CONF_AGGREGATION,
+    CONF_CO2_SENSOR,
+    CONF_DEADBAND_SCALE,
+    CONF_SENSOR_1,
+    CONF_SENSOR_2,
+    CONF_SENSOR_3,
+    CONF_SENSOR_4,
+    CONF_SENSOR_5,
+    CONF_SENSOR_6,
+    CONF_URL,
+    DOMAIN,
+)
+from custom_components.trmnl_weather_station.recording import SnapshotRecorder
+from tools.replay import WebhookStandIn
+
+# Growth allowed between the end of the warm-up and the end of the run.
+MAX_MEMORY_GROWTH = 512 * 1024
+MAX_OBJECT_GROWTH = 2000
+LAG_INTERVAL = 0.01
+# Small enough that a good share of the ticks is pushed.
+DEADBAND_SCALE = 0.2
+
+# entity_id, initial value, random walk step, lower bound, upper bound, unit,
+# device class
+SENSORS = (
+    ("sensor.soak_co2", 600.0, 15.0, 400.0, 2000.0, "ppm", "carbon_dioxide"),
+    ("sensor.soak_temperature", 21.0, 0.1, 15.0, 30.0, "°C", "temperature"),
+    ("sensor.soak_humidity", 45.0, 0.5, 20.0, 80.0, "%", "humidity"),
+    ("sensor.soak_pressure", 1013.0, 0.2, 980.0, 1040.0, "hPa", "pressure"),
+    ("sensor.soak_pm25", 8.0, 1.0, 0.0, 150.0, "µg/m³", "pm25"),
+    ("sensor.soak_wind", 3.0, 0.3, 0.0, 25.0, "m/s", "wind_speed"),
+    ("sensor.soak_rain", 0.0, 0.2, 0.0, 10.0, "mm", "precipitation"),
+)
+SENSOR_KEYS = (
+    CONF_CO2_SENSOR,
+    CONF_SENSOR_1,
+    CONF_SENSOR_2,
+    CONF_SENSOR_3,
+    CONF_SENSOR_4,
+    CONF_SENSOR_5,
+    CONF_SENSOR_6,
+)
+
+
+@dataclass
+class SoakResult:
+    """Outcome of a soak run."""
+
+    ticks: int = 0
+    duration: float = 0.0
+    outcomes: dict[str, int] = field(default_factory=dict)
+    received: int = 0
+    memory_growth: int = 0
+    object_growth: int = 0
+    growing_types: list[tuple[str, int]] = field(default_factory=list)
+    lags: array = field(default_factory=lambda: array("d"))
+
+    def lag_percentile(self, percentile: float) -> float:
+        """Return a percentile of the event loop lag in seconds."""
+        if not self.lags:
+            return 0.0
+        ordered = sorted(self.lags)
+        return ordered[min(int(len(ordered) * percentile / 100), len(ordered) - 1)]
+
+    def within(self, max_memory_growth: int, max_object_growth: int) -> bool:
+        """Return whether the growth stayed within the thresholds."""
+        return (
+            self.memory_growth <= max_memory_growth
+            and self.object_growth <= max_object_growth
+        )
+
+
+class SensorStream:
+    """Random walk of the soak sensors, with occasional unavailable readings."""
+
+    def __init__(self, seed: int = 0):
+        """Initialize the stream."""
+        self._random = random.Random(seed)
+        self._values = [sensor[1] for sensor in SENSORS]
+        self._attributes = [
+            {"unit_of_measurement": sensor[5], "device_class": sensor[6]}
+            for sensor in SENSORS
+        ]
+
+    def step(self, hass: HomeAssistant) -> None:
+        """Advance every sensor by one step and set its state."""
+        for index, (entity_id, _, step, low, high, *_) in enumerate(SENSORS):
+            value = self._values[index] + self._random.uniform(-step, step)
+            self._values[index] = value = min(max(value, low), high)
+            state = f"{value:.1f}"
+            if self._random.random() < 0.001:
+                state = "unavailable"
+            hass.states.async_set(entity_id, state, self._attributes[index])
+
+
+def soak_entry(url: str) -> ConfigEntry:
+    """Return a config entry for the soak sensors pushing to the given URL."""
+    return ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=DOMAIN,
+        title="Soak",
+        data={
+            CONF_URL: url,
+            CONF_AGGREGATION: AGGREGATION_AUTO,
+            CONF_DEADBAND_SCALE: DEADBAND_SCALE,
+            **{key: sensor[0] for key, sensor in zip(SENSOR_KEYS, SENSORS)},
+        },
+        options={},
+        source="user",
+        entry_id="soak",
+    )
+
+
+def _count_objects() -> Counter:
+    """Return the number of live objects tracked by the collector per type."""
+    gc.collect()
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+def _traced_memory() -> tracemalloc.Snapshot:
+    """Return a snapshot of traced memory, excluding the soak bookkeeping."""
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        )
+    )
+
+
+async def _async_monitor_lag(lags: array, interval: float) -> None:
+    """Record by how much sleeps on the event loop overshoot."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - start - interval, 0.0))
+
+
+async def async_soak(
+    hass: HomeAssistant,
+    ticks: int,
+    warmup: int | None = None,
+    image_every: int = 1000,
+    swap_every: int = 5000,
+    seed: int = 0,
+) -> SoakResult:
+    """Drive an entry through synthetic ticks and measure what it retains."""
+    result = SoakResult()
+    warmup = min(max(ticks // 10, 100), ticks) if warmup is None else warmup
+    stream = SensorStream(seed)
+    stream.step(hass)
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        image_every = 0
+
+    with tempfile.TemporaryDirectory() as recording_dir:
+        async with WebhookStandIn(keep_payloads=False) as webhook:
+            entry = soak_entry(webhook.url)
+            await async_setup_entry(hass, entry)
+            await hass.async_block_till_done()
+            data = hass.data[DOMAIN][entry.entry_id]
+            processor = data["processor"]
+            processor.transport_for(entry.data).rate_limit = None
+            processor.recorder = SnapshotRecorder(
+                hass, Path(recording_dir) / "soak.jsonl"
+            )
+            processor.recorder.async_start(dict(entry.data))
+
+            # Alternate between all sensors and all but the last one.
+            configs = [dict(entry.data), {**entry.data, CONF_SENSOR_6: None}]
+
+            tracemalloc.start()
+            monitor = asyncio.create_task(_async_monitor_lag(result.lags, LAG_INTERVAL))
+            baseline_memory = baseline_objects = None
+            start = time.perf_counter()
+            try:
+                for tick in range(ticks):
+                    if tick == warmup:
+                        await hass.async_block_till_done()
+                        # Count before taking the snapshot and after dropping
+                        # it, so neither count includes its traces.
+                        baseline_objects = _count_objects()
+                        baseline_memory = _traced_memory()
+                        del result.lags[:]
+
+                    # Ticks run as separate callbacks, as they do from the timer.
+                    await asyncio.sleep(0)
+                    stream.step(hass)
+                    outcome = await processor.async_push(only_if_changed=True)
+                    result.outcomes[outcome] = result.outcomes.get(outcome, 0) + 1
+                    cached = data["poll_cache"].get_payload()
+
+                    if image_every and cached and tick % image_every == 0:
+                        await data["renderer"].async_render(cached[0])
+                    if swap_every and tick and tick % swap_every == 0:
+                        config = configs[tick // swap_every % 2]
+                        data["aggregator"].async_set_entities(
+                            get_sensor_entity_ids(config), time.time()
+                        )
+                        data["significance"].async_reconfigure(
+                            get_tracked_entity_ids(config), DEADBAND_SCALE
+                        )
+                        data["poll_cache"].async_set_entities(
+                            get_tracked_entity_ids(config)
+                        )
+
+                result.duration = time.perf_counter() - start
+                await hass.async_block_till_done()
+                if baseline_objects is not None:
+                    memory = _traced_memory()
+                    result.memory_growth = sum(
+                        stat.size_diff
+                        for stat in memory.compare_to(baseline_memory, "filename")
+                    )
+                    del memory, baseline_memory
+                    growth = _count_objects()
+                    growth.subtract(baseline_objects)
+                    result.object_growth = sum(growth.values())
+                    result.growing_types = [
+                        (name, count)
+                        for name, count in growth.most_common(5)
+                        if count > 0
+                    ]
+            finally:
+                monitor.cancel()
+                tracemalloc.stop()
+                await async_unload_entry(hass, entry)
+
+            result.ticks = ticks
+            result.received = webhook.received
+
+    return result
+
+
+async def _async_main(args) -> SoakResult:
+    """Soak in a standalone Home Assistant instance."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            return await async_soak(hass, args.ticks)
+        finally:
+            await hass.async_stop(force=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run a soak and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ticks", type=int, default=300_000, help="simulated ticks")
+    parser.add_argument(
+        "--max-memory-growth",
+        type=int,
+        default=MAX_MEMORY_GROWTH // 1024,
+        help="allowed traced memory growth in KiB",
+    )
+    parser.add_argument(
+        "--max-object-growth",
+        type=int,
+        default=MAX_OBJECT_GROWTH,
+        help="allowed growth of live objects",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.CRITICAL)
+    result = asyncio.run(_async_main(args))
+    passed = result.within(args.max_memory_growth * 1024, args.max_object_growth)
+
+    print(f"ticks:       {result.ticks} in {result.duration:.1f} s")
+    print(f"received:    {result.received} payloads")
+    print(
+        "outcomes:    "
+        + ", ".join(f"{k} {v}" for k, v in sorted(result.outcomes.items()))
+    )
+    print(f"memory:      {result.memory_growth / 1024:+.1f} KiB")
+    print(
+        f"objects:     {result.object_growth:+d} "
+        + ", ".join(f"{name} {count:+d}" for name, count in result.growing_types)
+    )
+    print(
+        f"loop lag ms: p50 {result.lag_percentile(50) * 1000:.2f}, "
+        f"p99 {result.lag_percentile(99) * 1000:.2f}, "
+        f"max {result.lag_percentile(100) * 1000:.2f}"
+    )
+    print("result:      " + ("ok" if passed else "growth above threshold"))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
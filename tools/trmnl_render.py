@@ -0,0 +1,189 @@
+"""Offline renderer for the TRMNL Liquid templates.
+
+Renders the plugin layouts in TRMNL/src with python-liquid, without Docker or
+network access, and reports render time and output size per layout.
+
+Usage:
+    python -m tools.trmnl_render [payload.json] [--repeat N]
+
+Without a payload file the development variables from TRMNL/.trmnlp.yml are
+used. A payload file may contain either the merge variables or the full
+webhook body with a top-level "merge_variables" key.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from liquid import Environment
+
+TRMNL_DIR = Path(__file__).resolve().parent.parent / "TRMNL"
+TEMPLATE_DIR = TRMNL_DIR / "src"
+DEV_CONFIG = TRMNL_DIR / ".trmnlp.yml"
+
+LAYOUTS = ("full", "half_horizontal", "half_vertical", "quadrant")
+
+# Variables injected by the TRMNL platform rather than by the webhook payload.
+PLATFORM_VARIABLES = ("trmnl",)
+
+# Merge variables the integration only sends when they carry information.
+OPTIONAL_VARIABLES = (
+    "layouts",
+    "forecast",
+    "page",
+    "pages",
+    "iaq_score",
+    "iaq_rating",
+    "iaq_band",
+)
+
+_ENV = Environment()
+
+
+@dataclass
+class RenderResult:
+    """Outcome of rendering one layout."""
+
+    layout: str
+    html: str
+    render_times: list[float] = field(default_factory=list)
+    missing_variables: set[str] = field(default_factory=set)
+    missing_entity_fields: set[str] = field(default_factory=set)
+
+    @property
+    def size(self) -> int:
+        """Return the rendered output size in bytes."""
+        return len(self.html.encode("utf-8"))
+
+    @property
+    def render_time(self) -> float:
+        """Return the median render time in seconds."""
+        return statistics.median(self.render_times)
+
+
+def load_template(layout: str, template_dir: Path = TEMPLATE_DIR):
+    """Parse a layout with the shared markup prepended, as TRMNL does."""
+    shared = (template_dir / "shared.liquid").read_text(encoding="utf-8")
+    markup = (template_dir / f"{layout}.liquid").read_text(encoding="utf-8")
+    return _ENV.from_string(
+        f'<div class="screen"><div class="view view--{layout}">'
+        f"{shared}{markup}</div></div>"
+    )
+
+
+def merge_variables_from(payload: dict) -> dict:
+    """Return the merge variables of a webhook body or of bare merge variables."""
+    return payload.get("merge_variables", payload)
+
+
+def dev_variables() -> dict:
+    """Return the development variables from the trmnlp configuration."""
+    import yaml
+
+    with DEV_CONFIG.open(encoding="utf-8") as config_file:
+        return yaml.safe_load(config_file)["variables"]
+
+
+def check_contract(template, variables: dict) -> tuple[set[str], set[str]]:
+    """Return globals and entity fields the template reads but the payload lacks."""
+    missing_variables = {
+        name
+        for name in template.global_variables()
+        if name not in variables
+        and name not in PLATFORM_VARIABLES
+        and name not in OPTIONAL_VARIABLES
+    }
+
+    entity_fields = {
+        str(path).split(".", 1)[1].split("[", 1)[0]
+        for path in template.variable_paths()
+        if str(path).startswith("entity.")
+    }
+    provided_fields = set()
+    for entity in variables.get("entities") or []:
+        provided_fields.update(entity)
+
+    return missing_variables, entity_fields - provided_fields
+
+
+def render_layout(
+    layout: str,
+    variables: dict,
+    repeat: int = 1,
+    template_dir: Path = TEMPLATE_DIR,
+) -> RenderResult:
+    """Render one layout and measure its render time over repeated runs."""
+    template = load_template(layout, template_dir)
+    missing_variables, missing_entity_fields = check_contract(template, variables)
+
+    html = ""
+    render_times = []
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        html = template.render(**variables)
+        render_times.append(time.perf_counter() - start)
+
+    return RenderResult(
+        layout=layout,
+        html=html,
+        render_times=render_times,
+        missing_variables=missing_variables,
+        missing_entity_fields=missing_entity_fields,
+    )
+
+
+def render_all(
+    variables: dict, repeat: int = 1, template_dir: Path = TEMPLATE_DIR
+) -> dict[str, RenderResult]:
+    """Render every layout against the same merge variables."""
+    return {
+        layout: render_layout(layout, variables, repeat, template_dir)
+        for layout in LAYOUTS
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Render all layouts and print a summary table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("payload", nargs="?", type=Path, help="payload JSON file")
+    parser.add_argument("--repeat", type=int, default=50, help="renders per layout")
+    parser.add_argument("--output", type=Path, help="write rendered HTML here")
+    args = parser.parse_args(argv)
+
+    if args.payload:
+        variables = merge_variables_from(
+            json.loads(args.payload.read_text(encoding="utf-8"))
+        )
+    else:
+        variables = dev_variables()
+
+    results = render_all(variables, args.repeat)
+    contract_ok = True
+
+    print(f"{'layout':<16} {'median ms':>10} {'bytes':>8}  contract")
+    for result in results.values():
+        problems = sorted(result.missing_variables) + [
+            f"entity.{name}" for name in sorted(result.missing_entity_fields)
+        ]
+        contract_ok = contract_ok and not problems
+        print(
+            f"{result.layout:<16} {result.render_time * 1000:>10.3f} "
+            f"{result.size:>8}  {'missing ' + ', '.join(problems) if problems else 'ok'}"
+        )
+
+        if args.output:
+            args.output.mkdir(parents=True, exist_ok=True)
+            (args.output / f"{result.layout}.html").write_text(
+                result.html, encoding="utf-8"
+            )
+
+    return 0 if contract_ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())